@@ -0,0 +1,7 @@
+from ax_lang.benchmark.ast_size import compare_ast_sizes
+from ax_lang.utils import print_df
+
+if __name__ == "__main__":
+    tests = ["factorial", "fibonacci", "higher_order", "simple", "switch", "test"]
+    print("AST memory, bytes per node (nested lists vs compact arrays):")
+    print_df(compare_ast_sizes(tests))
@@ -0,0 +1,8 @@
+from ax_lang.benchmark.classes import compare_classes, instance_memory
+from ax_lang.utils import print_df
+
+if __name__ == "__main__":
+    print("Class-heavy workload (particles of vector instances) by engine:")
+    print_df(compare_classes())
+    print("Memory of an instance with three properties, with and without `fields`:")
+    print_df(instance_memory())
@@ -0,0 +1,8 @@
+from ax_lang.benchmark.closures import compare_closures, compare_engines
+from ax_lang.utils import print_df
+
+if __name__ == "__main__":
+    print("Memory per retained closure (closure engine):")
+    print_df(compare_closures())
+    print("Memory per closure of a chain of closures by engine:")
+    print_df(compare_engines())
@@ -0,0 +1,6 @@
+from ax_lang.benchmark.dispatch import compare_dispatch
+from ax_lang.utils import print_df
+
+if __name__ == "__main__":
+    print("Call-heavy program (fib 18) with extra registered special forms:")
+    print_df(compare_dispatch([0, 10, 100, 1000, 10000]))
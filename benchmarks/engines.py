@@ -0,0 +1,8 @@
+from ax_lang.benchmark.engines import compare_engines
+from ax_lang.interpreter.ax_lang import ENGINES
+from ax_lang.utils import print_df
+
+if __name__ == "__main__":
+    tests = ["factorial", "fibonacci", "higher_order", "simple", "switch"]
+    print("Engine execution time (best of 20 runs, parsing excluded):")
+    print_df(compare_engines(list(ENGINES), tests))
@@ -0,0 +1,7 @@
+from ax_lang.benchmark.ast_size import compare_sharing
+from ax_lang.utils import print_df
+
+if __name__ == "__main__":
+    tests = ["factorial", "fibonacci", "higher_order", "simple", "switch", "test"]
+    print("Hash-consing of the typed AST (shared identical subtrees):")
+    print_df(compare_sharing(tests))
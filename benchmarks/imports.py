@@ -0,0 +1,6 @@
+from ax_lang.benchmark.imports import compare_imports
+from ax_lang.utils import print_df
+
+if __name__ == "__main__":
+    print("Script importing 20 modules of 200 functions and using one, by engine:")
+    print_df(compare_imports())
@@ -0,0 +1,6 @@
+from ax_lang.benchmark.inlining import compare_inlining
+from ax_lang.utils import print_df
+
+if __name__ == "__main__":
+    print("Loop calling `abs` and `square` (closure engine) by inline threshold:")
+    print_df(compare_inlining([0, 5, 20]))
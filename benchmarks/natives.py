@@ -0,0 +1,6 @@
+from ax_lang.benchmark.natives import compare_natives
+from ax_lang.utils import print_df
+
+if __name__ == "__main__":
+    print("Cost per operation of the built-in operators, generic calls vs fast paths:")
+    print_df(compare_natives())
@@ -0,0 +1,72 @@
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+from ax_lang.parser.cache import ASTCache
+from ax_lang.parser.compact import CompactAST, count_nodes, list_ast_nbytes
+from ax_lang.parser.hashcons import HashConser
+from ax_lang.utils import get_examples_root
+
+
+def generate_rules(count: int) -> str:
+    """Returns the source of a generated rule script with `count` rule functions."""
+    return "\n".join(
+        f'(def rule_{i} (x) (if (> x {i}) (+ x {i}) (begin (print "low") (- x 1))))'
+        for i in range(count)
+    )
+
+
+def ast_sizes(path: str | Path) -> dict[str, float]:
+    """Measures memory of the nested-list and the compact AST of a source file.
+
+    The plain and the typed list forms are measured as `ASTCache.get_ast` returns them.
+    """
+    cache = ASTCache(enabled=False)
+    plain = cache.get_ast(path)
+    nodes = count_nodes(plain)
+    sizes = {
+        "nodes": nodes,
+        "plain_bytes_per_node": list_ast_nbytes(plain) / nodes,
+        "typed_bytes_per_node": list_ast_nbytes(cache.get_ast(path, typed=True))
+        / nodes,
+        "compact_bytes_per_node": CompactAST.from_file(path).nbytes() / nodes,
+    }
+    sizes["plain_to_compact"] = (
+        sizes["plain_bytes_per_node"] / sizes["compact_bytes_per_node"]
+    )
+    return sizes
+
+
+def sharing(path: str | Path) -> dict[str, float]:
+    """Measures hash-consing of the typed AST of a source file."""
+    conser = HashConser()
+    conser.share(ASTCache(enabled=False).get_ast(path, typed=True))
+    stats = conser.stats()
+    return {
+        **stats._asdict(),
+        "sharing_ratio": stats.sharing_ratio,
+        "saved_bytes": stats.saved_bytes,
+    }
+
+
+def _compare(measure, tests: list[str], generated: int) -> pd.DataFrame:
+    rows = [
+        {"test_case": test, **measure(get_examples_root() / "axlang" / f"{test}.ax")}
+        for test in tests
+    ]
+    if generated:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "rules.ax"
+            path.write_text(generate_rules(generated))
+            rows.append({"test_case": f"rules_{generated}", **measure(path)})
+    return pd.DataFrame(rows).set_index("test_case")
+
+
+def compare_ast_sizes(tests: list[str], generated: int = 1000) -> pd.DataFrame:
+    """Compares AST memory of the examples and of a generated rule script."""
+    return _compare(ast_sizes, tests, generated)
+
+
+def compare_sharing(tests: list[str], generated: int = 1000) -> pd.DataFrame:
+    """Reports hash-consing of the examples and of a generated rule script."""
+    return _compare(sharing, tests, generated)
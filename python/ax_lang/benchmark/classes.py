@@ -0,0 +1,176 @@
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+from ax_lang.interpreter.ax_lang import ENGINES, AxLang
+from ax_lang.interpreter.environment import Environment, GlobalEnvironment
+from ax_lang.parser.parser import get_ast
+
+# Particles moving along their velocity: every iteration allocates vectors, calls
+# methods and reads and writes properties of instances of three classes
+PARTICLES = """
+(begin
+    (class Vec null
+        (begin
+            (def constructor (this x y)
+                (begin
+                    (set (prop this x) x)
+                    (set (prop this y) y)))
+            (def add (this other)
+                (new Vec (+ (prop this x) (prop other x)) (+ (prop this y) (prop other y))))
+            (def dot (this other)
+                (+ (* (prop this x) (prop other x)) (* (prop this y) (prop other y))))))
+    (class Particle null
+        (begin
+            (def constructor (this pos vel)
+                (begin
+                    (set (prop this pos) pos)
+                    (set (prop this vel) vel)
+                    (set (prop this steps) 0)))
+            (def step (this)
+                (begin
+                    (set (prop this pos) ((prop (prop this pos) add) (prop this pos) (prop this vel)))
+                    (set (prop this steps) (+ (prop this steps) 1))))))
+    (class Heavy Particle
+        (def constructor (this pos vel mass)
+            (begin
+                ((prop (super Heavy) constructor) this pos vel)
+                (set (prop this mass) mass))))
+    (var a (new Particle (new Vec 0 0) (new Vec 1 2)))
+    (var b (new Heavy (new Vec 5 5) (new Vec -1 1) 10))
+    (var sum 0)
+    (for (var i 0) (< i {iterations}) (++ i)
+        (begin
+            ((prop a step) a)
+            ((prop b step) b)
+            (+= sum ((prop (prop a pos) dot) (prop a pos) (prop b pos)))))
+    (+ sum (prop a steps) (prop b mass)))
+"""
+
+# Method updating a property in a loop: every iteration reads two properties of the
+# instance and writes one
+COUNTER = """
+(begin
+    (class Counter null
+        (begin
+            (def constructor (this step)
+                (begin
+                    (set (prop this n) 0)
+                    (set (prop this step) step)))
+            (def run (this k)
+                (begin
+                    (for (var i 0) (< i k) (++ i)
+                        (set (prop this n) (+ (prop this n) (prop this step))))
+                    (prop this n)))))
+    (var counter (new Counter 2))
+    ((prop counter run) counter {iterations}))
+"""
+
+# Method of the root class of a chain of 10 classes called on an instance of the leaf
+# class: every iteration looks up the method and calls it
+INHERITANCE = """
+(begin
+    (class C0 null
+        (begin
+            (def constructor (this) null)
+            (def value (this) 1)))
+    {classes}
+    (var obj (new C10))
+    (var sum 0)
+    (for (var i 0) (< i {{iterations}}) (++ i)
+        (+= sum ((prop obj value) obj)))
+    sum)
+""".format(
+    classes="\n    ".join(
+        f"(class C{i} C{i - 1} (var level{i} {i}))" for i in range(1, 11)
+    )
+)
+
+# Class of the instances measured by `instance_memory`: `{fields}` is empty or
+# declares the properties as fields
+VEC3 = """
+(class Vec3 null
+    (begin
+        {fields}
+        (def constructor (this x y z)
+            (begin
+                (set (prop this x) x)
+                (set (prop this y) y)
+                (set (prop this z) z)))))
+"""
+
+# Workloads timed by `compare_classes`: name -> (code, property reads and writes of an
+# iteration)
+WORKLOADS = {
+    "particles": (PARTICLES, 36),
+    "counter": (COUNTER, 3),
+    "inheritance": (INHERITANCE, 1),
+}
+
+
+def time_workload(
+    engine: str, code: str, iterations: int = 2000, repeat: int = 5
+) -> float:
+    """Returns the best time of a workload in an engine, in seconds."""
+    ax_lang = AxLang(engine=engine)
+    ast = ax_lang.lower(get_ast(code.format(iterations=iterations), typed=True))
+    best = float("inf")
+    for _ in range(repeat):
+        env = Environment({}, GlobalEnvironment)
+        start = time.process_time()
+        ax_lang.eval(ast, env)
+        best = min(best, time.process_time() - start)
+    return best
+
+
+def compare_classes(
+    engines: list[str] = ENGINES, iterations: int = 2000, repeat: int = 5
+) -> pd.DataFrame:
+    """Times the class-heavy workloads in every engine.
+
+    Returns:
+        Time of an iteration in µs by engine and workload, and the iteration time per
+        property access in ns (iterations also loop, call methods and allocate
+        instances)
+    """
+    rows = []
+    for engine in engines:
+        for name, (code, accesses) in WORKLOADS.items():
+            elapsed = time_workload(engine, code, iterations, repeat)
+            rows.append(
+                {
+                    "engine": engine,
+                    "workload": name,
+                    "iteration_us": elapsed / iterations * 1e6,
+                    "per_access_ns": elapsed / iterations / accesses * 1e9,
+                }
+            )
+    return pd.DataFrame(rows).set_index(["engine", "workload"])
+
+
+def instance_memory(engines: list[str] = ENGINES, count: int = 10000) -> pd.DataFrame:
+    """Measures the memory of instances with three properties, with and without fields.
+
+    Returns:
+        Bytes allocated per instance by engine, for a class setting its properties in
+        the constructor (`shapes`) and for one declaring them with `fields`
+    """
+    rows = []
+    for engine in engines:
+        row = {"engine": engine}
+        for layout, fields in (("shapes", ""), ("fields", "(fields x y z)")):
+            ax_lang = AxLang(engine=engine)
+            env = Environment({}, GlobalEnvironment)
+            ax_lang.eval(get_ast(VEC3.format(fields=fields)), env)
+            new = get_ast("(new Vec3 1 2 3)")
+            # the first instance fills the caches of the sites
+            ax_lang.eval(new, env)
+            tracemalloc.start()
+            before = tracemalloc.get_traced_memory()[0]
+            instances = [ax_lang.eval(new, env) for _ in range(count)]
+            allocated = tracemalloc.get_traced_memory()[0] - before
+            tracemalloc.stop()
+            row[f"{layout}_bytes"] = (allocated - sys.getsizeof(instances)) / count
+        rows.append(row)
+    return pd.DataFrame(rows).set_index("engine")
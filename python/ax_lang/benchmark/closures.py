@@ -0,0 +1,82 @@
+import gc
+import tracemalloc
+
+import pandas as pd
+from ax_lang.interpreter.ax_lang import CLOSURE_ENGINE, ENGINES, AxLang
+from ax_lang.parser.parser import get_ast
+
+# Factory returning a closure over one of the variables of its body
+FACTORY = """
+(def make (n)
+    (begin
+        (var a (* n 2))
+        (var b (* n 3))
+        (var c (* n 4))
+        (lambda (x) (+ x a))))
+"""
+
+# Chain of closures, each one retaining the previous one through its environment
+CHAIN = """
+(begin
+    (def make (prev) (lambda (x) prev))
+    (var head null)
+    (for (var i 0) (< i {count}) (++ i)
+        (set head (make head)))
+    head)
+"""
+
+
+def closure_memory(flat_closures: bool, count: int = 10000) -> float:
+    """Returns the memory retained per closure created by the factory, in bytes."""
+    ax_lang = AxLang(engine=CLOSURE_ENGINE)
+    ax_lang.compiler.flat_closures = flat_closures
+    make = ax_lang.eval(get_ast(FACTORY, typed=True))
+    call = get_ast("(make 1)", typed=True)
+    ax_lang.eval(call)  # compile the factory before measuring
+    gc.collect()
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    closures = [ax_lang.compiler.call(make, [i]) for i in range(count)]
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(closures) == count
+    return (end - start) / count
+
+
+def compare_closures(count: int = 10000) -> pd.DataFrame:
+    """Compares memory per retained closure with and without flat closures."""
+    rows = [
+        {"flat_closures": flat, "bytes_per_closure": closure_memory(flat, count)}
+        for flat in (False, True)
+    ]
+    df = pd.DataFrame(rows).set_index("flat_closures")
+    df["relative"] = df["bytes_per_closure"] / df["bytes_per_closure"].iloc[0]
+    return df
+
+
+def chain_memory(engine: str, count: int = 10000) -> float:
+    """Returns the memory retained per closure of a chain of closures, in bytes.
+
+    A closure retains its function object and the activation environment of the
+    `make` call it's created in.
+    """
+    ax_lang = AxLang(engine=engine)
+    ast = get_ast(CHAIN.format(count=count), typed=True)
+    ax_lang.eval(ast)  # compile and cache before measuring
+    gc.collect()
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    head = ax_lang.eval(ast)
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert head is not None
+    return (end - start) / count
+
+
+def compare_engines(count: int = 10000) -> pd.DataFrame:
+    """Compares memory per retained closure of a chain of closures by engine."""
+    rows = [
+        {"engine": engine, "bytes_per_closure": chain_memory(engine, count)}
+        for engine in ENGINES
+    ]
+    return pd.DataFrame(rows).set_index("engine")
@@ -0,0 +1,38 @@
+import time
+
+import pandas as pd
+from ax_lang.interpreter.ax_lang import AxLang
+from ax_lang.parser.parser import get_ast
+
+# Call-heavy program: every evaluated list node but `if` is a function call
+FIB = "(begin (def fib (n) (if (< n 2) n (+ (fib (- n 1)) (fib (- n 2))))) (fib 18))"
+
+
+def time_dispatch(forms: int, engine: str = "tree", repeat: int = 5) -> float:
+    """Returns the best time of the call-heavy program with extra special forms."""
+    ax_lang = AxLang(engine=engine)
+    for i in range(forms):
+        ax_lang.register_special_form(f"form_{i}", lambda expr, env: None)
+    ast = get_ast(FIB, typed=True)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ax_lang.eval(ast)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def compare_dispatch(
+    form_counts: list[int], engine: str = "tree", repeat: int = 5
+) -> pd.DataFrame:
+    """Times call dispatch with a growing number of registered special forms.
+
+    With a dispatch table the time doesn't depend on the number of forms.
+    """
+    rows = [
+        {"registered_forms": forms, "ms": time_dispatch(forms, engine, repeat) * 1000}
+        for forms in form_counts
+    ]
+    df = pd.DataFrame(rows).set_index("registered_forms")
+    df["relative"] = df["ms"] / df["ms"].iloc[0]
+    return df
@@ -0,0 +1,41 @@
+import contextlib
+import io
+import time
+
+import pandas as pd
+from ax_lang.interpreter.ax_lang import AxLang
+from ax_lang.parser.cache import ASTCache
+from ax_lang.utils import get_examples_root
+
+
+def time_engine(engine: str, test_case: str, repeat: int = 20) -> float:
+    """Returns the best in-process execution time of an example with an engine.
+
+    Parsing is excluded: the AST is parsed once and every run evaluates it with a new
+    interpreter. Output of the example is discarded.
+    """
+    path = get_examples_root() / "axlang" / f"{test_case}.ax"
+    ast = ASTCache(enabled=False).get_ast(path, typed=True)
+    best = float("inf")
+    for _ in range(repeat):
+        ax_lang = AxLang(engine=engine)
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            ax_lang.eval(ast)
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def compare_engines(
+    engines: list[str], tests: list[str], repeat: int = 20
+) -> pd.DataFrame:
+    """Times examples with every engine, with speedups relative to the first engine."""
+    rows = []
+    for test in tests:
+        row = {"test_case": test}
+        for engine in engines:
+            row[f"{engine}_ms"] = time_engine(engine, test, repeat) * 1000
+        for engine in engines[1:]:
+            row[f"{engine}_speedup"] = row[f"{engines[0]}_ms"] / row[f"{engine}_ms"]
+        rows.append(row)
+    return pd.DataFrame(rows).set_index("test_case")
@@ -0,0 +1,75 @@
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+from ax_lang.interpreter.ax_lang import ENGINES, AxLang
+from ax_lang.parser.parser import get_ast
+
+
+def write_modules(directory: Path, modules: int = 20, definitions: int = 200) -> str:
+    """Writes generated modules to a directory.
+
+    Every module `mod<i>.ax` declares `definitions` functions and a table of constants
+    computed at load time.
+
+    Returns:
+        Script importing all the modules and calling one function of the first one
+    """
+    for i in range(modules):
+        forms = [f"(def f{j} (x) (+ (* x {j}) {i}))" for j in range(definitions)]
+        forms += [f"(var c{j} (f{j} {j}))" for j in range(definitions)]
+        (directory / f"mod{i}.ax").write_text("\n".join(forms))
+    imports = " ".join(f"(import mod{i})" for i in range(modules))
+    return f"(begin {imports} ((prop mod0 f1) 41))"
+
+
+def time_startup(
+    engine: str, eager_imports: bool, directory: Path, script: str, repeat: int = 5
+) -> float:
+    """Returns the best time of a script importing the modules of a directory.
+
+    Every run imports the modules with a new interpreter, the parsed modules come
+    from the AST cache.
+    """
+    ast = get_ast(script, typed=True)
+    best = float("inf")
+    for _ in range(repeat):
+        ax_lang = AxLang(
+            engine=engine, module_path=[directory], eager_imports=eager_imports
+        )
+        start = time.process_time()
+        ax_lang.eval(ast)
+        best = min(best, time.process_time() - start)
+    return best
+
+
+def compare_imports(
+    engines: list[str] = ENGINES,
+    modules: int = 20,
+    definitions: int = 200,
+    repeat: int = 5,
+) -> pd.DataFrame:
+    """Times a script importing many modules and using one function, eager and lazy.
+
+    Returns:
+        Startup time in ms of eager and lazy imports by engine
+    """
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        script = write_modules(directory, modules, definitions)
+        # fills the AST cache
+        AxLang(module_path=[directory], eager_imports=True).eval(get_ast(script))
+        for engine in engines:
+            eager = time_startup(engine, True, directory, script, repeat)
+            lazy = time_startup(engine, False, directory, script, repeat)
+            rows.append(
+                {
+                    "engine": engine,
+                    "eager_ms": eager * 1000,
+                    "lazy_ms": lazy * 1000,
+                    "speedup": eager / lazy,
+                }
+            )
+    return pd.DataFrame(rows).set_index("engine")
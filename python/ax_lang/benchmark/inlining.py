@@ -0,0 +1,41 @@
+import time
+
+import pandas as pd
+from ax_lang.interpreter.ax_lang import CLOSURE_ENGINE, AxLang
+from ax_lang.parser.parser import get_ast
+
+# Loop calling the small helpers of modules/math.ax
+HELPERS = """
+(begin
+    (def abs (value) (if (< value 0) (- value) value))
+    (def square (x) (* x x))
+    (var sum 0)
+    (for (var i 0) (< i 20000) (++ i)
+        (set sum (+ sum (abs (- (square i) (square (- i 50)))))))
+    sum)
+"""
+
+
+def time_inlining(inline_threshold: int, repeat: int = 5) -> tuple[float, int]:
+    """Returns the best time of the helper loop and the number of inlined call sites."""
+    ax_lang = AxLang(engine=CLOSURE_ENGINE, inline_threshold=inline_threshold)
+    ast = get_ast(HELPERS, typed=True)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.process_time()
+        ax_lang.eval(ast)
+        best = min(best, time.process_time() - start)
+    return best, ax_lang.compiler.inlined.total() // repeat
+
+
+def compare_inlining(thresholds: list[int], repeat: int = 5) -> pd.DataFrame:
+    """Times the helper loop of the `closure` engine with inline thresholds."""
+    rows = []
+    for threshold in thresholds:
+        best, inlined = time_inlining(threshold, repeat)
+        rows.append(
+            {"inline_threshold": threshold, "inlined_calls": inlined, "ms": best * 1000}
+        )
+    df = pd.DataFrame(rows).set_index("inline_threshold")
+    df["relative"] = df["ms"] / df["ms"].iloc[0]
+    return df
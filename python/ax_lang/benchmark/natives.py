@@ -0,0 +1,96 @@
+import time
+import types
+
+import pandas as pd
+from ax_lang.interpreter.ax_lang import ENGINES, AxLang
+from ax_lang.interpreter.environment import Environment, GlobalEnvironment
+from ax_lang.interpreter.natives import BINARY_OPERATORS
+from ax_lang.parser.parser import get_ast
+
+# Loop running an operation per iteration, `{op}` is replaced with the operation
+LOOP = """
+(begin
+    (var i 0)
+    (var x 1)
+    (while (< i {iterations})
+        (begin
+            {op}
+            (set i (+ i 1))))
+    x)
+"""
+
+# Operations timed by `compare_natives`
+OPERATIONS = {
+    "empty loop": "null",
+    "(+ x i)": "(+ x i)",
+    "(< x i)": "(< x i)",
+    "(* (+ x 1) 2)": "(* (+ x 1) 2)",
+    "(++ x)": "(++ x)",
+    "(+= x i)": "(+= x i)",
+    "(+ (+ (+ x i) i) i)": "(+ (+ (+ x i) i) i)",
+    "(+ x i i i)": "(+ x i i i)",
+    "(< (- i 1) i (+ i 1))": "(< (- i 1) i (+ i 1))",
+}
+
+
+def rebound_env() -> Environment:
+    """Returns an environment binding the operators to copies of the native functions.
+
+    The copies run the same code as the built-in functions, but the engines don't
+    recognize them, so every operator is called as an ordinary native function.
+    """
+    record = {}
+    for name in BINARY_OPERATORS:
+        fn = GlobalEnvironment.record[name]
+        record[name] = types.FunctionType(
+            fn.__code__, fn.__globals__, fn.__name__, fn.__defaults__, fn.__closure__
+        )
+    return Environment(record, GlobalEnvironment)
+
+
+def time_loop(
+    engine: str, op: str, iterations: int = 20000, repeat: int = 5
+) -> tuple[float, float]:
+    """Returns the best times of the loop running an operation, in seconds.
+
+    Returns:
+        Times with the operators called as native functions and with the fast paths
+    """
+    ax_lang = AxLang(engine=engine)
+    ast = ax_lang.lower(get_ast(LOOP.format(op=op, iterations=iterations), typed=True))
+    parents = (rebound_env(), GlobalEnvironment)
+    best = [float("inf")] * len(parents)
+    for _ in range(repeat):
+        # alternated, so that both are equally affected by the machine load
+        for i, parent in enumerate(parents):
+            env = Environment({}, parent)
+            start = time.process_time()
+            ax_lang.eval(ast, env)
+            best[i] = min(best[i], time.process_time() - start)
+    return best[0], best[1]
+
+
+def compare_natives(
+    engines: list[str] = ENGINES, iterations: int = 20000, repeat: int = 5
+) -> pd.DataFrame:
+    """Times operations with the fast paths of the built-in operators and without.
+
+    Returns:
+        Time of a loop iteration running the operation in ns by engine and operation,
+        the iteration itself compares and increments the counter (see the empty loop)
+    """
+    rows = []
+    for engine in engines:
+        for name, op in OPERATIONS.items():
+            generic, fast = time_loop(engine, op, iterations, repeat)
+            rows.append(
+                {
+                    "engine": engine,
+                    "operation": name,
+                    "generic_ns": generic / iterations * 1e9,
+                    "fast_ns": fast / iterations * 1e9,
+                }
+            )
+    df = pd.DataFrame(rows).set_index(["engine", "operation"])
+    df["speedup"] = df["generic_ns"] / df["fast_ns"]
+    return df
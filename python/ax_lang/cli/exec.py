@@ -4,13 +4,19 @@ import readline  # command history support for Unix/Mac
 import click
 from ax_lang.cli.multiline import is_expression_complete
 from ax_lang.exceptions import InterpreterError, ParserError
-from ax_lang.interpreter.ax_lang import AxLang
+from ax_lang.interpreter.bytecode import BytecodeCompiler, disassemble
+from ax_lang.interpreter.ax_lang import CLOSURE_ENGINE, ENGINES, TREE_ENGINE, AxLang
+from ax_lang.interpreter.cek import DEFAULT_MEMORY_BUDGET
+from ax_lang.interpreter.functions import Function
+from ax_lang.interpreter.tracing import LoggingTracer
+from ax_lang.parser.cache import ASTCache
+from ax_lang.parser.nodes import to_source
 from ax_lang.parser.parser import get_ast
 
 
 def eval_expression(lang, expr):
     block_expr = f"(begin {expr})"
-    ast = get_ast(block_expr)
+    ast = get_ast(block_expr, typed=True)
     return lang.eval(ast)
 
 
@@ -27,44 +33,209 @@ def cli(ctx, debug):
         repl(debug)
 
 
+engine_option = click.option(
+    "--engine",
+    type=click.Choice(ENGINES),
+    default=TREE_ENGINE,
+    show_default=True,
+    help="Execution engine",
+)
+
+memory_budget_option = click.option(
+    "--memory-budget",
+    type=click.IntRange(min=1),
+    default=DEFAULT_MEMORY_BUDGET,
+    show_default=True,
+    help="Memory for the continuation stack of the `cek` engine, in bytes",
+)
+
+optimize_option = click.option(
+    "--optimize",
+    is_flag=True,
+    help="Fold constant expressions and remove dead branches before execution",
+)
+
+module_path_option = click.option(
+    "--module-path",
+    multiple=True,
+    type=click.Path(exists=True, file_okay=False),
+    help="Directory searched for imported modules before the `AXPATH` ones and the "
+    "standard library (can be repeated)",
+)
+
+eager_imports_option = click.option(
+    "--eager-imports",
+    is_flag=True,
+    help="Load imported modules at the `import` instead of on their first access, "
+    "e.g. to get the errors of module bodies at the import",
+)
+
+print_optimized_option = click.option(
+    "--print-optimized",
+    is_flag=True,
+    help="Optimize and print the AST before and after the optimization to stderr",
+)
+
+
+def echo_optimized(before, after):
+    click.echo(f"Before: {to_source(before)}", err=True)
+    click.echo(f"After:  {to_source(after)}", err=True)
+
+
+def create_ax_lang(print_optimized_ast: bool = False, **kwargs) -> AxLang:
+    ax_lang = AxLang(**kwargs)
+    if print_optimized_ast:
+        ax_lang.optimizer.on_optimize = echo_optimized
+    return ax_lang
+
+
 @cli.command()
 @click.argument("expression")
 @click.option("--debug", is_flag=True, help="Enable debug logging")
-def expr(expression, debug):
+@engine_option
+@memory_budget_option
+@optimize_option
+@print_optimized_option
+@module_path_option
+@eager_imports_option
+def expr(
+    expression,
+    debug,
+    engine,
+    memory_budget,
+    optimize,
+    print_optimized,
+    module_path,
+    eager_imports,
+):
     """Execute an AxLang expression directly.
 
     Examples:
         axlang expr "((lambda (x) (* x x)) 2)"
         axlang expr "((lambda (x) (* x x)) 2)" --debug
+        axlang expr "(* (* 60 60) 24)" --print-optimized
+        axlang expr "(import geometry) ((prop geometry area) 2)" --module-path lib
     """
+    if debug and engine != TREE_ENGINE:
+        raise click.UsageError(f"--debug requires the `{TREE_ENGINE}` engine")
+
+    ax_lang = create_ax_lang(
+        print_optimized,
+        engine=engine,
+        memory_budget=memory_budget,
+        optimize=optimize or print_optimized,
+        module_path=module_path,
+        eager_imports=eager_imports,
+    )
     if debug:
         logging.basicConfig(level=logging.DEBUG)
-
-    ax_lang = AxLang()
+        ax_lang.set_tracer(LoggingTracer())
     result = eval_expression(ax_lang, expression)
     click.echo(result)
 
 
 @cli.command()
 @click.argument("filepath", type=click.Path(exists=True))
-def file(filepath):
+@click.option("--no-cache", is_flag=True, help="Always parse, don't use the AST cache")
+@click.option("--purge-cache", is_flag=True, help="Remove the cached AST of the file")
+@click.option(
+    "--hash-cons",
+    is_flag=True,
+    help="Share identical subtrees of the AST and report the sharing to stderr",
+)
+@click.option(
+    "--inline-threshold",
+    type=click.IntRange(min=0),
+    default=0,
+    help="Inline calls of functions with at most this number of AST nodes in the body "
+    "(`closure` engine) and report the inlined call sites to stderr",
+)
+@click.option(
+    "--import-stats",
+    is_flag=True,
+    help="Report the imported modules and their load and evaluation time to stderr",
+)
+@engine_option
+@memory_budget_option
+@optimize_option
+@print_optimized_option
+@module_path_option
+@eager_imports_option
+def file(
+    filepath,
+    no_cache,
+    purge_cache,
+    hash_cons,
+    inline_threshold,
+    import_stats,
+    engine,
+    memory_budget,
+    optimize,
+    print_optimized,
+    module_path,
+    eager_imports,
+):
     """Execute an AxLang file.
 
-    Example: axlang file examples/test.ax
+    Examples:
+        axlang file examples/test.ax
+        axlang file examples/test.ax --engine closure
+        axlang file examples/test.ax --engine cek --memory-budget 1000000
+        axlang file examples/test.ax --hash-cons
+        axlang file examples/test.ax --optimize
+        axlang file examples/test.ax --engine closure --inline-threshold 20
+        axlang file examples/test.ax --module-path lib --import-stats
+        axlang file examples/test.ax --module-path lib --eager-imports
     """
-    ax_lang = AxLang()
-    with open(filepath) as file:
-        file_src = file.read()
-    result = eval_expression(ax_lang, file_src)
+    if inline_threshold and engine != CLOSURE_ENGINE:
+        raise click.UsageError(
+            f"--inline-threshold requires the `{CLOSURE_ENGINE}` engine"
+        )
+    ast_cache = ASTCache(enabled=not no_cache)
+    if purge_cache:
+        ast_cache.purge(filepath)
+    ax_lang = create_ax_lang(
+        print_optimized,
+        ast_cache=ast_cache,
+        engine=engine,
+        memory_budget=memory_budget,
+        hash_cons=hash_cons,
+        optimize=optimize or print_optimized,
+        inline_threshold=inline_threshold,
+        module_path=module_path,
+        eager_imports=eager_imports,
+    )
+    result = ax_lang.eval_forms(ast_cache.iter_forms(filepath, typed=True))
     click.echo(result)
+    if hash_cons:
+        click.echo(ax_lang.hash_conser.stats(), err=True)
+    if inline_threshold:
+        inlined = ax_lang.compiler.inlined
+        sites = ", ".join(f"{name} {count}" for name, count in inlined.most_common())
+        click.echo(f"Inlined {inlined.total()} call sites: {sites or '-'}", err=True)
+    if import_stats:
+        for stats in ax_lang.modules.stats():
+            click.echo(f"Imported {stats}", err=True)
+
+
+@cli.command()
+@click.argument("filepath", type=click.Path(exists=True))
+def disasm(filepath):
+    """Show the bytecode the `vm` engine executes for an AxLang file.
+
+    Example: axlang disasm examples/test.ax
+    """
+    ast = ASTCache().get_ast(filepath, typed=True)
+    code = BytecodeCompiler(AxLang()).compile(ast, "<module>")
+    click.echo(disassemble(code))
 
 
 def repl(is_debug: bool = False):
     """Start the AxLang interactive REPL."""
+    lang = AxLang()
     if is_debug:
         logging.basicConfig(level=logging.DEBUG)
-
-    lang = AxLang()
+        lang.set_tracer(LoggingTracer())
 
     click.echo("AxLang Interactive Interpreter")
     click.echo('Type "exit", "quit", or "q" to leave the REPL')
@@ -113,10 +284,10 @@ def repl(is_debug: bool = False):
 
             # Evaluate and print result
             # Parse the expression without wrapping in begin to maintain state
-            expr = get_ast(accumulated_input)
+            expr = get_ast(accumulated_input, typed=True)
             result = lang.eval(expr)
-            if not isinstance(result, dict):
-                # dict is evaluated expression - don't print
+            if not isinstance(result, Function):
+                # a function declaration - don't print
                 click.echo(result)
 
         except EOFError:
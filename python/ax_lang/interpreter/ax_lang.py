@@ -1,13 +1,55 @@
-import logging
 import re
 import types
 from numbers import Number
-
+from typing import Any, Callable, Iterable
+
+from ax_lang.exceptions import InterpreterError
+from ax_lang.interpreter.cek import DEFAULT_MEMORY_BUDGET, CEKMachine
+from ax_lang.interpreter.classes import (
+    Class,
+    declare_fields,
+    enclosing_class,
+    new_instance,
+    split_fields,
+)
+from ax_lang.interpreter.compiler import ClosureCompiler
 from ax_lang.interpreter.environment import Environment, GlobalEnvironment
+from ax_lang.interpreter.functions import Function
+from ax_lang.interpreter.lowering import Block, Lowering
+from ax_lang.interpreter.natives import (
+    BINARY_OPERATORS,
+    NATIVE_FUNCTIONS,
+    NATIVE_OPERATORS,
+    fused_assignment,
+)
+from ax_lang.interpreter.optimizer import Optimizer
+from ax_lang.interpreter.registry import ModuleRegistry
+from ax_lang.interpreter.resolver import Resolver
+from ax_lang.interpreter.tracing import Tracer
 from ax_lang.interpreter.transformer import Transformer
-from ax_lang.parser.parser import get_ast
-
-logger = logging.getLogger(__name__)
+from ax_lang.interpreter.vm import VM
+from ax_lang.parser.cache import ASTCache
+from ax_lang.parser.compact import CompactAST
+from ax_lang.parser.hashcons import HashConser
+from ax_lang.parser.nodes import String, Symbol
+
+TREE_ENGINE = "tree"
+CLOSURE_ENGINE = "closure"
+VM_ENGINE = "vm"
+CEK_ENGINE = "cek"
+ENGINES = (TREE_ENGINE, CLOSURE_ENGINE, VM_ENGINE, CEK_ENGINE)
+
+# Special forms of the language (including syntactic sugar)
+# fmt: off
+SPECIAL_FORMS = frozenset({
+    "var", "set", "begin", "if", "while", "def", "switch", "for", "++", "--", "+=",
+    "-=", "*=", "lambda", "class", "super", "new", "prop", "module", "import",
+})
+# fmt: on
+
+# Handler of a special form added with `AxLang.register_special_form`: takes the
+# unevaluated expression and the environment, returns the value
+SpecialForm = Callable[[list, Environment], Any]
 
 
 class AxLang:
@@ -16,12 +58,104 @@ class AxLang:
     Evaluates Abstract Syntax Trees (AST) produced by the parser and executes
     ax-lang programs using environment-based variable scoping, first-class functions,
     and object-oriented programming features.
+
+    With the `closure` engine, expressions are compiled into Python closures
+    (see `ClosureCompiler`) before they are executed instead of being walked, with the
+    `vm` engine into bytecode executed by a stack VM (see `VM`). The `cek` engine
+    evaluates the AST with continuations on an explicit stack (see `CEKMachine`), so
+    deep recursion is not limited by the Python stack.
     """
 
-    def __init__(self):
-        """Creates an ax-lang instance with global environment."""
+    def __init__(
+        self,
+        ast_cache: ASTCache = None,
+        engine: str = TREE_ENGINE,
+        memory_budget: int = DEFAULT_MEMORY_BUDGET,
+        hash_cons: bool = False,
+        optimize: bool = False,
+        inline_threshold: int = 0,
+        module_path: Iterable[str] = (),
+        eager_imports: bool = False,
+    ):
+        """Creates an ax-lang instance with global environment.
+
+        Args:
+            ast_cache: Cache of parsed module sources (a new enabled cache by default)
+            engine: Execution engine, `tree` (tree-walking), `closure`, `vm` or `cek`
+            memory_budget: Memory the continuation stack of the `cek` engine may use,
+                in bytes
+            hash_cons: If True, structurally identical subtrees of programs and
+                modules are shared after lowering (see `HashConser`)
+            optimize: If True, constant expressions of programs and modules are folded
+                and their dead branches removed after lowering (see `Optimizer`)
+            inline_threshold: Calls of functions whose body has at most this number
+                of AST nodes are inlined by the `closure` engine (see
+                `ClosureCompiler`), 0 disables inlining
+            module_path: Directories searched for imported modules before the
+                `AXPATH` ones and the standard library (see `ModuleRegistry`)
+            eager_imports: If True, `import` loads a module at once instead of
+                binding a proxy loading it on its first access (see `LazyModule`),
+                e.g. to get the errors of the module body at the import
+
+        Raises:
+            InterpreterError: If the engine is not supported
+        """
+        if engine not in ENGINES:
+            raise InterpreterError(f"Unsupported engine `{engine}`!")
         self.global_env = GlobalEnvironment
         self.transformer = Transformer()
+        # special forms added with `register_special_form`
+        self.custom_forms: dict[str, SpecialForm] = {}
+        self.lowering = Lowering(self.transformer, self.custom_forms)
+        self.ast_cache = ast_cache or ASTCache()
+        self.modules = ModuleRegistry(module_path)
+        self.eager_imports = eager_imports
+        self.hash_conser = HashConser() if hash_cons else None
+        self.engine = engine
+        self.compiler = (
+            ClosureCompiler(self, inline_threshold)
+            if engine == CLOSURE_ENGINE
+            else None
+        )
+        self.vm = VM(self) if engine == VM_ENGINE else None
+        self.machine = CEKMachine(self, memory_budget) if engine == CEK_ENGINE else None
+        # receives evaluation events of the tree-walking engine, see `set_tracer`
+        self.tracer: Tracer | None = None
+        self.optimizer = (
+            Optimizer(Resolver(self.transformer), self.custom_forms)
+            if optimize
+            else None
+        )
+        # head symbol -> (handler, whether it's a tail form) of the tree-walking engine
+        transformer = self.transformer
+        self._special_forms: dict[str, tuple[Callable, bool]] = {
+            "var": (self._eval_var, False),
+            "set": (self._eval_set, False),
+            "begin": (self._eval_begin, True),
+            "if": (self._eval_if, True),
+            "while": (self._eval_while, False),
+            "def": (self._eval_sugar(transformer.def_to_lambda), True),
+            "switch": (self._eval_sugar(transformer.switch_to_if), True),
+            "for": (self._eval_sugar(transformer.for_to_while), True),
+            "++": (self._eval_sugar(transformer.inc_to_set), True),
+            "--": (self._eval_sugar(transformer.dec_to_set), True),
+            "+=": (self._eval_sugar(transformer.plus_assign_to_set), True),
+            "-=": (self._eval_sugar(transformer.minus_assign_to_set), True),
+            "*=": (self._eval_sugar(transformer.multi_assign_to_set), True),
+            "lambda": (self._eval_lambda, False),
+            "class": (self._eval_class, False),
+            "super": (self._eval_super, False),
+            "new": (self._eval_new, False),
+            "prop": (self._eval_prop, False),
+            "module": (self._eval_module, False),
+            "import": (self._eval_import, False),
+        }
+        # evaluation function of a compiled engine, None for the tree-walking one
+        self._execute = {
+            CLOSURE_ENGINE: self._execute_closure,
+            VM_ENGINE: self._execute_vm,
+            CEK_ENGINE: self.machine.run if self.machine else None,
+        }.get(engine)
 
     def _is_variable_name(self, expr):
         return isinstance(expr, str) and bool(
@@ -29,223 +163,407 @@ class AxLang:
         )
 
     def _is_function_name(self, expr):
-        # fmt: off
-        native_function_names = {"+", "-", "*", "/", ">", ">=", "<", "<=", "==", "print"}
-        # fmt: on
-        return isinstance(expr, str) and expr in native_function_names
+        return isinstance(expr, str) and expr in NATIVE_FUNCTIONS
 
     def _eval_block(self, block, env):
-        logger.debug(f"Evaluating block=`{block}`...")
         rez = None
         for expr in block:
             rez = self.eval(expr, env)
         return rez
 
+    def _eval_block_init(self, block, env):
+        # evaluates all expressions of a non-empty block but the last one, which is in
+        # tail position, and returns it
+        self._eval_block(block[:-1], env)
+        return block[-1]
+
+    def _eval_body_init(self, body, env):
+        if isinstance(body, list) and body[0] == "begin":
+            return self._eval_block_init(body[1:], env)
+        return body
+
     def _eval_body(self, body, env):
-        if body[0] == "begin":
+        if isinstance(body, list) and body[0] == "begin":
             return self._eval_block(body[1:], env)
-        logger.debug(f"Evaluating body: `{body}`...")
         return self.eval(body, env)
 
+    def _operand(self, expr, env):
+        # value of an operand of a built-in operator, atoms without a round of `eval`
+        expr_type = type(expr)
+        if expr_type is Symbol:
+            return env.lookup(expr)
+        if expr_type is int or expr_type is float:
+            return expr
+        return self.eval(expr, env)
+
+    def _execute_closure(self, expr, env):
+        return self.compiler.compile(expr)(env)
+
+    def _execute_vm(self, expr, env):
+        return self.vm.run(self.vm.compiler.compile(expr), env)
+
+    def _load_module(self, path):
+        return self._prepare(self.ast_cache.get_ast(path, typed=True))
+
+    def _eval_module_body(self, name, body):
+        # modules are evaluated once, in an environment of their own: the module form
+        # defines the module in it
+        return self.eval(["module", name, body], Environment({}, self.global_env))
+
+    def _prepare(self, expr, env: Environment = None, complete: bool = True):
+        # the stages run once on every program, form and module before evaluation, `env`
+        # is the environment it's evaluated in (unknown for modules), `complete` is False
+        # for a form followed by forms that aren't read yet (see `Optimizer.optimize`)
+        expr = self.lower(expr)
+        if self.optimizer is not None:
+            expr = self.optimizer.optimize(expr, env, complete)
+        if self.hash_conser is not None:
+            expr = self.hash_conser.share(expr)
+        return expr
+
+    def _activation_env(self, fn: Function, eval_args):
+        return Environment(fn.bind(eval_args), fn.env)
+
     def _call_user_defined_function(self, fn, eval_args):
-        activation_record = {}
-        for i, param in enumerate(fn["params"]):
-            activation_record[param] = eval_args[i]
-        activation_env = Environment(activation_record, fn["env"])
-        return self._eval_body(fn["body"], activation_env)
+        if self.tracer is not None:
+            self.tracer.on_call(fn, eval_args)
+        rez = self._eval_body(fn.body, self._activation_env(fn, eval_args))
+        if self.tracer is not None:
+            self.tracer.on_return(fn, rez)
+        return rez
 
-    def eval(self, expr: Number | str | list, env: Environment = None):
-        """Evaluates an expression in the given environment.
+    # Special forms of the tree-walking engine. A value form returns the value of the
+    # expression, a tail form returns the expression in tail position with its
+    # environment (None for a form evaluating to null), evaluated by the `eval` loop.
+
+    def _eval_var(self, expr, env):
+        _, name, value_expr = expr
+        value = env.define(name, self.eval(value_expr, env))
+        if type(value) is Function and value.name is None:
+            value.name = name
+        if self.tracer is not None:
+            self.tracer.on_define(env, name, value)
+        return value
+
+    def _eval_set(self, expr, env):
+        _, ref, value_expr = expr
+
+        # Assignment to property
+        if ref[0] == "prop":
+            _, instance, prop_name = ref
+            instance_env = self.eval(instance, env)
+            value = instance_env.define(prop_name, self.eval(value_expr, env))
+            if self.tracer is not None:
+                self.tracer.on_define(instance_env, prop_name, value)
+            return value
+
+        if self.tracer is None:
+            fused = fused_assignment(expr)
+            if fused is not None:
+                op_name, operand = fused
+                var_env = env.resolve(ref)
+                if env.lookup(op_name) is NATIVE_OPERATORS[op_name]:
+                    # `(set x (op x k))` reads and writes `x` in its environment
+                    value = BINARY_OPERATORS[op_name](
+                        var_env.record[ref], self._operand(operand, env)
+                    )
+                    if not isinstance(operand, list):
+                        return var_env.define(ref, value)
+                    # the operand may have declared `x` closer
+                    return env.assign(ref, value)
+
+        return env.assign(ref, self.eval(value_expr, env))
+
+    def _eval_begin(self, expr, env):
+        # Block: sequence of expressions
+        if len(expr) == 1:
+            return None
+        if type(expr) is not Block:
+            env = Environment({}, env)
+        return self._eval_block_init(expr[1:], env), env
+
+    def _eval_if(self, expr, env):
+        _, condition, consequent, alternate = expr
+        return (consequent if self.eval(condition, env) else alternate), env
+
+    def _eval_while(self, expr, env):
+        _, condition, body = expr
+        value = None
+        while self.eval(condition, env):
+            value = self.eval(body, env)
+        return value
+
+    def _eval_sugar(self, transform):
+        # JIT-transpiles syntactic sugar into a core form (see `Transformer`)
+        return lambda expr, env: (transform(expr), env)
+
+    def _eval_lambda(self, expr, env):
+        _, params, body = expr
+        return Function(params, body, env)
+
+    def _eval_class(self, expr, env):
+        # Class declaration (class name parent body)
+        _, name, parent, body = expr
+        fields, body = split_fields(body)
+        parent_env = self.eval(parent, env) or env
+        class_env = Class(name, parent_env)
+        if fields:
+            declare_fields(class_env, fields)
+        # body is evaluated in the class environment
+        self._eval_body(body, class_env)
+        # Class is accessible by name
+        value = env.define(name, class_env)
+        if self.tracer is not None:
+            self.tracer.on_define(env, name, value)
+        return value
+
+    def _eval_super(self, expr, env):
+        # Super expressions (super <class_name>)
+        _, class_name = expr
+        # the class whose body the expression is in isn't looked up by name
+        class_env = isinstance(class_name, str) and enclosing_class(env, class_name)
+        return (class_env or self.eval(class_name, env)).parent
 
-        Args:
-            expr: AST node (number, string, or list) to evaluate
-            env: Environment for evaluation (defaults to global)
+    def _eval_new(self, expr, env):
+        # Class instantiation (new class arguments)
+        class_env = self.eval(expr[1], env)
+        # An instance of class is an environment with properties laid out by a shape
+        instance_env = new_instance(class_env)
+        eval_args = [self.eval(arg, env) for arg in expr[2:]]
+        self._call_user_defined_function(
+            class_env.lookup("constructor"), [instance_env, *eval_args]
+        )
+        return instance_env
 
-        Returns:
-            Result of evaluation - can be a number, string, dict (for functions/classes),
-            or Environment (for class instances)
+    def _eval_prop(self, expr, env):
+        # property access: (prop <instance> <name>)
+        _, instance, name = expr
+        instance_env = self.eval(instance, env)
+        return instance_env.lookup(name)
+
+    def _eval_module(self, expr, env):
+        # module declaration: (module <name> <body>)
+        _, name, body = expr
+        module_env = Environment({}, env)
+        self._eval_body(body, module_env)
+        value = env.define(name, module_env)
+        if self.tracer is not None:
+            self.tracer.on_define(env, name, value)
+        return value
+
+    def _eval_import(self, expr, env):
+        # module import: (import <name>)
+        _, name = expr
+        value = env.define(name, self.import_module(name))
+        if self.tracer is not None:
+            self.tracer.on_define(env, name, value)
+        return value
+
+    def import_module(self, name: str) -> Environment:
+        """Returns the environment of a module, loading it on the first import.
+
+        Unless `eager_imports` is set, a module that isn't loaded yet is returned as a
+        `LazyModule` proxy, loading the module on its first access.
 
         Raises:
-            ValueError: If a variable is not defined
-            NotImplementedError: If an expression type is not supported
+            InterpreterError: If the module is not found in the search path or is
+                imported by itself
         """
-        logger.debug(f"Expr: {expr}")
-        env = self.global_env if env is None else env
-        # Self-evaluating expressions:
-        if isinstance(expr, Number):
-            return expr
+        return self.modules.load(
+            name,
+            self._load_module,
+            lambda body: self._eval_module_body(name, body),
+            lazy=not self.eager_imports,
+        )
 
-        if isinstance(expr, str):
-            if expr[0] == '"' and expr[-1] == '"':
-                return expr[1:-1]
+    def register_special_form(self, name: str, handler: SpecialForm) -> None:
+        """Adds a special form to the language of this instance.
 
-        # Variable declaration:
-        if expr[0] == "var":
-            _, name, value = expr
-            return env.define(name, self.eval(value, env))
+        The handler receives the expression of the form unevaluated, e.g.
+        `(unless c a b)` as `["unless", "c", "a", "b"]`, with the environment it is
+        evaluated in, and evaluates the parts it needs with `eval(part, env)`. A form
+        is recognized by a single lookup of its head symbol in every engine, before
+        the expression is treated as a function call.
 
-        # Variable update:
-        if expr[0] == "set":
-            _, ref, value = expr
+        Args:
+            name: Head symbol of the form
+            handler: Callable taking the expression and the environment and returning
+                the value of the form
 
-            # Assignment to property
-            if ref[0] == "prop":
-                _, instance, prop_name = ref
-                instance_env = self.eval(instance, env)
-                return instance_env.define(prop_name, self.eval(value, env))
+        Raises:
+            InterpreterError: If the name is a built-in special form
+        """
+        if name in SPECIAL_FORMS:
+            raise InterpreterError(f"Special form `{name}` is built in!")
+        self.custom_forms[name] = handler
+        self._special_forms[name] = (handler, False)
 
-            return env.assign(ref, self.eval(value, env))
+    def set_tracer(self, tracer: Tracer | None) -> None:
+        """Installs a tracer receiving evaluation events, None removes it.
 
-        # Variable access:
-        if self._is_variable_name(expr):
-            return env.lookup(expr)
+        Args:
+            tracer: Tracer with handlers of the events, e.g. `LoggingTracer`
 
-        # Block: sequence of expressions
-        if expr[0] == "begin":
-            block_env = Environment({}, env)
-            return self._eval_block(expr[1:], block_env)
-
-        # if-expression
-        if expr[0] == "if":
-            _, condition, consequent, alternate = expr
-            if self.eval(condition, env):
-                return self.eval(consequent, env)
-            return self.eval(alternate, env)
-
-        # while-expression
-        if expr[0] == "while":
-            _, condition, body = expr
-            rez = None
-            while self.eval(condition, env):
-                rez = self.eval(body, env)
-            return rez
-
-        # build-in functions
-        if self._is_function_name(expr):
-            return env.lookup(expr)
+        Raises:
+            InterpreterError: If the engine is not the tree-walking one
+        """
+        if tracer is not None and self.engine != TREE_ENGINE:
+            raise InterpreterError(
+                f"Tracing is supported by the `{TREE_ENGINE}` engine only!"
+            )
+        self.tracer = tracer
 
-        # function declaration
-        if expr[0] == "def":
-            # JIT-transpile to a variable declaration
-            var_expr = self.transformer.def_to_lambda(expr)
-            return self.eval(var_expr, env)
-
-        # switch-expression (syntactic sugar for if-expression)
-        if expr[0] == "switch":
-            if_exp = self.transformer.switch_to_if(expr)
-            return self.eval(if_exp, env)
-
-        # for-loop (syntactic sugar for while-loop)
-        if expr[0] == "for":
-            while_exp = self.transformer.for_to_while(expr)
-            return self.eval(while_exp, env)
-
-        # ++ (syntactic sugar for set operation)
-        if expr[0] == "++":
-            set_exp = self.transformer.inc_to_set(expr)
-            return self.eval(set_exp, env)
-
-        # ++ (syntactic sugar for set operation)
-        if expr[0] == "--":
-            set_exp = self.transformer.dec_to_set(expr)
-            return self.eval(set_exp, env)
-
-        # += (syntactic sugar for set operation)
-        if expr[0] == "+=":
-            set_exp = self.transformer.plus_assign_to_set(expr)
-            return self.eval(set_exp, env)
-
-        # -= (syntactic sugar for set operation)
-        if expr[0] == "-=":
-            set_exp = self.transformer.minus_assign_to_set(expr)
-            return self.eval(set_exp, env)
-
-        # *= (syntactic sugar for set operation)
-        if expr[0] == "*=":
-            set_exp = self.transformer.multi_assign_to_set(expr)
-            return self.eval(set_exp, env)
-
-        # lambda declaration
-        if expr[0] == "lambda":
-            _, params, body = expr
-            rez_lambda = {
-                "params": params,
-                "body": body,
-                "env": env,
-            }
-            logger.debug(f"Evaluated lambda: `{rez_lambda}`...")
-            return rez_lambda
+    def lower(self, expr: Number | str | list) -> Number | str | list:
+        """Transforms all syntactic sugar of an expression into core forms.
 
-        # Class declaration (class name parent body)
-        if expr[0] == "class":
-            _, name, parent, body = expr
-            parent_env = self.eval(parent, env) or env
-            class_env = Environment({}, parent_env)
-            # body is evaluated in the class environment
-            self._eval_body(body, class_env)
-            # Class is accessible by name
-            return env.define(name, class_env)
+        Args:
+            expr: AST node (number, string, or list) to lower
 
-        # Super expressions (super <class_name>)
-        if expr[0] == "super":
-            _, class_name = expr
-            return self.eval(class_name, env).parent
+        Returns:
+            Lowered AST node, see `Lowering.lower`
+        """
+        return self.lowering.lower(expr)
 
-        # Class instantiation (new class arguments)
-        if expr[0] == "new":
-            class_env = self.eval(expr[1], env)
-            # An instance of class is an environment
-            instance_env = Environment({}, class_env)
-            eval_args = [self.eval(arg, env) for arg in expr[2:]]
-            self._call_user_defined_function(
-                class_env.lookup("constructor"), [instance_env, *eval_args]
-            )
-            return instance_env
+    def eval_forms(self, forms: Iterable, env: Environment = None):
+        """Evaluates top-level forms one at a time as a single block.
 
-        # property access: (prop <instance> <name>)
-        if expr[0] == "prop":
-            _, instance, name = expr
-            instance_env = self.eval(instance, env)
-            return instance_env.lookup(name)
+        Gives the same result as evaluating `["begin", *forms]`, but the forms are
+        consumed lazily, so each form is evaluated before the next one is read.
 
-        # module declaration: (module <name> <body>)
-        if expr[0] == "module":
-            _, name, body = expr
-            module_env = Environment({}, env)
-            self._eval_body(body, module_env)
-            return env.define(name, module_env)
+        Args:
+            forms: AST nodes of the top-level forms, e.g. `ASTCache.iter_forms`
+            env: Environment the block is evaluated in (defaults to global)
 
-        # module import: (import <name>)
-        if expr[0] == "import":
-            _, name = expr
-
-            module_src = None
-            local_dirs = __file__.split("/")
-            local_dirs = local_dirs[: (len(local_dirs) - 1)]
-            local_path = "/".join(local_dirs)
-            with open(f"{local_path}/modules/{name}.ax") as f:
-                module_src = f.read()
-
-            body = get_ast(f"(begin {module_src})")
-            module_expr = ["module", name, body]
-            return self.eval(module_expr, env)
-
-        # Function calls:
-        if isinstance(expr, list):
-            fn = self.eval(expr[0], env)
-            logger.debug(f"Processing fn: `{fn}`...")
+        Returns:
+            Result of the last form, None if there are no forms
+        """
+        env = self.global_env if env is None else env
+        block_env = Environment({}, env)
+        rez = None
+        for expr in forms:
+            rez = self.eval(self._prepare(expr, block_env, False), block_env)
+        return rez
+
+    def eval(self, expr: Number | str | list | CompactAST, env: Environment = None):
+        """Evaluates an expression in the given environment.
+
+        Args:
+            expr: AST node (number, string, or list) to evaluate. A `CompactAST` is
+                decoded into the typed AST first
+            env: Environment for evaluation (defaults to global). Without it the
+                expression is a program: its syntactic sugar is lowered once before it
+                is evaluated (see `lower`), with `optimize` its constant expressions are
+                folded and, with `hash_cons`, its identical subtrees are shared
+
+        Returns:
+            Result of evaluation - can be a number, string, `Function` (for
+            user-defined functions), or Environment (for classes, modules and class
+            instances)
+
+        Raises:
+            ValueError: If a variable is not defined
+            InterpreterError: If a function is called with a wrong number of arguments
+            NotImplementedError: If an expression type is not supported
+        """
+        if isinstance(expr, CompactAST):
+            expr = expr.to_ast()
+        if env is None:
+            env = self.global_env
+            expr = self._prepare(expr, env)
+        if self._execute is not None:
+            return self._execute(expr, env)
+
+        # Expressions in tail position are evaluated by the next iteration instead of a
+        # recursive call, so tail calls don't grow the Python stack.
+        tracer = self.tracer
+        # with a tracer: exit and return events of the expressions entered and the
+        # functions called by this evaluation, reported when its value is known
+        trace = None if tracer is None else []
+        special_forms = self._special_forms
+        while True:
+            if tracer is not None:
+                tracer.on_enter(expr, env)
+                trace.append((tracer.on_exit, expr))
+            # Atoms of the typed AST (see `ax_lang.parser.nodes`):
+            expr_type = type(expr)
+            if expr_type is Symbol:
+                value = env.lookup(expr)
+                break
+            if expr_type is String:
+                value = expr.value
+                break
+
+            if expr_type is not list and not isinstance(expr, list):
+                # Self-evaluating expressions:
+                if isinstance(expr, Number):
+                    value = expr
+                    break
+                if isinstance(expr, str):
+                    if expr[0] == '"' and expr[-1] == '"':
+                        value = expr[1:-1]
+                        break
+                    # Variable access and build-in functions:
+                    if self._is_variable_name(expr) or self._is_function_name(expr):
+                        value = env.lookup(expr)
+                        break
+                raise NotImplementedError(expr)
+
+            head = expr[0]
+            if isinstance(head, str):
+                # Special forms: a single lookup of the head symbol
+                form = special_forms.get(head)
+                if form is not None:
+                    handler, tail = form
+                    if not tail:
+                        value = handler(expr, env)
+                        break
+                    continuation = handler(expr, env)
+                    if continuation is None:
+                        value = None
+                        break
+                    expr, env = continuation
+                    continue
+
+                # Built-in functions: called directly while the head is bound to the
+                # native function, operators of two operands applied (without a tracer,
+                # which reports the call)
+                native = NATIVE_FUNCTIONS.get(head) if tracer is None else None
+                if native is not None and env.lookup(head) is native.fn:
+                    if len(expr) == 3 and native.operator is not None:
+                        value = native.operator(
+                            self._operand(expr[1], env), self._operand(expr[2], env)
+                        )
+                    else:
+                        value = native.fn(*[self._operand(a, env) for a in expr[1:]])
+                    break
+
+            # Function calls:
+            fn = self.eval(head, env)
             eval_args = [self.eval(arg, env) for arg in expr[1:]]
+            if tracer is not None:
+                tracer.on_call(fn, eval_args)
 
             # 1. Native functions
             if isinstance(fn, types.FunctionType):
-                logger.debug(f"Applying fn: `{fn.__name__}` to args: `{eval_args}`...")
-                return fn(*eval_args)
+                value = fn(*eval_args)
+                if tracer is not None:
+                    tracer.on_return(fn, value)
+                break
 
             # 2. User-defined functions
-            # it's type dict here
-            if isinstance(fn, dict):
-                logger.debug(f"Processing User-defined function `{fn}`...")
-                return self._call_user_defined_function(fn, eval_args)
+            if type(fn) is Function:
+                if tracer is not None:
+                    trace.append((tracer.on_return, fn))
+                env = self._activation_env(fn, eval_args)
+                if fn.body == ["begin"]:
+                    value = None
+                    break
+                expr = self._eval_body_init(fn.body, env)
+                continue
 
             raise NotImplementedError(fn)
-        raise NotImplementedError(expr)
+
+        if tracer is not None:
+            for report, subject in reversed(trace):
+                report(subject, value)
+        return value
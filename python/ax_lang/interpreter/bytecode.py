@@ -0,0 +1,476 @@
+from array import array
+from numbers import Number
+from typing import TYPE_CHECKING, Any, Callable
+
+from ax_lang.interpreter.classes import split_fields
+from ax_lang.interpreter.lowering import Block
+from ax_lang.interpreter.natives import BINARY_OPERATORS
+from ax_lang.interpreter.shapes import PropertyCache
+from ax_lang.parser.nodes import String, Symbol
+
+if TYPE_CHECKING:
+    from ax_lang.interpreter.ax_lang import AxLang
+
+# Opcodes of the ax-lang stack VM. Every instruction has a single integer operand,
+# instructions that don't need it have 0.
+# fmt: off
+LOAD_CONST = 0       # push consts[arg]
+LOAD_NAME = 1        # push the value of variable names[arg]
+STORE_NAME = 2       # define names[arg] in the current environment to TOS, keep TOS
+ASSIGN_NAME = 3      # update the existing variable names[arg] to TOS, keep TOS
+GET_PROP = 4         # replace the instance on TOS with its property names[arg]
+SET_PROP = 5         # define property names[arg] of TOS1 to TOS, push the value
+POP_TOP = 6          # drop TOS
+JUMP = 7             # continue with instruction arg
+JUMP_IF_FALSE = 8    # pop TOS, continue with instruction arg if it's falsy
+PUSH_SCOPE = 9       # enter a new block environment
+POP_SCOPE = 10       # leave the block environment
+MAKE_FUNCTION = 11   # push a function of code consts[arg] closed over the environment
+CALL = 12            # call TOS[arg] with the arg values above it
+MAKE_CLASS = 13      # define class of body consts[arg] with the parent on TOS
+SUPER = 14           # replace the class on TOS with its parent
+NEW = 15             # instantiate class TOS[arg] with the arg values above it
+MAKE_MODULE = 16     # define module of body consts[arg]
+IMPORT = 17          # load and define module names[arg]
+RETURN_VALUE = 18    # return TOS
+NOT_IMPLEMENTED = 19  # raise NotImplementedError(consts[arg])
+TAIL_CALL = 20       # CALL whose result is returned: a user-defined function replaces
+# the running code in the VM loop
+SPECIAL_FORM = 21    # push the value of the registered special form consts[arg]
+BINARY_OP = 22       # apply built-in operator names[arg] to TOS1 and TOS, a CALL of
+# the function bound to the name if it's rebound
+LOAD_SUPER = 23      # push the parent of the class names[arg] whose body is running (or
+# of the value of the variable names[arg] outside of the class body)
+DECLARE_FIELDS = 24  # declare the fields consts[arg] of the class whose body is running
+# fmt: on
+
+OPNAMES = [
+    "LOAD_CONST",
+    "LOAD_NAME",
+    "STORE_NAME",
+    "ASSIGN_NAME",
+    "GET_PROP",
+    "SET_PROP",
+    "POP_TOP",
+    "JUMP",
+    "JUMP_IF_FALSE",
+    "PUSH_SCOPE",
+    "POP_SCOPE",
+    "MAKE_FUNCTION",
+    "CALL",
+    "MAKE_CLASS",
+    "SUPER",
+    "NEW",
+    "MAKE_MODULE",
+    "IMPORT",
+    "RETURN_VALUE",
+    "NOT_IMPLEMENTED",
+    "TAIL_CALL",
+    "SPECIAL_FORM",
+    "BINARY_OP",
+    "LOAD_SUPER",
+    "DECLARE_FIELDS",
+]
+
+_CONST_OPS = {
+    LOAD_CONST,
+    MAKE_FUNCTION,
+    MAKE_CLASS,
+    MAKE_MODULE,
+    NOT_IMPLEMENTED,
+    SPECIAL_FORM,
+    DECLARE_FIELDS,
+}
+_NAME_OPS = {
+    LOAD_NAME,
+    STORE_NAME,
+    ASSIGN_NAME,
+    GET_PROP,
+    SET_PROP,
+    IMPORT,
+    BINARY_OP,
+    LOAD_SUPER,
+}
+_JUMP_OPS = {JUMP, JUMP_IF_FALSE}
+
+
+class CodeObject:
+    """Compiled bytecode of an expression, a function body, a class or a module body.
+
+    Opcodes are stored in a `bytes` buffer and their operands in a parallel `array`,
+    constants (numbers, strings, nested code objects) in a constant pool and variable
+    and property names in a name table. GET_PROP and SET_PROP instructions have an
+    inline cache (see `PropertyCache`) in the parallel list `caches`.
+    """
+
+    __slots__ = (
+        "name",
+        "opcodes",
+        "operands",
+        "consts",
+        "names",
+        "caches",
+        "params",
+        "body",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        opcodes: bytes,
+        operands: array,
+        consts: tuple,
+        names: tuple,
+        params: tuple = None,
+        body: Any = None,
+    ):
+        self.name = name
+        self.opcodes = opcodes
+        self.operands = operands
+        self.consts = consts
+        self.names = names
+        self.caches = [
+            PropertyCache(names[arg]) if opcode in (GET_PROP, SET_PROP) else None
+            for opcode, arg in zip(opcodes, operands)
+        ]
+        # for function bodies: tuple of parameter names and the AST of the body
+        self.params = params
+        self.body = body
+
+    def __repr__(self):
+        return f"<code {self.name}>"
+
+
+class _Assembler:
+    def __init__(self, name: str):
+        self.name = name
+        self.opcodes = bytearray()
+        self.operands = array("i")
+        self.consts = []
+        self._const_index = {}
+        self.names = []
+        self._name_index = {}
+
+    def emit(self, opcode: int, arg: int = 0) -> int:
+        self.opcodes.append(opcode)
+        self.operands.append(arg)
+        return len(self.opcodes) - 1
+
+    def position(self) -> int:
+        return len(self.opcodes)
+
+    def patch(self, instruction: int, target: int) -> None:
+        self.operands[instruction] = target
+
+    def const(self, value) -> int:
+        # 1, 1.0 and True are equal, so the type is a part of the key
+        try:
+            key = (type(value), value)
+            index = self._const_index.get(key)
+        except TypeError:  # unhashable, e.g. a list
+            key, index = None, None
+        if index is None:
+            index = len(self.consts)
+            self.consts.append(value)
+            if key is not None:
+                self._const_index[key] = index
+        return index
+
+    def name_index(self, name: str) -> int:
+        index = self._name_index.get(name)
+        if index is None:
+            index = self._name_index[name] = len(self.names)
+            self.names.append(name)
+        return index
+
+    def mark_tail_calls(self) -> None:
+        """Replaces calls in tail position with TAIL_CALL.
+
+        A call is in tail position if only jumps and scope exits are executed between
+        it and RETURN_VALUE.
+        """
+        opcodes = self.opcodes
+        for pc, opcode in enumerate(opcodes):
+            if opcode != CALL:
+                continue
+            target = pc + 1
+            visited = set()
+            while opcodes[target] in (JUMP, POP_SCOPE) and target not in visited:
+                visited.add(target)
+                if opcodes[target] == JUMP:
+                    target = self.operands[target]
+                else:
+                    target += 1
+            if opcodes[target] == RETURN_VALUE:
+                opcodes[pc] = TAIL_CALL
+
+    def build(self, params: tuple = None, body: Any = None) -> CodeObject:
+        self.mark_tail_calls()
+        return CodeObject(
+            self.name,
+            bytes(self.opcodes),
+            self.operands,
+            tuple(self.consts),
+            tuple(self.names),
+            params,
+            body,
+        )
+
+
+class BytecodeCompiler:
+    """Compiles AST into bytecode for the `vm` engine.
+
+    Special forms are compiled into stack instructions, syntactic sugar is transformed
+    at compile time and function, class and module bodies become nested code objects
+    in the constant pool. Calls in tail position are compiled to TAIL_CALL, calls of
+    the built-in binary operators (`BINARY_OPERATORS`) to BINARY_OP.
+    """
+
+    def __init__(self, ax_lang: "AxLang"):
+        """Creates a compiler for an ax-lang instance.
+
+        Args:
+            ax_lang: Interpreter providing the transformer and name classification
+        """
+        self.ax_lang = ax_lang
+        self.transformer = ax_lang.transformer
+        self._special_forms: dict[str, Callable[[list, _Assembler], None]] = {
+            "var": self._emit_var,
+            "set": self._emit_set,
+            "begin": self._emit_begin,
+            "if": self._emit_if,
+            "while": self._emit_while,
+            "def": self._emit_sugar(self.transformer.def_to_lambda),
+            "switch": self._emit_sugar(self.transformer.switch_to_if),
+            "for": self._emit_sugar(self.transformer.for_to_while),
+            "++": self._emit_sugar(self.transformer.inc_to_set),
+            "--": self._emit_sugar(self.transformer.dec_to_set),
+            "+=": self._emit_sugar(self.transformer.plus_assign_to_set),
+            "-=": self._emit_sugar(self.transformer.minus_assign_to_set),
+            "*=": self._emit_sugar(self.transformer.multi_assign_to_set),
+            "lambda": self._emit_lambda,
+            "class": self._emit_class,
+            "super": self._emit_super,
+            "new": self._emit_new,
+            "prop": self._emit_prop,
+            "module": self._emit_module,
+            "import": self._emit_import,
+        }
+
+    def compile(self, expr: Number | str | list, name: str = "<expr>") -> CodeObject:
+        """Compiles an expression into a code object returning its value."""
+        asm = _Assembler(name)
+        self._emit(expr, asm)
+        asm.emit(RETURN_VALUE)
+        return asm.build()
+
+    def compile_body(
+        self,
+        body: Number | str | list,
+        name: str = "<body>",
+        params: list = None,
+        fields: tuple = (),
+    ) -> CodeObject:
+        """Compiles a function, class or module body.
+
+        A `begin` body is run directly in the environment of the function, class or
+        module instead of a new block environment. The `fields` of a class body (see
+        `split_fields`) are declared before its statements run.
+        """
+        asm = _Assembler(name)
+        if fields:
+            asm.emit(DECLARE_FIELDS, asm.const(fields))
+        if isinstance(body, list) and body and body[0] == "begin":
+            self._emit_sequence(body[1:], asm)
+        else:
+            self._emit(body, asm)
+        asm.emit(RETURN_VALUE)
+        return asm.build(None if params is None else tuple(params), body)
+
+    def _emit(self, expr, asm: _Assembler) -> None:
+        # typed atoms are classified by the parser
+        if type(expr) is Symbol:
+            asm.emit(LOAD_NAME, asm.name_index(expr))
+            return
+        if type(expr) is String:
+            asm.emit(LOAD_CONST, asm.const(expr.value))
+            return
+
+        if isinstance(expr, Number):
+            asm.emit(LOAD_CONST, asm.const(expr))
+            return
+
+        if isinstance(expr, str):
+            if expr[0] == '"' and expr[-1] == '"':
+                asm.emit(LOAD_CONST, asm.const(expr[1:-1]))
+            elif self.ax_lang._is_variable_name(expr) or self.ax_lang._is_function_name(
+                expr
+            ):
+                asm.emit(LOAD_NAME, asm.name_index(expr))
+            else:
+                asm.emit(NOT_IMPLEMENTED, asm.const(expr))
+            return
+
+        if isinstance(expr, list) and expr and isinstance(expr[0], str):
+            emit_special_form = self._special_forms.get(expr[0])
+            if emit_special_form is not None:
+                emit_special_form(expr, asm)
+                return
+            if expr[0] in self.ax_lang.custom_forms:
+                asm.emit(SPECIAL_FORM, asm.const(expr))
+                return
+
+        if not isinstance(expr, list):
+            asm.emit(NOT_IMPLEMENTED, asm.const(expr))
+            return
+
+        # Calls of built-in operators: a single instruction instead of loading the
+        # operator and calling it
+        if len(expr) == 3 and isinstance(expr[0], str) and expr[0] in BINARY_OPERATORS:
+            self._emit(expr[1], asm)
+            self._emit(expr[2], asm)
+            asm.emit(BINARY_OP, asm.name_index(expr[0]))
+            return
+
+        # Function calls:
+        for e in expr:
+            self._emit(e, asm)
+        asm.emit(CALL, len(expr) - 1)
+
+    def _emit_sequence(self, exprs: list, asm: _Assembler) -> None:
+        if not exprs:
+            asm.emit(LOAD_CONST, asm.const(None))
+            return
+        for i, expr in enumerate(exprs):
+            if i:
+                asm.emit(POP_TOP)
+            self._emit(expr, asm)
+
+    def _emit_sugar(self, transform: Callable[[list], list]) -> Callable:
+        return lambda expr, asm: self._emit(transform(expr), asm)
+
+    def _emit_var(self, expr: list, asm: _Assembler) -> None:
+        _, name, value = expr
+        if isinstance(value, list) and value and value[0] == "lambda":
+            # name the code of functions declared with `def` after the function
+            self._emit_lambda(value, asm, name)
+        else:
+            self._emit(value, asm)
+        asm.emit(STORE_NAME, asm.name_index(name))
+
+    def _emit_set(self, expr: list, asm: _Assembler) -> None:
+        _, ref, value = expr
+        # Assignment to property
+        if isinstance(ref, list) and ref and ref[0] == "prop":
+            _, instance, prop_name = ref
+            self._emit(instance, asm)
+            self._emit(value, asm)
+            asm.emit(SET_PROP, asm.name_index(prop_name))
+            return
+        self._emit(value, asm)
+        asm.emit(ASSIGN_NAME, asm.name_index(str(ref)))
+
+    def _emit_begin(self, expr: list, asm: _Assembler) -> None:
+        if type(expr) is Block:
+            # declares nothing, runs in the enclosing environment
+            self._emit_sequence(expr[1:], asm)
+            return
+        asm.emit(PUSH_SCOPE)
+        self._emit_sequence(expr[1:], asm)
+        asm.emit(POP_SCOPE)
+
+    def _emit_if(self, expr: list, asm: _Assembler) -> None:
+        _, condition, consequent, alternate = expr
+        self._emit(condition, asm)
+        jump_to_alternate = asm.emit(JUMP_IF_FALSE)
+        self._emit(consequent, asm)
+        jump_to_end = asm.emit(JUMP)
+        asm.patch(jump_to_alternate, asm.position())
+        self._emit(alternate, asm)
+        asm.patch(jump_to_end, asm.position())
+
+    def _emit_while(self, expr: list, asm: _Assembler) -> None:
+        _, condition, body = expr
+        # the result of the last iteration stays on the stack
+        asm.emit(LOAD_CONST, asm.const(None))
+        loop = asm.position()
+        self._emit(condition, asm)
+        jump_to_end = asm.emit(JUMP_IF_FALSE)
+        asm.emit(POP_TOP)
+        self._emit(body, asm)
+        asm.emit(JUMP, loop)
+        asm.patch(jump_to_end, asm.position())
+
+    def _emit_lambda(self, expr: list, asm: _Assembler, name: str = "<lambda>") -> None:
+        _, params, body = expr
+        code = self.compile_body(body, name, params)
+        asm.emit(MAKE_FUNCTION, asm.const(code))
+
+    def _emit_class(self, expr: list, asm: _Assembler) -> None:
+        _, name, parent, body = expr
+        fields, body = split_fields(body)
+        self._emit(parent, asm)
+        asm.emit(MAKE_CLASS, asm.const(self.compile_body(body, name, fields=fields)))
+
+    def _emit_super(self, expr: list, asm: _Assembler) -> None:
+        _, class_name = expr
+        if isinstance(class_name, str):
+            asm.emit(LOAD_SUPER, asm.name_index(class_name))
+            return
+        self._emit(class_name, asm)
+        asm.emit(SUPER)
+
+    def _emit_new(self, expr: list, asm: _Assembler) -> None:
+        for e in expr[1:]:
+            self._emit(e, asm)
+        asm.emit(NEW, len(expr) - 2)
+
+    def _emit_prop(self, expr: list, asm: _Assembler) -> None:
+        _, instance, name = expr
+        self._emit(instance, asm)
+        asm.emit(GET_PROP, asm.name_index(name))
+
+    def _emit_module(self, expr: list, asm: _Assembler) -> None:
+        _, name, body = expr
+        asm.emit(MAKE_MODULE, asm.const(self.compile_body(body, name)))
+
+    def _emit_import(self, expr: list, asm: _Assembler) -> None:
+        _, name = expr
+        asm.emit(IMPORT, asm.name_index(name))
+
+
+def _format_operand(code: CodeObject, opcode: int, arg: int) -> str:
+    if opcode in _CONST_OPS:
+        return f"{arg} ({code.consts[arg]!r})"
+    if opcode in _NAME_OPS:
+        return f"{arg} ({code.names[arg]})"
+    if opcode in _JUMP_OPS:
+        return f"to {arg}"
+    if opcode in (CALL, TAIL_CALL, NEW):
+        return str(arg)
+    return ""
+
+
+def disassemble(code: CodeObject) -> str:
+    """Returns a human-readable listing of a code object and its nested code objects.
+
+    Example:
+        >>> print(disassemble(compiler.compile(["inc", "x"])))
+        Disassembly of <code <expr>>:
+           0 LOAD_NAME         0 (inc)
+           1 LOAD_NAME         1 (x)
+           2 TAIL_CALL         1
+           3 RETURN_VALUE
+    """
+    lines = [f"Disassembly of {code!r}:"]
+    if code.params is not None:
+        lines.append(f"  params: {' '.join(map(str, code.params))}")
+    for pc, (opcode, arg) in enumerate(zip(code.opcodes, code.operands)):
+        lines.append(
+            f"{pc:>4} {OPNAMES[opcode]:<16} {_format_operand(code, opcode, arg)}".rstrip()
+        )
+    for const in code.consts:
+        if isinstance(const, CodeObject):
+            lines.append("")
+            lines.append(disassemble(const))
+    return "\n".join(lines)
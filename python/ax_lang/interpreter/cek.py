@@ -0,0 +1,380 @@
+import types
+from numbers import Number
+from typing import TYPE_CHECKING, Any
+
+from ax_lang.exceptions import InterpreterError
+from ax_lang.interpreter.classes import (
+    Class,
+    declare_fields,
+    enclosing_class,
+    new_instance,
+    split_fields,
+)
+from ax_lang.interpreter.environment import Environment
+from ax_lang.interpreter.functions import Function
+from ax_lang.interpreter.lowering import Block
+from ax_lang.interpreter.natives import BINARY_OPERATORS, NATIVE_OPERATORS
+from ax_lang.parser.nodes import String, Symbol
+
+if TYPE_CHECKING:
+    from ax_lang.interpreter.ax_lang import AxLang
+
+# Default memory budget of the continuation stack, in bytes
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+# Approximate size of a continuation frame with the values it holds, in bytes
+FRAME_SIZE = 128
+
+# Kinds of continuation frames: what to do with the value of the expression being
+# evaluated. A frame is a tuple starting with its kind.
+# fmt: off
+_ARGS = 0         # (kind, call expr, values, env): evaluate the next part of a call
+_RETURN = 1       # (kind, function name): return from a user-defined function
+_IF = 2           # (kind, consequent, alternate, env): choose a branch
+_BLOCK = 3        # (kind, exprs, index, env): evaluate the next block expression
+_VAR = 4          # (kind, name, env): define a variable
+_ASSIGN = 5       # (kind, name, env): update a variable
+_SET_PROP = 6     # (kind, value expr, prop name, env): evaluate the property value
+_PROP_VALUE = 7   # (kind, instance, prop name): define the property
+_WHILE_COND = 8   # (kind, while expr, env, result): run the body if true
+_WHILE_BODY = 9   # (kind, while expr, env): check the condition again
+_CLASS = 10       # (kind, class expr, env): create the class with the parent
+_DEFINE = 11      # (kind, name, class or module env, env): define it by name
+_SUPER = 12       # (kind,): take the parent of the class
+_NEW = 13         # (kind, new expr, values, env): evaluate the next part of new
+_VALUE = 14       # (kind, value): replace the value, e.g. with the new instance
+_PROP = 15        # (kind, prop name): look up the property of the instance
+# fmt: on
+
+# Types of the typed AST atoms evaluated without continuation frames
+_ATOMS = frozenset({Symbol, int, float})
+
+# Number of functions shown at both ends of the call chain of a stack overflow
+_CHAIN_ENDS = 5
+
+
+def _body_exprs(body) -> list:
+    # a `begin` body is run directly in the function, class or module environment
+    if isinstance(body, list) and body and body[0] == "begin":
+        return body[1:]
+    return [body]
+
+
+def _function_name(fn_expr) -> str:
+    if isinstance(fn_expr, str):
+        return fn_expr
+    if isinstance(fn_expr, list) and len(fn_expr) == 3 and fn_expr[0] == "prop":
+        return str(fn_expr[2])
+    return "<lambda>"
+
+
+class CEKMachine:
+    """Evaluator of the `cek` engine keeping continuations on an explicit stack.
+
+    The machine state is the expression being evaluated (Control), its environment
+    (Environment) and a list of continuation frames (Kontinuation) instead of the
+    Python call stack, so the depth of recursion is bounded by the memory budget of
+    the continuation stack rather than by the Python recursion limit. Frames are not
+    pushed for expressions in tail position, so tail calls run in constant space.
+    """
+
+    def __init__(self, ax_lang: "AxLang", memory_budget: int = DEFAULT_MEMORY_BUDGET):
+        """Creates a machine for an ax-lang instance.
+
+        Args:
+            ax_lang: Interpreter providing the transformer and the module loading
+            memory_budget: Memory the continuation stack may use, in bytes, each frame
+                is accounted as `FRAME_SIZE` bytes
+        """
+        self.ax_lang = ax_lang
+        self.memory_budget = memory_budget
+        self.max_frames = memory_budget // FRAME_SIZE
+        transformer = ax_lang.transformer
+        self._sugar = {
+            "def": transformer.def_to_lambda,
+            "switch": transformer.switch_to_if,
+            "for": transformer.for_to_while,
+            "++": transformer.inc_to_set,
+            "--": transformer.dec_to_set,
+            "+=": transformer.plus_assign_to_set,
+            "-=": transformer.minus_assign_to_set,
+            "*=": transformer.multi_assign_to_set,
+        }
+
+    def run(self, expr: Number | str | list, env: Environment) -> Any:
+        """Evaluates an expression in an environment.
+
+        Raises:
+            InterpreterError: If the continuation stack exceeds the memory budget or a
+                function is called with a wrong number of arguments
+            ValueError: If a variable is not defined
+            NotImplementedError: If an expression type is not supported
+        """
+        ax_lang = self.ax_lang
+        sugar = self._sugar
+        max_frames = self.max_frames
+        function_type = types.FunctionType
+        stack = []
+        push = stack.append
+        pop = stack.pop
+
+        while True:
+            # 1. Evaluate the expression until it is a value or a subexpression has to
+            # be evaluated first
+            expr_type = type(expr)
+            if expr_type is Symbol:
+                value = env.lookup(expr)
+            elif expr_type is String:
+                value = expr.value
+            elif isinstance(expr, Number):
+                value = expr
+            elif isinstance(expr, str):
+                if expr[0] == '"' and expr[-1] == '"':
+                    value = expr[1:-1]
+                elif ax_lang._is_variable_name(expr) or ax_lang._is_function_name(expr):
+                    value = env.lookup(expr)
+                else:
+                    raise NotImplementedError(expr)
+            else:
+                head = expr[0]
+                if head == "if":
+                    push((_IF, expr[2], expr[3], env))
+                    expr = expr[1]
+                    continue
+                if head == "var":
+                    push((_VAR, expr[1], env))
+                    expr = expr[2]
+                    continue
+                if head == "set":
+                    _, ref, value_expr = expr
+                    if isinstance(ref, list) and ref[0] == "prop":
+                        push((_SET_PROP, value_expr, ref[2], env))
+                        expr = ref[1]
+                    else:
+                        push((_ASSIGN, ref, env))
+                        expr = value_expr
+                    continue
+                if head == "begin":
+                    exprs = expr[1:]
+                    if exprs:
+                        if type(expr) is not Block:
+                            env = Environment({}, env)
+                        if len(exprs) > 1:
+                            push((_BLOCK, exprs, 1, env))
+                        expr = exprs[0]
+                        continue
+                    value = None
+                elif head == "while":
+                    push((_WHILE_COND, expr, env, None))
+                    expr = expr[1]
+                    continue
+                elif head == "lambda":
+                    _, params, body = expr
+                    value = Function(params, body, env)
+                elif isinstance(head, str) and head in sugar:
+                    expr = sugar[head](expr)
+                    continue
+                elif head == "class":
+                    push((_CLASS, expr, env))
+                    expr = expr[2]
+                    continue
+                elif head == "super":
+                    class_name = expr[1]
+                    # the class whose body the expression is in isn't looked up by name
+                    class_env = isinstance(class_name, str) and enclosing_class(
+                        env, class_name
+                    )
+                    if not class_env:
+                        push((_SUPER,))
+                        expr = class_name
+                        continue
+                    value = class_env.parent
+                elif head == "new":
+                    push((_NEW, expr, [], env))
+                    expr = expr[1]
+                    continue
+                elif head == "prop":
+                    push((_PROP, expr[2]))
+                    expr = expr[1]
+                    continue
+                elif head == "module":
+                    _, name, body = expr
+                    module_env = Environment({}, env)
+                    push((_DEFINE, name, module_env, env))
+                    exprs = _body_exprs(body)
+                    if exprs:
+                        if len(exprs) > 1:
+                            push((_BLOCK, exprs, 1, module_env))
+                        expr, env = exprs[0], module_env
+                        continue
+                    value = None
+                elif head == "import":
+                    name = expr[1]
+                    value = env.define(name, ax_lang.import_module(name))
+                elif isinstance(head, str) and head in ax_lang.custom_forms:
+                    value = ax_lang.custom_forms[head](expr, env)
+                elif (
+                    len(expr) == 3
+                    and isinstance(head, str)
+                    and head in BINARY_OPERATORS
+                    and type(expr[1]) in _ATOMS
+                    and type(expr[2]) in _ATOMS
+                    and env.lookup(head) is NATIVE_OPERATORS[head]
+                ):
+                    # Built-in operator of variables and numbers: applied without
+                    # continuation frames
+                    left, right = expr[1], expr[2]
+                    value = BINARY_OPERATORS[head](
+                        env.lookup(left) if type(left) is Symbol else left,
+                        env.lookup(right) if type(right) is Symbol else right,
+                    )
+                else:
+                    # Function calls: the function expression, then the arguments
+                    push((_ARGS, expr, [], env))
+                    expr = head
+                    continue
+
+            # 2. Pass the value to the continuation frames until one of them needs
+            # another expression to be evaluated
+            while stack:
+                frame = pop()
+                kind = frame[0]
+
+                if kind == _ARGS:
+                    _, call_expr, values, call_env = frame
+                    values.append(value)
+                    if len(values) < len(call_expr):
+                        push(frame)
+                        expr, env = call_expr[len(values)], call_env
+                        break
+                    fn, *args = values
+                    # 1. Native functions
+                    if isinstance(fn, function_type):
+                        value = fn(*args)
+                        continue
+                    # 2. User-defined functions
+                    if type(fn) is not Function:
+                        raise NotImplementedError(fn)
+                    if stack and stack[-1][0] == _RETURN:
+                        # a call in tail position returns from the caller
+                        pop()
+                    push((_RETURN, _function_name(call_expr[0])))
+                    if len(stack) > max_frames:
+                        self._overflow(stack)
+                    env = ax_lang._activation_env(fn, args)
+                    exprs = _body_exprs(fn.body)
+                    if not exprs:
+                        value = None
+                        continue
+                    if len(exprs) > 1:
+                        push((_BLOCK, exprs, 1, env))
+                    expr = exprs[0]
+                    break
+
+                if kind == _RETURN:
+                    continue
+
+                if kind == _IF:
+                    _, consequent, alternate, env = frame
+                    expr = consequent if value else alternate
+                    break
+
+                if kind == _BLOCK:
+                    _, exprs, index, env = frame
+                    if index + 1 < len(exprs):
+                        push((_BLOCK, exprs, index + 1, env))
+                    expr = exprs[index]
+                    break
+
+                if kind == _VAR:
+                    value = frame[2].define(frame[1], value)
+                    if type(value) is Function and value.name is None:
+                        value.name = frame[1]
+                elif kind == _ASSIGN:
+                    value = frame[2].assign(frame[1], value)
+                elif kind == _SET_PROP:
+                    _, value_expr, prop_name, env = frame
+                    push((_PROP_VALUE, value, prop_name))
+                    expr = value_expr
+                    break
+                elif kind == _PROP_VALUE:
+                    value = frame[1].define(frame[2], value)
+                elif kind == _WHILE_COND:
+                    _, while_expr, env, rez = frame
+                    if not value:
+                        value = rez
+                        continue
+                    push((_WHILE_BODY, while_expr, env))
+                    expr = while_expr[2]
+                    break
+                elif kind == _WHILE_BODY:
+                    _, while_expr, env = frame
+                    push((_WHILE_COND, while_expr, env, value))
+                    expr = while_expr[1]
+                    break
+                elif kind == _CLASS:
+                    _, (_, name, _, body), env = frame
+                    fields, body = split_fields(body)
+                    parent_env = value or env
+                    class_env = Class(name, parent_env)
+                    if fields:
+                        declare_fields(class_env, fields)
+                    push((_DEFINE, name, class_env, env))
+                    # body is evaluated in the class environment
+                    exprs = _body_exprs(body)
+                    if not exprs:
+                        value = None
+                        continue
+                    if len(exprs) > 1:
+                        push((_BLOCK, exprs, 1, class_env))
+                    expr, env = exprs[0], class_env
+                    break
+                elif kind == _DEFINE:
+                    _, name, defined_env, define_env = frame
+                    value = define_env.define(name, defined_env)
+                elif kind == _SUPER:
+                    value = value.parent
+                elif kind == _PROP:
+                    value = value.lookup(frame[1])
+                elif kind == _NEW:
+                    _, new_expr, values, new_env = frame
+                    values.append(value)
+                    if len(values) < len(new_expr) - 1:
+                        push(frame)
+                        expr, env = new_expr[len(values) + 1], new_env
+                        break
+                    class_env, *args = values
+                    # An instance of class is an environment with a shape
+                    instance_env = new_instance(class_env)
+                    push((_VALUE, instance_env))
+                    push((_RETURN, "constructor"))
+                    if len(stack) > max_frames:
+                        self._overflow(stack)
+                    constructor = class_env.lookup("constructor")
+                    env = ax_lang._activation_env(constructor, [instance_env, *args])
+                    exprs = _body_exprs(constructor.body)
+                    if not exprs:
+                        value = None
+                        continue
+                    if len(exprs) > 1:
+                        push((_BLOCK, exprs, 1, env))
+                    expr = exprs[0]
+                    break
+                elif kind == _VALUE:
+                    value = frame[1]
+            else:
+                return value
+
+    def _overflow(self, stack: list):
+        chain = [frame[1] for frame in stack if frame[0] == _RETURN]
+        if len(chain) > 2 * _CHAIN_ENDS:
+            skipped = len(chain) - 2 * _CHAIN_ENDS
+            chain = [
+                *chain[:_CHAIN_ENDS],
+                f"... {skipped} more calls ...",
+                *chain[-_CHAIN_ENDS:],
+            ]
+        calls = "\n".join(f"  {name}" for name in chain)
+        raise InterpreterError(
+            f"Stack overflow: recursion exceeds the memory budget of "
+            f"{self.memory_budget} bytes. Call chain (innermost last):\n{calls}"
+        )
@@ -0,0 +1,165 @@
+import copy
+from numbers import Number
+from weakref import WeakSet
+
+from ax_lang.exceptions import InterpreterError
+from ax_lang.interpreter.environment import Environment
+from ax_lang.interpreter.shapes import FieldInstance, Instance, field_instance_type
+
+# Marks a name missing from a method table
+_MISSING = object()
+
+
+class Class(Environment):
+    """Environment of a class: its members, with the parent class as the parent.
+
+    Members of the class and of its ancestors are looked up in a flattened method table
+    (`vtable`) instead of walking the inheritance chain, so a method lookup is a single
+    dict probe whatever the depth of the inheritance. The table is built on the first
+    lookup and invalidated when a member of the class or of an ancestor is defined or
+    assigned: engines write members with `define` (`assign` resolves the class and
+    defines the member in it), never directly to the record. Names that aren't members
+    are looked up in `outer`, the environment the root class is declared in.
+
+    A class declaring fields with `(fields name ...)` has a `layout`: the type of its
+    compact instances, storing the fields of the class and its ancestors at fixed
+    offsets. Subclasses declaring no fields share the layout of the parent.
+    """
+
+    __slots__ = (
+        "name",
+        "base",
+        "outer",
+        "vtable",
+        "subclasses",
+        "hits",
+        "builds",
+        "invalidations",
+        "layout",
+        "__weakref__",
+    )
+
+    def __init__(self, name: str, parent: Environment):
+        """Creates a class without members.
+
+        Args:
+            name: Class name
+            parent: Parent class, or the environment the class is declared in for a
+                class without a parent
+        """
+        self.record = {}
+        self.parent = parent
+        self.name = name
+        self.base = parent if isinstance(parent, Class) else None
+        self.outer = parent.outer if self.base is not None else parent
+        self.vtable = None
+        self.subclasses = WeakSet()
+        # method table lookups answered, table builds and invalidations of a built table
+        self.hits = 0
+        self.builds = 0
+        self.invalidations = 0
+        self.layout = self.base.layout if self.base is not None else None
+        if self.base is not None:
+            self.base.subclasses.add(self)
+
+    def define(self, name, value):
+        self.record[name] = value
+        self.invalidate()
+        return value
+
+    def lookup(self, name):
+        vtable = self.vtable
+        if vtable is None:
+            vtable = self.build_vtable()
+        value = vtable.get(name, _MISSING)
+        if value is _MISSING:
+            return self.outer.lookup(name)
+        self.hits += 1
+        return value
+
+    def build_vtable(self) -> dict:
+        """Builds and returns the method table: members of the ancestors and the class."""
+        if self.base is None:
+            vtable = dict(self.record)
+        else:
+            vtable = self.base.vtable
+            if vtable is None:
+                vtable = self.base.build_vtable()
+            vtable = {**vtable, **self.record}
+        self.vtable = vtable
+        self.builds += 1
+        return vtable
+
+    def declare_fields(self, names) -> None:
+        """Adds fields to the layout of the instances."""
+        fields = list(self.layout.fields) if self.layout is not None else []
+        fields.extend(name for name in names if name not in fields)
+        self.layout = field_instance_type(self.name, tuple(fields))
+
+    def invalidate(self) -> None:
+        """Drops the method tables of the class and its subclasses."""
+        if self.vtable is None:
+            # subclasses build their tables from this one, so theirs aren't built
+            return
+        self.vtable = None
+        self.invalidations += 1
+        for subclass in self.subclasses:
+            subclass.invalidate()
+
+    def __repr__(self):
+        return f"<class {self.name}>"
+
+
+def enclosing_class(env: Environment, name: str) -> Class | None:
+    """Returns the class `name` whose body or method `env` belongs to, if any.
+
+    `(super name)` in a class body or a method is the parent of this class, so it's
+    found on the environment chain instead of evaluating the class name.
+    """
+    while env is not None:
+        if type(env) is Class and env.name == name:
+            return env
+        env = env.parent
+    return None
+
+
+def split_fields(body: Number | str | list) -> tuple[tuple, Number | str | list]:
+    """Returns the fields declared by a class body and the body without declarations.
+
+    `(fields name ...)` declares fields only as a statement of a class body, anywhere
+    else it's a call of the variable `fields`.
+    """
+    if _is_fields(body):
+        return tuple(body[1:]), ["begin"]
+    if not (isinstance(body, list) and body and body[0] == "begin"):
+        return (), body
+    declarations = [e for e in body[1:] if _is_fields(e)]
+    if not declarations:
+        return (), body
+    fields = tuple(name for e in declarations for name in e[1:])
+    rest = copy.copy(body)  # keeps the type, e.g. `Block`
+    rest[:] = [e for e in body if not _is_fields(e)]
+    return fields, rest
+
+
+def _is_fields(expr) -> bool:
+    return isinstance(expr, list) and bool(expr) and expr[0] == "fields"
+
+
+def declare_fields(class_env: Class, names: tuple) -> None:
+    """Declares the fields of a class split from its body by `split_fields`.
+
+    Raises:
+        InterpreterError: If a name is not a symbol
+    """
+    for name in names:
+        if not isinstance(name, str) or name.startswith('"'):
+            raise InterpreterError(f"Field name must be a symbol, got `{name}`!")
+    class_env.declare_fields(names)
+
+
+def new_instance(class_env: Environment) -> Instance | FieldInstance:
+    """Returns a new instance of a class, compact if the class declares fields."""
+    if type(class_env) is Class and class_env.layout is not None:
+        return class_env.layout(class_env)
+    return Instance(class_env)
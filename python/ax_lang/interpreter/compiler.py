@@ -0,0 +1,1136 @@
+import copy
+import logging
+import types
+from collections import Counter
+from numbers import Number
+from typing import TYPE_CHECKING, Any, Callable
+
+from ax_lang.interpreter.classes import (
+    Class,
+    declare_fields,
+    enclosing_class,
+    new_instance,
+    split_fields,
+)
+from ax_lang.interpreter.environment import UNSET, Environment, Frame
+from ax_lang.interpreter.functions import Function
+from ax_lang.interpreter.lowering import Block
+from ax_lang.interpreter.natives import (
+    BINARY_OPERATORS,
+    NATIVE_OPERATORS,
+    fused_assignment,
+)
+from ax_lang.interpreter.resolver import (
+    CLOSURE,
+    DYNAMIC,
+    Resolution,
+    Resolver,
+    Scope,
+    body_exprs,
+)
+from ax_lang.interpreter.shapes import Instance, PropertyCache
+from ax_lang.parser.compact import count_nodes
+from ax_lang.parser.nodes import String, Symbol
+
+if TYPE_CHECKING:
+    from ax_lang.interpreter.ax_lang import AxLang
+
+logger = logging.getLogger(__name__)
+
+# A compiled expression: evaluates the expression in the given environment
+Code = Callable[[Environment], Any]
+
+
+def _lookup_name(env: Environment, name: str):
+    while env is not None:
+        record = env.record
+        if name in record:
+            return record[name]
+        env = env.parent
+    raise ValueError(f"Variable `{name}` is not defined!")
+
+
+def _assign_name(env: Environment, name: str, value):
+    while env is not None:
+        record = env.record
+        if name in record:
+            return env.define(name, value)
+        env = env.parent
+    raise ValueError(f"Variable `{name}` is not defined!")
+
+
+def _lookup(name: str, depth: int, slot: int | None) -> Code:
+    """Compiles a variable reference resolved to a lexical address."""
+    if slot is None:
+        if depth == 0:
+            return lambda env: _lookup_name(env, name)
+
+        def lookup_name(env):
+            for _ in range(depth):
+                env = env.parent
+            while env is not None:
+                record = env.record
+                if name in record:
+                    return record[name]
+                env = env.parent
+            raise ValueError(f"Variable `{name}` is not defined!")
+
+        return lookup_name
+
+    if depth == 0:
+
+        def lookup_local(env):
+            value = env.slots[slot]
+            if value is UNSET:
+                # not defined in the scope yet
+                return _lookup_name(env.parent, name)
+            return value
+
+        return lookup_local
+
+    if depth == 1:
+
+        def lookup_parent(env):
+            env = env.parent
+            value = env.slots[slot]
+            if value is UNSET:
+                return _lookup_name(env.parent, name)
+            return value
+
+        return lookup_parent
+
+    def lookup_slot(env):
+        for _ in range(depth):
+            env = env.parent
+        value = env.slots[slot]
+        if value is UNSET:
+            return _lookup_name(env.parent, name)
+        return value
+
+    return lookup_slot
+
+
+def _assign(name: str, depth: int, slot: int | None) -> Callable:
+    """Compiles an assignment to a variable resolved to a lexical address."""
+    if slot is None:
+
+        def assign_name(env, value):
+            for _ in range(depth):
+                env = env.parent
+            return _assign_name(env, name, value)
+
+        return assign_name
+
+    def assign_slot(env, value):
+        for _ in range(depth):
+            env = env.parent
+        slots = env.slots
+        if slots[slot] is UNSET:
+            # not defined in the scope yet
+            return _assign_name(env.parent, name, value)
+        slots[slot] = value
+        return value
+
+    return assign_slot
+
+
+def _define(name: str, slot: int | None) -> Callable:
+    """Compiles a definition of a variable in the current scope."""
+    if slot is None:
+        return lambda env, value: env.define(name, value)
+
+    def define_slot(env, value):
+        env.slots[slot] = value
+        return value
+
+    return define_slot
+
+
+class TailCall:
+    """Call of a user-defined function in tail position, made by the caller's caller.
+
+    A function body returns it instead of calling the function, and
+    `ClosureCompiler.call` runs the call in its loop, so tail calls don't grow the
+    Python stack.
+    """
+
+    __slots__ = ("fn", "args")
+
+    def __init__(self, fn: Function, args: list):
+        self.fn = fn
+        self.args = args
+
+
+def _not_implemented(expr) -> Code:
+    def not_implemented(env):
+        raise NotImplementedError(expr)
+
+    return not_implemented
+
+
+# forms declaring a name
+_DECLARATIONS = frozenset({"var", "def", "class", "module", "import"})
+# forms whose bodies look up variables by name through the environment chain
+_DYNAMIC_FORMS = frozenset({"class", "module", "import"})
+
+
+def _declarations(exprs: list, name: str) -> int:
+    """Returns the number of forms declaring the name in expressions."""
+    count = 0
+    stack = list(exprs)
+    while stack:
+        expr = stack.pop()
+        if isinstance(expr, list) and expr:
+            head = expr[0]
+            if (
+                isinstance(head, str)
+                and head in _DECLARATIONS
+                and len(expr) > 1
+                and expr[1] == name
+            ):
+                count += 1
+            stack.extend(expr)
+    return count
+
+
+def _contains(expr, name: str) -> bool:
+    if isinstance(expr, list):
+        return any(_contains(e, name) for e in expr)
+    return isinstance(expr, str) and expr == name
+
+
+def _substitute(expr, bindings: dict):
+    """Replaces the parameters of a simple function body by the arguments."""
+    if not isinstance(expr, list):
+        if isinstance(expr, str) and expr in bindings:
+            return bindings[expr]
+        return expr
+    if expr and expr[0] == "prop":
+        # the property name is not a variable
+        new = [expr[0], _substitute(expr[1], bindings), *expr[2:]]
+    else:
+        new = [_substitute(e, bindings) for e in expr]
+    substituted = copy.copy(expr)  # keeps the type, e.g. `Lowered`
+    substituted[:] = new
+    return substituted
+
+
+def _dynamic_scope(scope: Scope) -> tuple[int, Scope]:
+    """Returns the nearest dynamic scope and the number of frames up to it."""
+    depth = 0
+    while not scope.is_dynamic:
+        depth += 1
+        scope = scope.parent
+    return depth, scope
+
+
+def _variables(expr, params: list) -> set[str]:
+    """Returns names of the variables of a simple function body but the parameters."""
+    if isinstance(expr, list):
+        if expr[0] == "prop":
+            # the property name is not a variable
+            return _variables(expr[1], params)
+        names = set()
+        for e in expr[1:] if expr[0] == "if" else expr:
+            names |= _variables(e, params)
+        return names
+    if isinstance(expr, str) and expr[0] != '"' and expr not in params:
+        return {str(expr)}
+    return set()
+
+
+class InlineCandidate:
+    """Function declared once by a `var` (or `def`) of a scope, never reassigned."""
+
+    __slots__ = ("name", "params", "body", "scope", "free_names")
+
+    def __init__(self, name: str, params: list, body, scope: Scope, simple: bool):
+        self.name = str(name)
+        self.params = params
+        self.body = body
+        # scope declaring the function
+        self.scope = scope
+        # variables of the body other than the parameters, None if the body is not
+        # simple (only function calls, `if` and `prop`) and can't be substituted
+        self.free_names = _variables(body, params) if simple else None
+
+
+def _sequence(codes: list[Code]) -> Code:
+    """Runs compiled expressions one after another in the same environment."""
+    if not codes:
+        return lambda env: None
+    if len(codes) == 1:
+        return codes[0]
+    *init, last = codes
+
+    def sequence(env):
+        for code in init:
+            code(env)
+        return last(env)
+
+    return sequence
+
+
+class ClosureCompiler:
+    """Compiles AST into a tree of Python closures for the `closure` engine.
+
+    Every AST node is compiled once into a closure specialized for its kind, with the
+    closures of its children already compiled. Running a program is then a chain of
+    closure calls without re-inspecting the AST: special forms are recognized, syntactic
+    sugar is transformed and literals are unquoted at compile time.
+
+    Variables are lexically addressed: blocks and function calls run in a `Frame`
+    whose variables are stored at slots assigned by the `Resolver`, and every variable
+    reference is compiled to the number of frames to go up and the slot to read. The
+    environment a program is evaluated in, class and module bodies keep dict records
+    and their variables are looked up by name.
+
+    Blocks declaring nothing (`Block` nodes of the lowering) run in the frame of the
+    enclosing scope. Functions are flat closures when possible: instead of the frame
+    they are created in, a function keeps a frame of a `closure` scope holding only
+    the variables its body references, so a long-lived function doesn't retain the
+    whole chain of frames. A variable is captured by value if it's a parameter or a
+    `var` declared before the function is created and it's never reassigned, so the
+    copy can't go stale; otherwise the function keeps its creation frame.
+
+    Calls of user-defined functions in tail position of a function body (through `if`,
+    `begin` and `switch`) return a `TailCall` run by the trampoline in `call`.
+
+    When the interpreter hash-conses its ASTs (see `HashConser`), the closure of a
+    shared subtree is compiled once for all its occurrences in equivalent scopes.
+
+    With an inline threshold, calls of small functions declared once in a block or
+    function scope, never reassigned and not calling themselves are inlined: the body
+    is compiled into the call site instead of a lookup of the function and a call. If
+    the body only consists of calls, `if` and `prop` and every argument is a constant
+    or a variable that is never assigned, the arguments are substituted for the
+    parameters; otherwise the arguments are bound in a frame of the function scope.
+    """
+
+    def __init__(self, ax_lang: "AxLang", inline_threshold: int = 0):
+        """Creates a compiler for an ax-lang instance.
+
+        Args:
+            ax_lang: Interpreter providing the transformer and the module loading
+            inline_threshold: Maximal number of AST nodes of the body of an inlined
+                function, 0 disables inlining
+        """
+        self.ax_lang = ax_lang
+        self.transformer = ax_lang.transformer
+        self.resolver = Resolver(self.transformer)
+        # lexical addresses of variables, collected by `resolve`
+        self._resolutions: list[Resolution] | None = None
+        # closures of shared subtrees by (node id, scope key, tail), with the node
+        # kept alive so that its id is not reused
+        self._codes: dict[tuple, tuple[list, Code]] | None = (
+            {} if ax_lang.hash_conser is not None else None
+        )
+        self._scope_keys: dict[Scope, int] = {}
+        self._scope_ids: dict[tuple, int] = {}
+        # compilations of shared subtrees saved by `_codes`
+        self.shared_code_hits = 0
+        self.inline_threshold = inline_threshold
+        # scope -> slot -> function that can be inlined
+        self._inline_candidates: dict[Scope, dict[int, InlineCandidate]] = {}
+        # ids of the candidates whose bodies are being inlined
+        self._inlining: set[int] = set()
+        # name of a function -> number of its inlined call sites
+        self.inlined: Counter[str] = Counter()
+        # whether functions capture the variables they reference as flat closures,
+        # closures are context-dependent, so not with shared compiled closures
+        self.flat_closures = self._codes is None
+        # static scope -> index of its expression being compiled
+        self._positions: dict[Scope, int] = {}
+        self._special_forms = {
+            "var": self._compile_var,
+            "set": self._compile_set,
+            "begin": self._compile_begin,
+            "if": self._compile_if,
+            "while": self._compile_while,
+            "def": self._compile_def,
+            "switch": self._compile_switch,
+            "for": self._compile_for,
+            "++": self._compile_sugar(self.transformer.inc_to_set),
+            "--": self._compile_sugar(self.transformer.dec_to_set),
+            "+=": self._compile_sugar(self.transformer.plus_assign_to_set),
+            "-=": self._compile_sugar(self.transformer.minus_assign_to_set),
+            "*=": self._compile_sugar(self.transformer.multi_assign_to_set),
+            "lambda": self._compile_lambda,
+            "class": self._compile_class,
+            "super": self._compile_super,
+            "new": self._compile_new,
+            "prop": self._compile_prop,
+            "module": self._compile_module,
+            "import": self._compile_import,
+        }
+        # special forms passing the tail position to their subexpressions
+        self._tail_forms = {
+            "begin": self._compile_begin,
+            "if": self._compile_if,
+            "switch": self._compile_switch,
+        }
+
+    def compile(
+        self, expr: Number | str | list, scope: Scope = None, tail: bool = False
+    ) -> Code:
+        """Compiles an expression.
+
+        Args:
+            expr: AST node (number, string, or list) to compile
+            scope: Scope the expression is evaluated in, by default the dynamic scope
+                of an environment with a dict record
+            tail: Whether the expression is in tail position of a function body
+
+        Returns:
+            Closure evaluating the expression in the environment passed to it
+        """
+        if scope is None:
+            scope = Scope(DYNAMIC)
+
+        codes = self._codes
+        if (
+            codes is None
+            or not isinstance(expr, list)
+            or self._resolutions is not None
+            # inlining compiles every call site into its own scope
+            or self.inline_threshold
+        ):
+            return self._compile(expr, scope, tail)
+        key = (id(expr), self._scope_key(scope), tail)
+        entry = codes.get(key)
+        if entry is not None:
+            self.shared_code_hits += 1
+            return entry[1]
+        code = self._compile(expr, scope, tail)
+        codes[key] = (expr, code)
+        return code
+
+    def _compile(self, expr, scope: Scope, tail: bool) -> Code:
+        # typed atoms are classified by the parser
+        if type(expr) is Symbol:
+            return _lookup(expr, *self._address(expr, "lookup", scope))
+        if type(expr) is String:
+            value = expr.value
+            return lambda env: value
+
+        if isinstance(expr, Number):
+            return lambda env: expr
+
+        if isinstance(expr, str):
+            if expr[0] == '"' and expr[-1] == '"':
+                value = expr[1:-1]
+                return lambda env: value
+            if self.ax_lang._is_variable_name(expr) or self.ax_lang._is_function_name(
+                expr
+            ):
+                return _lookup(expr, *self._address(expr, "lookup", scope))
+            return _not_implemented(expr)
+
+        if expr and isinstance(expr[0], str):
+            if tail and expr[0] in self._tail_forms:
+                return self._tail_forms[expr[0]](expr, scope, tail)
+            compile_special_form = self._special_forms.get(expr[0])
+            if compile_special_form is not None:
+                return compile_special_form(expr, scope)
+            custom_form = self.ax_lang.custom_forms.get(expr[0])
+            if custom_form is not None:
+                return lambda env: custom_form(expr, env)
+
+        return self._compile_call(expr, scope, tail)
+
+    def compile_body(
+        self, body: Number | str | list, scope: Scope = None, tail: bool = False
+    ) -> Code:
+        """Compiles a function, class or module body.
+
+        A `begin` body is run directly in the environment of the function, class or
+        module instead of a new block environment.
+        """
+        if isinstance(body, list) and body and body[0] == "begin":
+            return self._compile_sequence(body[1:], scope, tail, scope.exprs)
+        return self.compile(body, scope, tail)
+
+    def resolve(self, expr: Number | str | list) -> list[Resolution]:
+        """Returns lexical addresses of all variables of an expression.
+
+        Args:
+            expr: AST node compiled as a program evaluated in a dict environment
+
+        Returns:
+            Resolutions of the variable references, assignments and declarations in
+            the order they are compiled
+        """
+        self._resolutions = []
+        try:
+            self.compile(expr)
+            return self._resolutions
+        finally:
+            self._resolutions = None
+
+    def call(self, fn: Function, args: list):
+        """Calls a user-defined function with evaluated arguments.
+
+        Raises:
+            InterpreterError: If the number of arguments is not the arity of the
+                function
+        """
+        function_type = types.FunctionType
+        while True:
+            if len(args) != fn.arity:
+                raise fn.arity_error(len(args))
+            code = fn.code
+            if type(code) is not function_type:
+                # a function created or last called by another engine, its variables
+                # are looked up by name
+                code = fn.code = self._compile_function(
+                    fn.params, fn.body, Scope(DYNAMIC)
+                )
+            rez = code(args, fn.env)
+            if type(rez) is not TailCall:
+                return rez
+            fn, args = rez.fn, rez.args
+
+    def _scope_key(self, scope: Scope) -> int:
+        # scopes with the same names at every level resolve every name to the same
+        # address, so they share compiled closures: they get the same small int key
+        key = self._scope_keys.get(scope)
+        if key is None:
+            signature = ()
+            if not scope.is_dynamic:
+                signature = (self._scope_key(scope.parent), scope.kind, *scope.names)
+            key = self._scope_ids.setdefault(signature, len(self._scope_ids))
+            self._scope_keys[scope] = key
+        return key
+
+    def _address(self, name: str, access: str, scope: Scope) -> tuple[int, int | None]:
+        depth, slot = scope.resolve(name)
+        if self._resolutions is not None:
+            self._resolutions.append(Resolution(name, access, depth, slot))
+        return depth, slot
+
+    def _compile_function(self, params: list, body, scope: Scope) -> Callable:
+        """Compiles a function to a callable taking arguments and the closure env."""
+        function_scope = self.resolver.function_scope(params, body, scope)
+        body_code = self.compile_body(body, function_scope, tail=True)
+        unset = [UNSET] * (len(function_scope.names) - len(params))
+
+        def enter(args, env):
+            # the list of arguments (checked by `call`) becomes the slots of the frame
+            if unset:
+                args = args + unset
+            return body_code(Frame(function_scope, args, env))
+
+        return enter
+
+    def _is_simple(self, expr) -> bool:
+        # only atoms, function calls, `if` and `prop`
+        if not isinstance(expr, list):
+            return True
+        if not expr:
+            return False
+        head = expr[0]
+        if head == "if":
+            return len(expr) == 4 and all(map(self._is_simple, expr[1:]))
+        if head == "prop":
+            return len(expr) == 3 and self._is_simple(expr[1])
+        if isinstance(head, str) and (
+            head in self._special_forms or head in self.ax_lang.custom_forms
+        ):
+            return False
+        return all(map(self._is_simple, expr))
+
+    def _add_inline_candidate(self, expr: list, scope: Scope, slot: int) -> None:
+        _, name, value = expr
+        exprs = scope.exprs
+        if (
+            # the function is declared unconditionally, before the code after it runs
+            not any(e is expr for e in exprs)
+            or not (
+                isinstance(value, list) and len(value) == 3 and value[0] == "lambda"
+            )
+        ):
+            return
+        _, params, body = value
+        if (
+            len(set(params)) != len(params)
+            or count_nodes(body) > self.inline_threshold
+            or _contains(body, name)
+            or _declarations(exprs, name) != 1
+            or name in scope.assigned_names
+        ):
+            return
+        candidate = InlineCandidate(name, params, body, scope, self._is_simple(body))
+        self._inline_candidates.setdefault(scope, {})[slot] = candidate
+
+    def _inline_candidate(self, expr: list, scope: Scope) -> InlineCandidate | None:
+        # the function called by a call expression if the call can be inlined
+        name = expr[0]
+        if not isinstance(name, str) or self._resolutions is not None:
+            return None
+        depth, slot = scope.resolve(name)
+        if slot is None:
+            return None
+        for _ in range(depth):
+            scope = scope.parent
+        candidate = self._inline_candidates.get(scope, {}).get(slot)
+        if (
+            candidate is None
+            or id(candidate) in self._inlining
+            or len(candidate.params) != len(expr) - 1
+        ):
+            return None
+        return candidate
+
+    def _can_substitute(self, candidate: InlineCandidate, scope: Scope) -> bool:
+        if candidate.free_names is None or scope.is_dynamic:
+            return False
+        # the variables of the body are the same as seen from the function
+        depth = scope.resolve(candidate.name)[0]
+        for name in candidate.free_names:
+            free_depth, slot = candidate.scope.resolve(name)
+            if scope.resolve(name) != (depth + free_depth, slot):
+                return False
+        return True
+
+    def _compile_inlined(
+        self, candidate: InlineCandidate, expr: list, scope: Scope, tail: bool
+    ) -> Code:
+        args = expr[1:]
+        self._inlining.add(id(candidate))
+        try:
+            if self._can_substitute(candidate, scope):
+                code = self._compile_substituted(candidate, args, scope, tail)
+            else:
+                code = self._compile_inlined_frame(candidate, args, scope, tail)
+        finally:
+            self._inlining.discard(id(candidate))
+        self.inlined[candidate.name] += 1
+        return code
+
+    def _compile_substituted(
+        self, candidate: InlineCandidate, args: list, scope: Scope, tail: bool
+    ) -> Code:
+        # the arguments are stored at hidden slots added to the frame of the call site,
+        # the body reads the parameters from them
+        arg_codes = [self.compile(arg, scope) for arg in args]
+        bindings = {}
+        slots = []
+        for param in candidate.params:
+            slot = len(scope.names)
+            # a name no variable of a program can have
+            hidden = Symbol(f"{param} {slot}")
+            scope.names.append(hidden)
+            scope.index[hidden] = slot
+            bindings[param] = hidden
+            slots.append(slot)
+        body_code = self.compile(_substitute(candidate.body, bindings), scope, tail)
+        arg_slots = list(zip(slots, arg_codes))
+
+        def inlined(env):
+            frame_slots = env.slots
+            for slot, arg_code in arg_slots:
+                frame_slots[slot] = arg_code(env)
+            return body_code(env)
+
+        return inlined
+
+    def _compile_inlined_frame(
+        self, candidate: InlineCandidate, args: list, scope: Scope, tail: bool
+    ) -> Code:
+        # the arguments are bound in a frame whose parent is the frame of the scope
+        # declaring the function, like the environment of a call
+        depth = scope.resolve(candidate.name)[0]
+        arg_codes = [self.compile(arg, scope) for arg in args]
+        function_scope = self.resolver.function_scope(
+            candidate.params, candidate.body, candidate.scope
+        )
+        body_code = self.compile_body(candidate.body, function_scope, tail)
+        unset = [UNSET] * (len(function_scope.names) - len(args))
+
+        def inlined(env):
+            slots = [arg_code(env) for arg_code in arg_codes]
+            if unset:
+                slots += unset
+            for _ in range(depth):
+                env = env.parent
+            return body_code(Frame(function_scope, slots, env))
+
+        return inlined
+
+    def _compile_var(self, expr: list, scope: Scope) -> Code:
+        _, name, value = expr
+        value_code = self.compile(value, scope)
+        depth, slot = self._address(name, "declare", scope)
+        define = _define(name, slot if depth == 0 else None)
+        if self.inline_threshold and depth == 0 and slot is not None:
+            self._add_inline_candidate(expr, scope, slot)
+
+        def var(env):
+            value = define(env, value_code(env))
+            if type(value) is Function and value.name is None:
+                value.name = name
+            return value
+
+        return var
+
+    def _compile_set(self, expr: list, scope: Scope) -> Code:
+        _, ref, value = expr
+        value_code = self.compile(value, scope)
+
+        # Assignment to property
+        if isinstance(ref, list) and ref and ref[0] == "prop":
+            _, instance, prop_name = ref
+            instance_code = self.compile(instance, scope)
+            cache = PropertyCache(prop_name)
+
+            def set_prop(env):
+                instance_env = instance_code(env)
+                value = value_code(env)
+                if type(instance_env) is Instance and instance_env.shape is cache.shape:
+                    instance_env.slots[cache.index] = value
+                    return value
+                if type(instance_env) is cache.layout:
+                    setattr(instance_env, cache.slot, value)
+                    return value
+                return cache.store(instance_env, value)
+
+            return set_prop
+
+        name = str(ref)
+        depth, slot = self._address(name, "assign", scope)
+        assign = _assign(name, depth, slot)
+
+        def set_var(env):
+            return assign(env, value_code(env))
+
+        if slot is not None and self._resolutions is None:
+            fused = self._compile_fused_assignment(expr, scope, depth, slot, set_var)
+            if fused is not None:
+                return fused
+        return set_var
+
+    def _compile_fused_assignment(
+        self, expr: list, scope: Scope, depth: int, slot: int, set_var: Code
+    ) -> Code | None:
+        # `(set x (op x k))` of a slot variable and a constant or variable operand:
+        # reads and writes the slot once, `set_var` if `op` is rebound or `x` unset
+        fused = fused_assignment(expr)
+        if fused is None:
+            return None
+        op_name, operand = fused
+        if isinstance(operand, Number):
+            operand_code = None
+        elif type(operand) is Symbol or self.ax_lang._is_variable_name(operand):
+            operand_code = _lookup(operand, *scope.resolve(operand))
+        else:
+            return None
+        op_code = _lookup(op_name, *scope.resolve(op_name))
+        native = NATIVE_OPERATORS[op_name]
+        op = BINARY_OPERATORS[op_name]
+
+        def fused_set(env):
+            if op_code(env) is not native:
+                return set_var(env)
+            frame = env
+            for _ in range(depth):
+                frame = frame.parent
+            slots = frame.slots
+            value = slots[slot]
+            if value is UNSET:
+                return set_var(env)
+            value = slots[slot] = op(
+                value, operand if operand_code is None else operand_code(env)
+            )
+            return value
+
+        return fused_set
+
+    def _compile_sequence(
+        self, exprs: list, scope: Scope, tail: bool, scope_exprs: list = None
+    ) -> Code:
+        # `scope_exprs` are the expressions of a static scope, the position of the
+        # compiled one is tracked for the flat closures
+        codes = []
+        for i, e in enumerate(exprs):
+            if scope_exprs is not None:
+                self._positions[scope] = i
+            codes.append(self.compile(e, scope, tail and i == len(exprs) - 1))
+        if scope_exprs is not None:
+            self._positions.pop(scope, None)
+        return _sequence(codes)
+
+    def _compile_begin(self, expr: list, scope: Scope, tail: bool = False) -> Code:
+        if type(expr) is Block:
+            # declares nothing, runs in the enclosing frame
+            return self._compile_sequence(expr[1:], scope, tail)
+        exprs = expr[1:]
+        block_scope = self.resolver.block_scope(exprs, scope)
+        block_code = self._compile_sequence(exprs, block_scope, tail, exprs)
+        size = len(block_scope.names)
+        return lambda env: block_code(Frame(block_scope, [UNSET] * size, env))
+
+    def _compile_if(self, expr: list, scope: Scope, tail: bool = False) -> Code:
+        _, condition, consequent, alternate = expr
+        condition_code = self.compile(condition, scope)
+        consequent_code = self.compile(consequent, scope, tail)
+        alternate_code = self.compile(alternate, scope, tail)
+
+        def if_(env):
+            if condition_code(env):
+                return consequent_code(env)
+            return alternate_code(env)
+
+        return if_
+
+    def _compile_while(self, expr: list, scope: Scope) -> Code:
+        _, condition, body = expr
+        condition_code = self.compile(condition, scope)
+        body_code = self.compile(body, scope)
+
+        def while_(env):
+            rez = None
+            while condition_code(env):
+                rez = body_code(env)
+            return rez
+
+        return while_
+
+    def _compile_def(self, expr: list, scope: Scope) -> Code:
+        return self.compile(self.transformer.def_to_lambda(expr), scope)
+
+    def _compile_switch(self, expr: list, scope: Scope, tail: bool = False) -> Code:
+        return self.compile(self.transformer.switch_to_if(expr), scope, tail)
+
+    def _compile_for(self, expr: list, scope: Scope) -> Code:
+        return self.compile(self.transformer.for_to_while(expr), scope)
+
+    def _compile_sugar(self, transform: Callable[[list], list]) -> Callable:
+        return lambda expr, scope: self.compile(transform(expr), scope)
+
+    def _compile_lambda(self, expr: list, scope: Scope) -> Code:
+        _, params, body = expr
+        params = tuple(params)
+        captures = self._captures(expr, scope)
+        if captures is None:
+            code = self._compile_function(params, body, scope)
+
+            def lambda_(env):
+                return Function(params, body, env, code)
+
+            return lambda_
+
+        # Flat closure:
+        depth_to_dynamic, dynamic_scope = _dynamic_scope(scope)
+        names = [name for name, _, _ in captures]
+        closure_scope = Scope(CLOSURE, names, dynamic_scope)
+        if self.inline_threshold:
+            self._capture_inline_candidates(captures, scope, closure_scope)
+        code = self._compile_function(params, body, closure_scope)
+        addresses = [(depth, slot) for _, depth, slot in captures]
+        # slot of the function itself, captured before the `var` declaring it is done
+        self_slot = next(
+            (i for i, (_, depth, _) in enumerate(captures) if depth == -1), None
+        )
+
+        def flat_lambda(env):
+            values = []
+            for depth, slot in addresses:
+                frame = env
+                for _ in range(depth):
+                    frame = frame.parent
+                values.append(frame.slots[slot] if depth >= 0 else UNSET)
+            for _ in range(depth_to_dynamic):
+                env = env.parent
+            closure_env = Frame(closure_scope, values, env)
+            fn = Function(params, body, closure_env, code)
+            if self_slot is not None:
+                values[self_slot] = fn
+            return fn
+
+        return flat_lambda
+
+    def _capture_inline_candidates(
+        self, captures: list[tuple], scope: Scope, closure_scope: Scope
+    ) -> None:
+        # captured functions stay inlinable if their bodies only use global variables
+        for i, (_, depth, slot) in enumerate(captures):
+            if depth < 0:
+                continue
+            declaring = scope
+            for _ in range(depth):
+                declaring = declaring.parent
+            candidate = self._inline_candidates.get(declaring, {}).get(slot)
+            if (
+                candidate is not None
+                and candidate.free_names is not None
+                and all(declaring.resolve(n)[1] is None for n in candidate.free_names)
+            ):
+                self._inline_candidates.setdefault(closure_scope, {})[
+                    i
+                ] = InlineCandidate(
+                    candidate.name,
+                    candidate.params,
+                    candidate.body,
+                    closure_scope,
+                    simple=True,
+                )
+
+    def _captures(self, expr: list, scope: Scope) -> list[tuple] | None:
+        # (name, depth, slot) of the static variables referenced by a function, None
+        # if it can't be a flat closure. Depth -1 is the function itself.
+        if not self.flat_closures or self._resolutions is not None or scope.is_dynamic:
+            return None
+        declared = set()
+        names = self._free_names(expr, frozenset(), declared)
+        if names is None:
+            return None
+        if any(scope.resolve(name)[1] is not None for name in declared):
+            # a name declared in the function, maybe under an `if` or a `while`, is
+            # looked up in the enclosing static scopes until it's defined, which a
+            # flat closure skips
+            return None
+        captures = []
+        for name in sorted(names):
+            depth, slot = scope.resolve(name)
+            if slot is None:
+                # looked up by name in the dynamic environment
+                continue
+            declaring = scope
+            for _ in range(depth):
+                declaring = declaring.parent
+            capture = self._capture(name, slot, declaring, expr)
+            if capture is None:
+                return None
+            captures.append((name, -1 if capture else depth, slot))
+        return captures
+
+    def _capture(self, name: str, slot: int, scope: Scope, fn: list) -> bool | None:
+        # True if the variable is the function `fn` itself, False if it can be
+        # captured by value, None if it can't
+        if scope.kind == CLOSURE:
+            return False
+        if name in scope.assigned_names:
+            return None
+        declarations = _declarations(scope.exprs, name)
+        if slot < scope.params:
+            return False if declarations == 0 else None
+        position = self._positions.get(scope)
+        if declarations != 1 or position is None:
+            return None
+        for i, e in enumerate(scope.exprs[: position + 1]):
+            if isinstance(e, list) and len(e) == 3 and e[0] == "var" and e[1] == name:
+                if i < position:
+                    return False
+                # declared by the `var` being compiled
+                return True if e[2] is fn else None
+        return None
+
+    def _free_names(self, expr, bound: frozenset, declared: set) -> set[str] | None:
+        # variables referenced by an expression but not declared in it, None if it
+        # uses forms looking up variables by name (e.g. in a class body). Adds the
+        # names declared in the scopes of the expression to `declared`.
+        if not isinstance(expr, list):
+            if isinstance(expr, str) and expr[0] != '"' and expr not in bound:
+                return {str(expr)}
+            return set()
+        if not expr:
+            return set()
+        head = expr[0]
+        exprs = expr
+        if isinstance(head, str) and (
+            head in self._special_forms or head in self.ax_lang.custom_forms
+        ):
+            if head == "lambda":
+                _, params, body = expr
+                exprs = body_exprs(body)
+                names = self.resolver.declared_names(exprs)
+                declared.update(names)
+                bound = bound.union(params, names)
+            elif head == "begin":
+                exprs = expr[1:]
+                if type(expr) is not Block:
+                    names = self.resolver.declared_names(exprs)
+                    declared.update(names)
+                    bound = bound.union(names)
+            elif head in ("var", "prop"):
+                exprs = expr[2:] if head == "var" else expr[1:2]
+            elif head in ("set", "if", "while", "new", "super"):
+                exprs = expr[1:]
+            else:
+                # class and module bodies, custom forms and unlowered sugar
+                return None
+        names = set()
+        for e in exprs:
+            free = self._free_names(e, bound, declared)
+            if free is None:
+                return None
+            names |= free
+        return names
+
+    def _compile_class(self, expr: list, scope: Scope) -> Code:
+        _, name, parent, body = expr
+        fields, body = split_fields(body)
+        parent_code = self.compile(parent, scope)
+        body_code = self.compile_body(body, Scope(DYNAMIC))
+        depth, slot = self._address(name, "declare", scope)
+        define = _define(name, slot if depth == 0 else None)
+
+        def class_(env):
+            parent_env = parent_code(env) or env
+            class_env = Class(name, parent_env)
+            if fields:
+                declare_fields(class_env, fields)
+            # body is evaluated in the class environment
+            body_code(class_env)
+            # Class is accessible by name
+            return define(env, class_env)
+
+        return class_
+
+    def _compile_super(self, expr: list, scope: Scope) -> Code:
+        _, class_name = expr
+        class_code = self.compile(class_name, scope)
+        if not isinstance(class_name, str):
+            return lambda env: class_code(env).parent
+
+        def super_(env):
+            # the class whose body the expression is in isn't looked up by name
+            class_env = enclosing_class(env, class_name) or class_code(env)
+            return class_env.parent
+
+        return super_
+
+    def _compile_new(self, expr: list, scope: Scope) -> Code:
+        class_code = self.compile(expr[1], scope)
+        arg_codes = [self.compile(arg, scope) for arg in expr[2:]]
+        call = self.call
+
+        def new(env):
+            class_env = class_code(env)
+            # An instance of class is an environment with a shape
+            instance_env = new_instance(class_env)
+            args = [arg_code(env) for arg_code in arg_codes]
+            call(class_env.lookup("constructor"), [instance_env, *args])
+            return instance_env
+
+        return new
+
+    def _compile_prop(self, expr: list, scope: Scope) -> Code:
+        _, instance, name = expr
+        instance_code = self.compile(instance, scope)
+        # inline cache of the site, see `PropertyCache`
+        cache = PropertyCache(name)
+
+        def prop(env):
+            instance_env = instance_code(env)
+            if type(instance_env) is Instance and instance_env.shape is cache.shape:
+                return instance_env.slots[cache.index]
+            if type(instance_env) is cache.layout:
+                value = getattr(instance_env, cache.slot)
+                if value is not UNSET:
+                    return value
+            return cache.load(instance_env)
+
+        return prop
+
+    def _compile_module(self, expr: list, scope: Scope) -> Code:
+        _, name, body = expr
+        body_code = self.compile_body(body, Scope(DYNAMIC))
+        depth, slot = self._address(name, "declare", scope)
+        define = _define(name, slot if depth == 0 else None)
+
+        def module(env):
+            module_env = Environment({}, env)
+            body_code(module_env)
+            return define(env, module_env)
+
+        return module
+
+    def _compile_import(self, expr: list, scope: Scope) -> Code:
+        _, name = expr
+        depth, slot = self._address(name, "declare", scope)
+        define = _define(name, slot if depth == 0 else None)
+
+        ax_lang = self.ax_lang
+        return lambda env: define(env, ax_lang.import_module(name))
+
+    def _compile_call(self, expr: list, scope: Scope, tail: bool = False) -> Code:
+        if not isinstance(expr, list):
+            return _not_implemented(expr)
+        if self.inline_threshold:
+            candidate = self._inline_candidate(expr, scope)
+            if candidate is not None:
+                return self._compile_inlined(candidate, expr, scope, tail)
+        fn_code = self.compile(expr[0], scope)
+        arg_codes = [self.compile(arg, scope) for arg in expr[1:]]
+        if len(expr) == 3 and isinstance(expr[0], str) and expr[0] in BINARY_OPERATORS:
+            return self._compile_operator(expr, fn_code, arg_codes, tail)
+        call = self.call
+        function_type = types.FunctionType
+
+        if tail:
+
+            def tail_call(env):
+                fn = fn_code(env)
+                args = [arg_code(env) for arg_code in arg_codes]
+                if type(fn) is function_type:
+                    return fn(*args)
+                # the caller of the function body makes the call
+                if type(fn) is Function:
+                    return TailCall(fn, args)
+                raise NotImplementedError(fn)
+
+            return tail_call
+
+        def call_(env):
+            fn = fn_code(env)
+            args = [arg_code(env) for arg_code in arg_codes]
+
+            # 1. Native functions
+            if type(fn) is function_type:
+                return fn(*args)
+
+            # 2. User-defined functions
+            if type(fn) is Function:
+                return call(fn, args)
+
+            raise NotImplementedError(fn)
+
+        return call_
+
+    def _compile_operator(
+        self, expr: list, fn_code: Code, arg_codes: list[Code], tail: bool
+    ) -> Code:
+        # a call of a built-in operator applies the Python operator directly while
+        # the head is bound to the native function
+        native = NATIVE_OPERATORS[expr[0]]
+        op = BINARY_OPERATORS[expr[0]]
+        left_code, right_code = arg_codes
+        call = self.call
+        function_type = types.FunctionType
+
+        def call_other(fn, args):
+            if type(fn) is function_type:
+                return fn(*args)
+            if type(fn) is Function:
+                return TailCall(fn, args) if tail else call(fn, args)
+            raise NotImplementedError(fn)
+
+        right = expr[2]
+        if isinstance(right, Number):
+
+            def operator_constant(env):
+                fn = fn_code(env)
+                if fn is native:
+                    return op(left_code(env), right)
+                return call_other(fn, [left_code(env), right])
+
+            return operator_constant
+
+        def operator_call(env):
+            fn = fn_code(env)
+            if fn is native:
+                return op(left_code(env), right_code(env))
+            return call_other(fn, [left_code(env), right_code(env)])
+
+        return operator_call
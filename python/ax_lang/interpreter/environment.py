@@ -1,8 +1,13 @@
-import logging
+from collections.abc import MutableMapping
+from typing import TYPE_CHECKING
 
-from ax_lang.interpreter.functions import NativeFunctions
+from ax_lang.interpreter.natives import NATIVE_FUNCTIONS
 
-logger = logging.getLogger(__name__)
+if TYPE_CHECKING:
+    from ax_lang.interpreter.resolver import Scope
+
+# Value of a slot whose variable is not defined yet
+UNSET = object()
 
 
 class Environment:
@@ -12,6 +17,8 @@ class Environment:
     parent environment, enabling lexical scoping for variable resolution.
     """
 
+    __slots__ = ("record", "parent")
+
     def __init__(self, record: dict, parent: "Environment" = None):
         """Create environment with local bindings and parent scope.
 
@@ -32,7 +39,6 @@ class Environment:
         Returns:
             The value that was defined
         """
-        logger.debug(f"Defining name=`{name}` with value=`{value}` in the current env.")
         self.record[name] = value
         return value
 
@@ -49,10 +55,9 @@ class Environment:
         Raises:
             ValueError: If the variable is not defined in this environment or any parent
         """
-        name = str(name)  # in case need to assign ['prop', 'this', 'x']
-        var_env = self.resolve(name)
-        var_env.record[name] = value
-        return value
+        if not isinstance(name, str):
+            name = str(name)  # in case need to assign ['prop', 'this', 'x']
+        return self.resolve(name).define(name, value)
 
     def lookup(self, name):
         """Returns the value of a variable.
@@ -81,7 +86,8 @@ class Environment:
         Raises:
             ValueError: If the variable is not defined in this environment or any parent
         """
-        name = str(name)  # in case need to resolve ['prop', 'this', 'x']
+        if not isinstance(name, str):
+            name = str(name)  # in case need to resolve ['prop', 'this', 'x']
         if name in self.record:
             return self
         if not self.parent:
@@ -89,6 +95,78 @@ class Environment:
         return self.parent.resolve(name)
 
 
+class FrameRecord(MutableMapping):
+    """Dict-like view of the variables of a frame, for access by name."""
+
+    __slots__ = ("frame",)
+
+    def __init__(self, frame: "Frame"):
+        self.frame = frame
+
+    def __getitem__(self, name):
+        slot = self.frame.scope.index.get(name)
+        if slot is None:
+            return self.frame.extra[name]
+        value = self.frame.slots[slot]
+        if value is UNSET:
+            raise KeyError(name)
+        return value
+
+    def __setitem__(self, name, value):
+        slot = self.frame.scope.index.get(name)
+        if slot is None:
+            self.frame.extra[name] = value
+        else:
+            self.frame.slots[slot] = value
+
+    def __delitem__(self, name):
+        slot = self.frame.scope.index.get(name)
+        if slot is None:
+            del self.frame.extra[name]
+        elif self.frame.slots[slot] is UNSET:
+            raise KeyError(name)
+        else:
+            self.frame.slots[slot] = UNSET
+
+    def __iter__(self):
+        for name, slot in self.frame.scope.index.items():
+            if self.frame.slots[slot] is not UNSET:
+                yield name
+        yield from self.frame.extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+class Frame(Environment):
+    """Environment of a block or a function call with slot-indexed variables.
+
+    Variables declared in the scope of the frame are stored in a list at the slots
+    assigned by the resolver, so compiled code accesses them by index. Access by name
+    through `record` is still supported, names not declared in the scope are kept in
+    a dict.
+    """
+
+    __slots__ = ("scope", "slots", "extra")
+
+    def __init__(self, scope: "Scope", slots: list, parent: Environment = None):
+        """Create frame for a scope.
+
+        Args:
+            scope: Resolved scope of the frame
+            slots: Values of the variables declared in the scope, `UNSET` if undefined
+            parent: Parent environment for scope chain
+        """
+        self.scope = scope
+        self.slots = slots
+        self.parent = parent
+        self.extra = {}
+
+    @property
+    def record(self) -> FrameRecord:
+        return FrameRecord(self)
+
+
 def global_env() -> "Environment":
     env = Environment(
         {
@@ -97,19 +175,8 @@ def global_env() -> "Environment":
             "false": False,
         }
     )
-    # Math operations:
-    env.define("+", lambda a, b: a + b)
-    env.define("-", NativeFunctions.minus)
-    env.define("*", lambda a, b: a * b)
-    env.define("/", lambda a, b: a / b)
-    # Comparison operations:
-    env.define(">", lambda a, b: a > b)
-    env.define(">=", lambda a, b: a >= b)
-    env.define("<", lambda a, b: a < b)
-    env.define("<=", lambda a, b: a <= b)
-    env.define("==", lambda a, b: a == b)
-    # print
-    env.define("print", NativeFunctions.print)
+    for name, native in NATIVE_FUNCTIONS.items():
+        env.define(name, native.fn)
     return env
 
 
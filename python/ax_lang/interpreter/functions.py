@@ -1,10 +1,116 @@
+import operator
+from functools import reduce
+from itertools import islice
+from typing import Callable
+
+from ax_lang.exceptions import InterpreterError
+
+
 class NativeFunctions:
     @staticmethod
-    def minus(op1, op2=None):
-        if op2 is None:
-            return -op1
-        return op1 - op2
+    def minus(first, *rest):
+        if not rest:
+            return -first
+        if len(rest) == 1:
+            return first - rest[0]
+        return reduce(operator.sub, rest, first)
 
     @staticmethod
     def print(*args):
         print(" ".join([str(arg) for arg in args]))
+
+
+def variadic(op: Callable) -> Callable:
+    """Returns a native function folding its arguments with a binary operator.
+
+    `(+ a b c)` is `(a + b) + c`, a single argument is returned as it is.
+
+    Args:
+        op: Binary operator from the `operator` module
+    """
+
+    def fold(first, *rest):
+        if len(rest) == 1:
+            return op(first, rest[0])
+        return reduce(op, rest, first)
+
+    return fold
+
+
+def binary_variadic(op: Callable) -> Callable:
+    """Returns a native function like `variadic`, taking at least two arguments."""
+
+    def fold(first, second, *rest):
+        if not rest:
+            return op(first, second)
+        return reduce(op, rest, op(first, second))
+
+    return fold
+
+
+def chained(op: Callable) -> Callable:
+    """Returns a native function comparing every pair of adjacent arguments.
+
+    `(< a b c)` is `a < b and b < c`, all arguments are evaluated before.
+
+    Args:
+        op: Comparison operator from the `operator` module
+    """
+
+    def compare(first, second, *rest):
+        if not rest:
+            return op(first, second)
+        args = (first, second, *rest)
+        return all(map(op, args, islice(args, 1, None)))
+
+    return compare
+
+
+class Function:
+    """User-defined function: a `lambda` closed over the environment it's created in.
+
+    All engines create and call the same objects, a function created by one engine
+    can be called by another one. The code compiled for the function by the engine
+    calling it is cached in `code`.
+    """
+
+    __slots__ = ("params", "arity", "body", "env", "code", "name")
+
+    def __init__(self, params, body, env, code=None, name: str = None):
+        """Creates a function.
+
+        Args:
+            params: Parameter names, a tuple or a list
+            body: AST of the body
+            env: Environment the function is closed over
+            code: Compiled code of the body, if the creating engine compiled it
+            name: Name of the variable the function is declared as, None for an
+                anonymous function (it gets the name of the first `var` it's bound to)
+        """
+        self.params = params if type(params) is tuple else tuple(params)
+        self.arity = len(self.params)
+        self.body = body
+        self.env = env
+        self.code = code
+        self.name = name
+
+    def bind(self, args: list) -> dict:
+        """Returns the activation record binding the parameters to the arguments.
+
+        Raises:
+            InterpreterError: If the number of arguments is not the arity
+        """
+        if len(args) != self.arity:
+            raise self.arity_error(len(args))
+        return dict(zip(self.params, args))
+
+    def arity_error(self, count: int) -> InterpreterError:
+        """Returns the error of a call with `count` arguments."""
+        s = "" if self.arity == 1 else "s"
+        return InterpreterError(
+            f"Function `{self.name or '<lambda>'}` takes {self.arity} argument{s} "
+            f"({' '.join(map(str, self.params))}), {count} given!"
+        )
+
+    def __repr__(self):
+        return f"<function {self.name or '<lambda>'}>"
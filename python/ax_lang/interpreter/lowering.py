@@ -0,0 +1,120 @@
+from numbers import Number
+from typing import Callable, Container
+
+from ax_lang.interpreter.resolver import Resolver
+from ax_lang.interpreter.transformer import Transformer
+
+
+class Lowered(list):
+    """AST node produced from syntactic sugar by the lowering pass.
+
+    Behaves as the core-form list it holds and keeps the sugar node it was lowered from
+    in `origin`, e.g. for error reporting.
+    """
+
+    __slots__ = ("origin",)
+
+    def __init__(self, expr: list, origin: list):
+        super().__init__(expr)
+        self.origin = origin
+
+
+class Block(list):
+    """`begin` block declaring no variables, marked by the lowering pass.
+
+    Engines evaluate it in the enclosing environment instead of a new one, so the block
+    doesn't allocate an environment or lengthen the scope chain, e.g. of a loop body.
+    """
+
+    __slots__ = ()
+
+
+class Lowering:
+    """Whole-program pass rewriting all syntactic sugar into core forms.
+
+    `def`, `switch`, `for`, `++`, `--`, `+=`, `-=` and `*=` are transformed once, before
+    the program is evaluated, so evaluating the lowered AST never invokes the
+    transformer again, e.g. a `for` loop in a function body is not rebuilt on every
+    call of the function.
+
+    `begin` blocks that declare nothing (no `var`, `def`, `class`, `module` or
+    `import` evaluated directly in the block) become `Block` nodes.
+    """
+
+    def __init__(self, transformer: Transformer, custom_forms: Container[str] = ()):
+        """Creates a lowering pass.
+
+        Args:
+            transformer: Transformer of the syntactic sugar
+            custom_forms: Names of the custom special forms, blocks using them may
+                declare variables and are not marked
+        """
+        self._resolver = Resolver(transformer)
+        self._custom_forms = custom_forms
+        self._transforms: dict[str, Callable[[list], list]] = {
+            "def": transformer.def_to_lambda,
+            "switch": transformer.switch_to_if,
+            "for": transformer.for_to_while,
+            "++": transformer.inc_to_set,
+            "--": transformer.dec_to_set,
+            "+=": transformer.plus_assign_to_set,
+            "-=": transformer.minus_assign_to_set,
+            "*=": transformer.multi_assign_to_set,
+        }
+
+    def lower(self, expr: Number | str | list) -> Number | str | list:
+        """Returns the expression with all syntactic sugar transformed.
+
+        Subtrees without syntactic sugar are returned as they are, so lowering an
+        already lowered AST doesn't copy it.
+
+        Args:
+            expr: AST node (number, string, or list) to lower
+
+        Returns:
+            AST node of core forms, a `Lowered` node in place of every sugar node and
+            a `Block` in place of every block declaring nothing
+        """
+        if not isinstance(expr, list) or not expr:
+            return expr
+
+        head = expr[0]
+        if isinstance(head, str):
+            transform = self._transforms.get(head)
+            if transform is not None:
+                lowered = self.lower(transform(expr))
+                if not isinstance(lowered, list):
+                    return lowered
+                return Lowered(lowered, expr)
+            if head == "lambda" and len(expr) == 3:
+                # parameters are names, not expressions
+                _, params, body = expr
+                lowered_body = self.lower(body)
+                if lowered_body is body:
+                    return expr
+                return ["lambda", params, lowered_body]
+
+        lowered = [self.lower(e) for e in expr]
+        if head == "begin" and type(expr) is list and self._is_flat(lowered[1:]):
+            return Block(lowered)
+        if all(old is new for old, new in zip(expr, lowered)):
+            return expr
+        return lowered
+
+    def _is_flat(self, exprs: list) -> bool:
+        # the block declares no variables in its environment
+        return not self._resolver.declared_names(exprs) and not _uses_forms(
+            exprs, self._custom_forms
+        )
+
+
+def _uses_forms(exprs: list, forms: Container[str]) -> bool:
+    if not forms:
+        return False
+    for expr in exprs:
+        if isinstance(expr, list) and expr:
+            if isinstance(expr[0], str) and expr[0] in forms:
+                return True
+            if _uses_forms(expr, forms):
+                return True
+    return False
@@ -0,0 +1,99 @@
+import operator
+from typing import Callable, NamedTuple
+
+from ax_lang.interpreter.functions import (
+    NativeFunctions,
+    binary_variadic,
+    chained,
+    variadic,
+)
+
+
+class NativeFunction(NamedTuple):
+    """Built-in function of the global environment."""
+
+    name: str
+    fn: Callable
+    # minimal and maximal (None: any) number of arguments
+    min_args: int
+    max_args: int | None
+    # whether a call only computes its value from the arguments, so that calls with
+    # constant arguments can be folded
+    pure: bool
+    # Python operator applied instead of a call with two arguments, None if the
+    # engines don't specialize the function
+    operator: Callable | None = None
+
+
+# Built-in functions by name, defined in the global environment (see `global_env`)
+NATIVE_FUNCTIONS: dict[str, NativeFunction] = {
+    native.name: native
+    for native in (
+        # Math operations:
+        NativeFunction("+", variadic(operator.add), 1, None, True, operator.add),
+        NativeFunction("-", NativeFunctions.minus, 1, None, True, operator.sub),
+        NativeFunction("*", variadic(operator.mul), 1, None, True, operator.mul),
+        NativeFunction(
+            "/", binary_variadic(operator.truediv), 2, None, True, operator.truediv
+        ),
+        # Comparison operations, chained: `(< a b c)` is `a < b and b < c`
+        NativeFunction(">", chained(operator.gt), 2, None, True, operator.gt),
+        NativeFunction(">=", chained(operator.ge), 2, None, True, operator.ge),
+        NativeFunction("<", chained(operator.lt), 2, None, True, operator.lt),
+        NativeFunction("<=", chained(operator.le), 2, None, True, operator.le),
+        NativeFunction("==", chained(operator.eq), 2, None, True, operator.eq),
+        # print
+        NativeFunction("print", NativeFunctions.print, 0, None, False),
+    )
+}
+
+# Names of the native functions without side effects
+PURE_NATIVES = tuple(name for name, native in NATIVE_FUNCTIONS.items() if native.pure)
+
+# Built-in binary operators with a fast path in the engines: name -> Python operator
+# applied instead of calling the native function
+BINARY_OPERATORS = {
+    name: native.operator
+    for name, native in NATIVE_FUNCTIONS.items()
+    if native.operator is not None
+}
+
+# Native function of every operator in the global environment. A call takes the fast
+# path only while its head is bound to it: a program rebinding `+` (e.g. with `set` or
+# a `var` in a class body) calls its own function.
+NATIVE_OPERATORS = {name: NATIVE_FUNCTIONS[name].fn for name in BINARY_OPERATORS}
+
+# Operators of the fused `(set x (op x k))` forms `++`, `--`, `+=`, `-=` and `*=` are
+# lowered into
+ASSIGNMENT_OPERATORS = frozenset({"+", "-", "*"})
+
+
+def accepts(native: NativeFunction, count: int) -> bool:
+    """Returns whether a native function can be called with `count` arguments."""
+    return native.min_args <= count and (
+        native.max_args is None or count <= native.max_args
+    )
+
+
+def fused_assignment(expr: list):
+    """Returns the operator and the operand of an assignment updating a variable.
+
+    Args:
+        expr: `set` expression
+
+    Returns:
+        Tuple of the operator name and the operand expression if `expr` is
+        `(set x (op x operand))` with an operator of `ASSIGNMENT_OPERATORS`, else None
+    """
+    _, ref, value = expr
+    if (
+        isinstance(ref, str)
+        and isinstance(value, list)
+        and len(value) == 3
+        and isinstance(value[0], str)
+        and value[0] in ASSIGNMENT_OPERATORS
+        and isinstance(value[1], str)
+        and value[1] == ref
+    ):
+        return value[0], value[2]
+    return None
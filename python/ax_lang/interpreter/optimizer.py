@@ -0,0 +1,245 @@
+import copy
+from numbers import Number
+from typing import Any, Callable
+
+from ax_lang.interpreter.environment import Environment, GlobalEnvironment
+from ax_lang.interpreter.natives import NATIVE_FUNCTIONS, PURE_NATIVES, accepts
+from ax_lang.interpreter.resolver import Resolver
+from ax_lang.interpreter.transformer import BEGIN
+from ax_lang.parser.nodes import String
+
+# Global variables with constant values
+CONSTANTS = ("true", "false", "null")
+
+# the built-in values, a name is only folded while it is bound to its built-in value
+_BUILTINS = {name: GlobalEnvironment.record[name] for name in PURE_NATIVES + CONSTANTS}
+_FOLDABLE = frozenset(_BUILTINS)
+
+
+class Optimizer:
+    """Constant folding and dead-branch elimination over a lowered AST.
+
+    - Calls of pure natives (`PURE_NATIVES`) with constant number operands are replaced
+      by their value, e.g. `(* (* 60 60) 24)` or `(* 60 60 24)` by `86400`, if the
+      native function accepts the number of operands
+    - `if` with a constant condition is replaced by the taken branch, `while` with a
+      constant false condition by an empty block evaluating to null
+
+    A name is folded only if the program can't rebind it: it is not declared (`var`,
+    `def`, parameters, `class`, `module`, `import`) in any enclosing scope, not assigned
+    with `set` anywhere in the program, neither as a variable nor as a property (e.g.
+    `(set (prop Calc +) f)` rebinds `+` in the methods of `Calc`), and bound to its
+    built-in value in the environment the program is evaluated in. A class with a parent
+    sees the variables of the parent class, so no names are folded in its body. Calls
+    raising an error (e.g. division by zero) are kept to raise it at runtime.
+
+    A top-level form of a program evaluated one form at a time is optimized before the
+    next forms are read, and they can rebind a name before a function of the form is
+    called, so no names are folded in the function bodies of such a form.
+    """
+
+    def __init__(
+        self,
+        resolver: Resolver = None,
+        custom_forms: dict[str, Callable] = None,
+        on_optimize: Callable[[Any, Any], None] = None,
+    ):
+        """Creates an optimizer.
+
+        Args:
+            resolver: Resolver finding names declared in scopes
+            custom_forms: Registered special forms, their arguments are not evaluated
+                as expressions and are left as they are
+            on_optimize: Called with the AST before and after every `optimize`
+        """
+        self.resolver = resolver or Resolver()
+        self.custom_forms = {} if custom_forms is None else custom_forms
+        self.on_optimize = on_optimize
+        # folded calls and pruned branches
+        self.folded = 0
+        self.pruned = 0
+        # False while optimizing a form followed by forms that aren't known yet
+        self._fold_functions = True
+
+    def optimize(
+        self, expr: Number | str | list, env: Environment = None, complete: bool = True
+    ):
+        """Returns the optimized expression.
+
+        Args:
+            expr: Lowered AST node (see `Lowering`)
+            env: Environment the expression is evaluated in. Without it the bindings
+                of the names are unknown and no names are folded
+            complete: False for a top-level form followed by forms that aren't known
+                yet (see `AxLang.eval_forms`), no names are folded in its functions
+
+        Returns:
+            Optimized AST node, `expr` itself if nothing is optimized
+        """
+        shadowed = {name for name in _FOLDABLE if not _is_builtin(name, env)}
+        _collect_assigned(expr, shadowed)
+        self._fold_functions = complete
+        optimized = self._optimize(expr, frozenset(shadowed))
+        if self.on_optimize is not None:
+            self.on_optimize(expr, optimized)
+        return optimized
+
+    def _declared(self, exprs: list) -> frozenset:
+        return _FOLDABLE.intersection(self.resolver.declared_names(exprs))
+
+    def _optimize(self, expr, shadowed: frozenset):
+        if not isinstance(expr, list) or not expr:
+            return expr
+        head = expr[0]
+        if isinstance(head, str):
+            if head in self.custom_forms:
+                return expr
+            if head == "begin":
+                shadowed |= self._declared(expr[1:])
+                return self._rebuild(expr, 1, shadowed)
+            if head == "lambda":
+                _, params, body = expr
+                if not self._fold_functions:
+                    # the body runs after forms that can rebind the names
+                    shadowed = _FOLDABLE
+                shadowed |= _FOLDABLE.intersection(params)
+                shadowed |= self._declared(_body_exprs(body))
+                return self._rebuild(expr, 2, shadowed)
+            if head == "class":
+                _, name, parent, body = expr
+                body_shadowed = shadowed | self._declared(_body_exprs(body))
+                if not (parent == "null" and "null" not in shadowed):
+                    # names can be rebound by the parent class
+                    body_shadowed = _FOLDABLE
+                new_parent = self._optimize(parent, shadowed)
+                new_body = self._optimize(body, body_shadowed)
+                if new_parent is parent and new_body is body:
+                    return expr
+                return _replace(expr, [head, name, new_parent, new_body])
+            if head == "module":
+                shadowed |= self._declared(_body_exprs(expr[2]))
+                return self._rebuild(expr, 2, shadowed)
+            if head in ("var", "set"):
+                return self._rebuild(expr, 2, shadowed)
+            if head == "prop":
+                # the property name is not evaluated
+                instance = self._optimize(expr[1], shadowed)
+                if instance is expr[1]:
+                    return expr
+                return _replace(expr, [head, instance, expr[2]])
+            if head == "new":
+                return self._rebuild(expr, 1, shadowed)
+            if head in ("super", "import"):
+                return expr
+            if head == "if":
+                return self._optimize_if(expr, shadowed)
+            if head == "while":
+                return self._optimize_while(expr, shadowed)
+
+        # Function calls:
+        optimized = self._rebuild(expr, 0, shadowed)
+        native = NATIVE_FUNCTIONS.get(head) if isinstance(head, str) else None
+        if (
+            native is not None
+            and native.pure
+            and head not in shadowed
+            and accepts(native, len(expr) - 1)
+            and all(_is_number(arg) for arg in optimized[1:])
+        ):
+            try:
+                value = native.fn(*optimized[1:])
+            except Exception:
+                # e.g. division by zero: raised at runtime
+                return optimized
+            self.folded += 1
+            return value
+        return optimized
+
+    def _optimize_if(self, expr: list, shadowed: frozenset):
+        condition = self._optimize(expr[1], shadowed)
+        truth = _constant_truth(condition, shadowed)
+        if truth is not None:
+            self.pruned += 1
+            return self._optimize(expr[2] if truth else expr[3], shadowed)
+        return self._rebuild(expr, 2, shadowed, condition)
+
+    def _optimize_while(self, expr: list, shadowed: frozenset):
+        condition = self._optimize(expr[1], shadowed)
+        if _constant_truth(condition, shadowed) is False:
+            self.pruned += 1
+            return [BEGIN]
+        return self._rebuild(expr, 2, shadowed, condition)
+
+    def _rebuild(
+        self, expr: list, start: int, shadowed: frozenset, condition=None
+    ) -> list:
+        # optimizes the subexpressions from `start` on, `condition` is the optimized
+        # `expr[1]` of `if` and `while`
+        new = list(expr)
+        for i in range(start, len(expr)):
+            new[i] = self._optimize(expr[i], shadowed)
+        if condition is not None:
+            new[1] = condition
+        if all(old is e for old, e in zip(expr, new)):
+            return expr
+        return _replace(expr, new)
+
+
+def _is_builtin(name: str, env: Environment | None) -> bool:
+    if env is None:
+        return False
+    try:
+        return env.lookup(name) is _BUILTINS[name]
+    except ValueError:
+        return False
+
+
+def _collect_assigned(expr, names: set) -> None:
+    # `set` of a name rebinds it wherever it's declared, `set` of a property rebinds
+    # it in the record of a class or module, on the lexical chain of its functions
+    if not isinstance(expr, list):
+        return
+    if len(expr) == 3 and expr[0] == "set":
+        target = expr[1]
+        if isinstance(target, str):
+            names.add(str(target))
+        elif (
+            isinstance(target, list)
+            and len(target) == 3
+            and target[0] == "prop"
+            and isinstance(target[2], str)
+        ):
+            names.add(str(target[2]))
+    for e in expr:
+        _collect_assigned(e, names)
+
+
+def _body_exprs(body) -> list:
+    # a `begin` body runs directly in the function, class or module environment
+    if isinstance(body, list) and body and body[0] == "begin":
+        return body[1:]
+    return [body]
+
+
+def _is_number(expr) -> bool:
+    return isinstance(expr, Number)
+
+
+def _constant_truth(expr, shadowed: frozenset) -> bool | None:
+    # truth value of a constant condition, None if it's not a constant
+    if isinstance(expr, Number):
+        return bool(expr)
+    if isinstance(expr, String):
+        return bool(expr.value)
+    if isinstance(expr, str):
+        if len(expr) > 1 and expr[0] == '"' and expr[-1] == '"':
+            return len(expr) > 2
+        if expr in CONSTANTS and expr not in shadowed:
+            return bool(_BUILTINS[expr])
+    return None
+
+
+def _replace(expr: list, new: list) -> list:
+    replaced = copy.copy(expr)  # keeps the type, e.g. `Lowered`
+    replaced[:] = new
+    return replaced
@@ -0,0 +1,233 @@
+import os
+import time
+from numbers import Number
+from pathlib import Path
+from typing import Callable, Iterable, NamedTuple
+
+from ax_lang.exceptions import InterpreterError
+from ax_lang.interpreter.environment import Environment
+
+# Directory of the standard library modules, the last entry of every search path
+BUILTIN_MODULES_DIR = Path(__file__).parent / "modules"
+
+# Environment variable with directories searched for modules before the standard
+# library, separated by `os.pathsep`
+AXPATH = "AXPATH"
+
+MODULE_SUFFIX = ".ax"
+
+
+class ImportStats(NamedTuple):
+    """Report of a module imported through a `ModuleRegistry`."""
+
+    name: str
+    path: Path
+    # `import` forms evaluated for the module, at most one of them loaded it
+    imports: int
+    # False for a module imported lazily and never accessed
+    loaded: bool
+    # time to read, parse and prepare the module source and to evaluate its body
+    # (including the modules it imports), in seconds
+    load_time: float
+    eval_time: float
+
+    def __str__(self):
+        if not self.loaded:
+            return f"{self.name}: {self.imports} imports, not loaded ({self.path})"
+        return (
+            f"{self.name}: {self.imports} imports, "
+            f"load {self.load_time * 1e3:.2f} ms, eval {self.eval_time * 1e3:.2f} ms "
+            f"({self.path})"
+        )
+
+
+class Module:
+    """Module of a registry: the environment of its body once it's evaluated."""
+
+    __slots__ = (
+        "name",
+        "path",
+        "env",
+        "loading",
+        "proxy",
+        "imports",
+        "load_time",
+        "eval_time",
+    )
+
+    def __init__(self, name: str, path: Path):
+        self.name = name
+        self.path = path
+        # None until the body is evaluated
+        self.env: Environment | None = None
+        # True while the body is being evaluated
+        self.loading = False
+        # proxy bound by lazy imports before the module is loaded
+        self.proxy: LazyModule | None = None
+        self.imports = 1
+        self.load_time = 0.0
+        self.eval_time = 0.0
+
+
+class LazyModule(Environment):
+    """Module bound by a lazy `import`, loaded on its first access.
+
+    Looking up, defining or resolving a name of the proxy, e.g. `(prop math abs)`,
+    evaluates the module body once and then forwards to the module environment.
+    """
+
+    __slots__ = ("name", "loader", "env")
+
+    def __init__(self, name: str, loader: Callable[[], Environment]):
+        """Creates a proxy of a module that isn't loaded yet.
+
+        Args:
+            name: Module name
+            loader: Loads the module and returns its environment
+        """
+        self.parent = None
+        self.name = name
+        self.loader = loader
+        # environment of the module once it's loaded
+        self.env: Environment | None = None
+
+    def load(self) -> Environment:
+        """Returns the environment of the module, loading it on the first call."""
+        env = self.env
+        if env is None:
+            env = self.env = self.loader()
+        return env
+
+    @property
+    def record(self) -> dict:
+        return self.load().record
+
+    def define(self, name, value):
+        return self.load().define(name, value)
+
+    def lookup(self, name):
+        return self.load().lookup(name)
+
+    def resolve(self, name) -> Environment:
+        return self.load().resolve(name)
+
+    def __repr__(self):
+        state = "loaded" if self.env is not None else "not loaded"
+        return f"<lazy module {self.name} ({state})>"
+
+
+def axpath_dirs() -> list[Path]:
+    """Returns the directories of the `AXPATH` environment variable."""
+    return [Path(d) for d in os.environ.get(AXPATH, "").split(os.pathsep) if d]
+
+
+class ModuleRegistry:
+    """Modules loaded by an interpreter (`sys.modules` for ax-lang).
+
+    Modules are keyed by the resolved path of their source. `(import name)` looks up
+    `name.ax` in the directories of the search path, in order: the directories the
+    registry is created with, the `AXPATH` ones and the standard library. A module is
+    loaded once: its source is read and its body evaluated on the first import, later
+    imports (of any name resolving to the same file) return the same environment.
+    """
+
+    def __init__(self, search_path: Iterable[str | Path] = ()):
+        """Creates an empty registry.
+
+        Args:
+            search_path: Directories searched for modules before the `AXPATH` ones
+        """
+        self.search_path = [
+            *map(Path, search_path),
+            *axpath_dirs(),
+            BUILTIN_MODULES_DIR,
+        ]
+        self.modules: dict[Path, Module] = {}
+        # module name -> resolved path, the search path is walked once for every name
+        self.paths: dict[str, Path] = {}
+
+    def find(self, name: str) -> Path:
+        """Returns the resolved path of the source of a module.
+
+        Raises:
+            InterpreterError: If no directory of the search path has the module
+        """
+        path = self.paths.get(name)
+        if path is not None:
+            return path
+        for directory in self.search_path:
+            path = directory / f"{name}{MODULE_SUFFIX}"
+            if path.is_file():
+                path = self.paths[name] = path.resolve()
+                return path
+        raise InterpreterError(f"Module `{name}` is not found in the search path!")
+
+    def load(
+        self,
+        name: str,
+        parse: Callable[[Path], Number | str | list],
+        evaluate: Callable[[Number | str | list], Environment],
+        lazy: bool = False,
+    ) -> Environment:
+        """Returns the environment of a module, loading it on the first import.
+
+        Args:
+            name: Module name
+            parse: Returns the AST of the body of the module from its source path
+            evaluate: Evaluates the body and returns the module environment
+            lazy: If True, a module that isn't loaded yet is returned as a
+                `LazyModule` loading it on its first access
+
+        Raises:
+            InterpreterError: If the module is not found or is loaded while its body
+                is evaluated (a circular import)
+        """
+        path = self.find(name)
+        module = self.modules.get(path)
+        if module is None:
+            module = self.modules[path] = Module(name, path)
+        else:
+            module.imports += 1
+        if module.env is not None:
+            return module.env
+        if lazy:
+            if module.proxy is None:
+                module.proxy = LazyModule(
+                    name, lambda: self._evaluate(module, parse, evaluate)
+                )
+            return module.proxy
+        return self._evaluate(module, parse, evaluate)
+
+    def stats(self) -> list[ImportStats]:
+        """Returns the reports of the imported modules, in the order of their first
+        import."""
+        return [
+            ImportStats(
+                m.name,
+                m.path,
+                m.imports,
+                m.env is not None,
+                m.load_time,
+                m.eval_time,
+            )
+            for m in self.modules.values()
+        ]
+
+    def _evaluate(self, module: Module, parse: Callable, evaluate: Callable):
+        if module.env is not None:
+            # loaded by an eager import after the proxy was bound
+            return module.env
+        if module.loading:
+            raise InterpreterError(f"Circular import of module `{module.name}`!")
+        module.loading = True
+        start = time.perf_counter()
+        try:
+            body = parse(module.path)
+            parsed = time.perf_counter()
+            module.env = evaluate(body)
+        finally:
+            # a failed import is retried by the next import or access
+            module.loading = False
+        module.load_time = parsed - start
+        module.eval_time = time.perf_counter() - parsed
+        return module.env
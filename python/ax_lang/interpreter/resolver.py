@@ -0,0 +1,188 @@
+from typing import Callable, NamedTuple
+
+from ax_lang.interpreter.transformer import Transformer
+
+BLOCK = "block"
+FUNCTION = "function"
+# variables captured by a flat closure
+CLOSURE = "closure"
+DYNAMIC = "dynamic"
+
+
+class Scope:
+    """Compile-time description of an environment.
+
+    A static scope (a block, a function activation or the variables captured by a flat
+    closure) knows all names declared in it, each of them gets a fixed slot of the
+    `Frame` created for the scope at runtime.
+    A dynamic scope (the environment a program is evaluated in, a class or a module
+    body) is an `Environment` with a dict record whose names are looked up by name.
+    """
+
+    __slots__ = ("kind", "names", "index", "parent", "exprs", "params", "_assigned")
+
+    def __init__(
+        self,
+        kind: str,
+        names: list[str] = (),
+        parent: "Scope" = None,
+        exprs: list = (),
+        params: int = 0,
+    ):
+        """Creates a scope.
+
+        Args:
+            kind: `block`, `function`, `closure` or `dynamic`
+            names: Names declared in a static scope, in slot order
+            parent: Enclosing scope, None for a dynamic scope
+            exprs: Expressions evaluated directly in a static scope
+            params: Number of parameters of a function scope, the first names
+        """
+        self.kind = kind
+        self.names = list(names)
+        # a repeated parameter name binds the last argument, like a dict record
+        self.index = {name: slot for slot, name in enumerate(self.names)}
+        self.parent = parent
+        self.exprs = exprs
+        self.params = params
+        self._assigned: set[str] | None = None
+
+    @property
+    def is_dynamic(self) -> bool:
+        return self.kind == DYNAMIC
+
+    def resolve(self, name: str) -> tuple[int, int | None]:
+        """Returns the lexical address of a name as seen from this scope.
+
+        Returns:
+            (depth, slot) where depth is the number of frames between this scope and
+            the scope declaring the name. If no static scope declares the name, slot
+            is None and depth is the number of frames up to the dynamic scope where
+            the name is looked up by name.
+        """
+        depth = 0
+        scope = self
+        while not scope.is_dynamic:
+            slot = scope.index.get(name)
+            if slot is not None:
+                return depth, slot
+            depth += 1
+            scope = scope.parent
+        return depth, None
+
+    @property
+    def assigned_names(self) -> set[str]:
+        """Names assigned anywhere in the expressions of the scope (nested included)."""
+        if self._assigned is None:
+            self._assigned = assigned_names(self.exprs)
+        return self._assigned
+
+    def __repr__(self):
+        return f"<{self.kind} scope {self.names}>"
+
+
+# forms assigning a variable, directly or as syntactic sugar
+_ASSIGNMENTS = frozenset({"set", "++", "--", "+=", "-=", "*="})
+
+
+def assigned_names(exprs: list) -> set[str]:
+    """Returns names of the variables assigned anywhere in the expressions."""
+    names = set()
+    stack = list(exprs)
+    while stack:
+        expr = stack.pop()
+        if isinstance(expr, list) and expr:
+            head = expr[0]
+            if (
+                isinstance(head, str)
+                and head in _ASSIGNMENTS
+                and len(expr) > 1
+                and isinstance(expr[1], str)
+            ):
+                names.add(str(expr[1]))
+            stack.extend(expr)
+    return names
+
+
+def body_exprs(body) -> list:
+    """Returns the expressions of a function, class or module body.
+
+    A `begin` body is run directly in the environment of the function, class or
+    module, its expressions are evaluated in the scope of the body.
+    """
+    if isinstance(body, list) and body and body[0] == "begin":
+        return body[1:]
+    return [body]
+
+
+class Resolution(NamedTuple):
+    """Lexical address of a variable reference, assignment or declaration."""
+
+    name: str
+    # `lookup`, `assign` or `declare`
+    access: str
+    # frames between the referencing scope and the declaring or the dynamic scope
+    depth: int
+    # slot in the frame of the declaring scope, None for a lookup by name
+    slot: int | None
+
+
+class Resolver:
+    """Finds names declared in scopes for the lexical addressing of variables.
+
+    Declarations are `var` (and `def`), `class`, `module` and `import` forms evaluated
+    directly in a scope, i.e. not inside a nested block, function, class or module body.
+    """
+
+    def __init__(self, transformer: Transformer = None):
+        transformer = transformer or Transformer()
+        # sugar changing scopes or declaring names
+        self._desugar: dict[str, Callable[[list], list]] = {
+            "def": transformer.def_to_lambda,
+            "for": transformer.for_to_while,
+            "switch": transformer.switch_to_if,
+        }
+
+    def block_scope(self, exprs: list, parent: Scope) -> Scope:
+        """Returns the scope of a `begin` block with the given expressions."""
+        return Scope(BLOCK, self.declared_names(exprs), parent, exprs)
+
+    def function_scope(self, params: list, body, parent: Scope) -> Scope:
+        """Returns the activation scope of a function: parameters and declarations."""
+        exprs = body_exprs(body)
+        declared = self.declared_names(exprs)
+        names = [*params, *(name for name in declared if name not in params)]
+        return Scope(FUNCTION, names, parent, exprs, len(params))
+
+    def declared_names(self, exprs: list) -> list[str]:
+        """Returns names declared by expressions evaluated directly in a scope."""
+        names = {}
+        for expr in exprs:
+            self._collect(expr, names)
+        return list(names)
+
+    def _collect(self, expr, names: dict) -> None:
+        if not isinstance(expr, list) or not expr:
+            return
+        head = expr[0]
+        if isinstance(head, str):
+            desugar = self._desugar.get(head)
+            if desugar is not None:
+                expr = desugar(expr)
+                head = expr[0]
+            if head == "var":
+                names[expr[1]] = None
+                self._collect(expr[2], names)
+                return
+            if head == "class":
+                names[expr[1]] = None
+                self._collect(expr[2], names)
+                return
+            if head in ("module", "import"):
+                names[expr[1]] = None
+                return
+            if head in ("begin", "lambda"):
+                # a nested scope
+                return
+        for e in expr:
+            self._collect(e, names)
@@ -0,0 +1,368 @@
+from collections.abc import MutableMapping
+
+from ax_lang.interpreter.environment import UNSET, Environment
+
+# Limits of the shape tree, which lives as long as the process. A shape has at most
+# `MAX_PROPERTIES` properties, so copying its index on a transition is bounded, and at
+# most `MAX_SHAPES` shapes are created. Past them, an instance adding a property
+# switches to a `DictInstance`.
+MAX_PROPERTIES = 64
+MAX_SHAPES = 10_000
+
+
+class Shape:
+    """Layout of instances: the slot of every property, in the order they were added.
+
+    Instances that got the same properties in the same order share a shape, so a slot
+    cached for a shape is the slot of the property in every instance of that shape.
+    Adding a property moves an instance to the next shape along a transition, which is
+    created once and then shared by all instances taking it.
+    """
+
+    __slots__ = ("index", "transitions")
+
+    # Shapes created by transitions
+    created = 0
+
+    def __init__(self, index: dict):
+        """Creates a shape.
+
+        Args:
+            index: Slot of every property name
+        """
+        self.index = index
+        self.transitions = {}
+
+    def add(self, name: str) -> "Shape | None":
+        """Returns the shape extending this one with a property in the next slot.
+
+        Returns None if the transition doesn't exist yet and would go past
+        `MAX_PROPERTIES` or `MAX_SHAPES`.
+        """
+        shape = self.transitions.get(name)
+        if shape is None:
+            if len(self.index) >= MAX_PROPERTIES or Shape.created >= MAX_SHAPES:
+                return None
+            Shape.created += 1
+            shape = Shape({**self.index, name: len(self.index)})
+            self.transitions[name] = shape
+        return shape
+
+    def __repr__(self):
+        return f"<shape {' '.join(map(str, self.index))}>"
+
+
+# Shape of new instances, the root of all transitions
+EMPTY_SHAPE = Shape({})
+
+
+class InstanceRecord(MutableMapping):
+    """Dict-like view of the properties of an instance, for access by name."""
+
+    __slots__ = ("instance",)
+
+    def __init__(self, instance: "Instance"):
+        self.instance = instance
+
+    def __getitem__(self, name):
+        return self.instance.slots[self.instance.shape.index[name]]
+
+    def __setitem__(self, name, value):
+        self.instance.define(name, value)
+
+    def __delitem__(self, name):
+        raise TypeError(f"Property `{name}` of an instance can't be deleted!")
+
+    def __iter__(self):
+        return iter(self.instance.shape.index)
+
+    def __len__(self):
+        return len(self.instance.shape.index)
+
+
+class Instance(Environment):
+    """Instance of a class with its properties stored in slots laid out by a shape.
+
+    Properties are defined with `(set (prop this name) value)`. Names that aren't
+    properties of the instance (e.g. methods) are looked up in the class.
+    """
+
+    __slots__ = ("shape", "slots")
+
+    def __init__(self, class_env: Environment):
+        """Creates an instance without properties.
+
+        Args:
+            class_env: Environment of the class
+        """
+        self.shape = EMPTY_SHAPE
+        self.slots = []
+        self.parent = class_env
+
+    @property
+    def record(self) -> InstanceRecord:
+        return InstanceRecord(self)
+
+    def define(self, name, value):
+        index = self.shape.index.get(name)
+        if index is None:
+            shape = self.shape.add(name)
+            if shape is None:
+                self.to_dict().slots[name] = value
+                return value
+            self.shape = shape
+            self.slots.append(value)
+        else:
+            self.slots[index] = value
+        return value
+
+    def lookup(self, name):
+        index = self.shape.index.get(name)
+        if index is None:
+            return self.parent.lookup(name)
+        return self.slots[index]
+
+    def resolve(self, name) -> Environment:
+        if name in self.shape.index:
+            return self
+        return self.parent.resolve(name)
+
+    def to_dict(self) -> "DictInstance":
+        """Moves the properties to a dict and makes this instance a `DictInstance`."""
+        self.slots = dict(zip(self.shape.index, self.slots))
+        self.shape = None
+        # same layout, so the type can be switched in place
+        self.__class__ = DictInstance
+        return self
+
+
+class DictInstance(Instance):
+    """Instance with its properties in a dict, once adding one went past the limits
+    of the shape tree.
+
+    `slots` is the dict of properties and `shape` is None, so the shape checks of the
+    property caches always miss.
+    """
+
+    __slots__ = ()
+
+    @property
+    def record(self) -> dict:
+        return self.slots
+
+    def define(self, name, value):
+        self.slots[name] = value
+        return value
+
+    def lookup(self, name):
+        if name in self.slots:
+            return self.slots[name]
+        return self.parent.lookup(name)
+
+    def resolve(self, name) -> Environment:
+        if name in self.slots:
+            return self
+        return self.parent.resolve(name)
+
+
+class FieldRecord(MutableMapping):
+    """Dict-like view of the fields and properties of a `FieldInstance`."""
+
+    __slots__ = ("instance",)
+
+    def __init__(self, instance: "FieldInstance"):
+        self.instance = instance
+
+    def __getitem__(self, name):
+        slot = self.instance.fields.get(name)
+        if slot is None:
+            if self.instance.extra is None:
+                raise KeyError(name)
+            return self.instance.extra[name]
+        value = getattr(self.instance, slot)
+        if value is UNSET:
+            raise KeyError(name)
+        return value
+
+    def __setitem__(self, name, value):
+        self.instance.define(name, value)
+
+    def __delitem__(self, name):
+        raise TypeError(f"Property `{name}` of an instance can't be deleted!")
+
+    def __iter__(self):
+        instance = self.instance
+        for name, slot in instance.fields.items():
+            if getattr(instance, slot) is not UNSET:
+                yield name
+        if instance.extra is not None:
+            yield from instance.extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+class FieldInstance(Environment):
+    """Instance of a class declaring its fields with `(fields name ...)`.
+
+    The fields are stored at fixed offsets in the instance itself, in the `__slots__`
+    of a type generated for the class (see `field_instance_type`), instead of a list
+    of slots and a shape. Properties that aren't declared are kept in a dict. A field
+    is `UNSET` until it's set, and is looked up in the class meanwhile (e.g. a method
+    of the same name), as a property the instance doesn't have yet.
+    """
+
+    __slots__ = ("extra",)
+
+    # Attribute of every field, set on the generated types
+    fields: dict[str, str] = {}
+
+    def __init__(self, class_env: Environment):
+        """Creates an instance with unset fields.
+
+        Args:
+            class_env: Environment of the class
+        """
+        self.parent = class_env
+        self.extra = None
+        for slot in self.fields.values():
+            setattr(self, slot, UNSET)
+
+    @property
+    def record(self) -> FieldRecord:
+        return FieldRecord(self)
+
+    def define(self, name, value):
+        slot = self.fields.get(name)
+        if slot is not None:
+            setattr(self, slot, value)
+        elif self.extra is None:
+            self.extra = {name: value}
+        else:
+            self.extra[name] = value
+        return value
+
+    def lookup(self, name):
+        slot = self.fields.get(name)
+        if slot is not None:
+            value = getattr(self, slot)
+            if value is not UNSET:
+                return value
+        elif self.extra is not None and name in self.extra:
+            return self.extra[name]
+        return self.parent.lookup(name)
+
+    def resolve(self, name) -> Environment:
+        slot = self.fields.get(name)
+        if slot is not None:
+            if getattr(self, slot) is not UNSET:
+                return self
+        elif self.extra is not None and name in self.extra:
+            return self
+        return self.parent.resolve(name)
+
+
+def field_instance_type(class_name: str, fields: tuple) -> type[FieldInstance]:
+    """Returns a type of instances storing the fields in its `__slots__`.
+
+    Args:
+        class_name: Name of the class, the name of the type
+        fields: Field names, in the order of their offsets
+    """
+    slots = tuple(f"field_{i}" for i in range(len(fields)))
+    return type(
+        class_name,
+        (FieldInstance,),
+        {"__slots__": slots, "fields": dict(zip(fields, slots))},
+    )
+
+
+class PropertyCache:
+    """Inline cache of a `prop` read or write site.
+
+    Keeps the slot of the property in the shape of the last instance the site accessed,
+    so an instance of the same shape is accessed with a shape check and an indexed
+    load or store. A write site adding the property also keeps the transition it took.
+    For a `FieldInstance` it keeps the type of the last instance and the attribute of
+    the field. Engines inline the checks of `shape` and `layout` and call `load` or
+    `store` on a miss.
+    """
+
+    __slots__ = ("name", "shape", "index", "before", "after", "layout", "slot")
+
+    def __init__(self, name: str):
+        """Creates an empty cache.
+
+        Args:
+            name: Property name of the site
+        """
+        self.name = name
+        # shape of the last instance having the property and the slot of the property
+        self.shape = None
+        self.index = None
+        # last transition adding the property
+        self.before = None
+        self.after = None
+        # type of the last field instance having the property and its attribute
+        self.layout = None
+        self.slot = None
+
+    def load(self, obj):
+        """Returns the property of an object (an instance, a class or a module)."""
+        if type(obj) is not Instance:
+            if self._cache_field(obj):
+                value = getattr(obj, self.slot)
+                if value is not UNSET:
+                    return value
+            return obj.lookup(self.name)
+        shape = obj.shape
+        if shape is self.shape:
+            return obj.slots[self.index]
+        index = shape.index.get(self.name)
+        if index is None:
+            # a method, looked up in the class
+            return obj.parent.lookup(self.name)
+        self.shape = shape
+        self.index = index
+        return obj.slots[index]
+
+    def store(self, obj, value):
+        """Defines the property of an object (an instance, a class or a module)."""
+        if type(obj) is not Instance:
+            if self._cache_field(obj):
+                setattr(obj, self.slot, value)
+                return value
+            return obj.define(self.name, value)
+        shape = obj.shape
+        if shape is self.shape:
+            obj.slots[self.index] = value
+            return value
+        if shape is self.before:
+            obj.shape = self.after
+            obj.slots.append(value)
+            return value
+        index = shape.index.get(self.name)
+        if index is None:
+            after = shape.add(self.name)
+            if after is None:
+                return obj.define(self.name, value)
+            self.before = shape
+            self.after = after
+            obj.shape = after
+            obj.slots.append(value)
+        else:
+            self.shape = shape
+            self.index = index
+            obj.slots[index] = value
+        return value
+
+    def _cache_field(self, obj) -> bool:
+        # caches the attribute of the property if it's a field of the instance
+        if not isinstance(obj, FieldInstance):
+            return False
+        slot = obj.fields.get(self.name)
+        if slot is None:
+            return False
+        self.layout = type(obj)
+        self.slot = slot
+        return True
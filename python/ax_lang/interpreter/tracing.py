@@ -0,0 +1,60 @@
+import logging
+from numbers import Number
+from typing import Any
+
+from ax_lang.interpreter.environment import Environment
+from ax_lang.interpreter.functions import Function
+
+logger = logging.getLogger(__name__)
+
+
+class Tracer:
+    """Receives evaluation events of an `AxLang` instance.
+
+    Install a tracer with `AxLang.set_tracer`. The interpreter only checks whether a
+    tracer is installed, so evaluation without one doesn't pay for building event data.
+    Subclasses override the events they need, the default handlers do nothing.
+    """
+
+    def on_enter(self, expr: Number | str | list, env: Environment) -> None:
+        """An expression is going to be evaluated in an environment."""
+
+    def on_exit(self, expr: Number | str | list, value: Any) -> None:
+        """An expression has been evaluated to a value.
+
+        Expressions in tail position are evaluated before the enclosing expression
+        exits, so their exit events come in reverse order of the enter events with the
+        same value. Exits are not reported for expressions raising an error.
+        """
+
+    def on_call(self, fn: Any, args: list) -> None:
+        """A native or user-defined function is called with evaluated arguments."""
+
+    def on_return(self, fn: Any, value: Any) -> None:
+        """A function call returned a value."""
+
+    def on_define(self, env: Environment, name: str, value: Any) -> None:
+        """A variable, class, module or property is defined in an environment."""
+
+
+class LoggingTracer(Tracer):
+    """Logs every evaluation event at the DEBUG level, used by `axlang --debug`."""
+
+    def on_enter(self, expr, env):
+        logger.debug(f"Expr: {expr}")
+
+    def on_exit(self, expr, value):
+        logger.debug(f"Value: `{value}` of expr: {expr}")
+
+    def on_call(self, fn, args):
+        if isinstance(fn, Function):
+            name = fn.name or "user-defined function"
+        else:
+            name = getattr(fn, "__name__", None) or "native function"
+        logger.debug(f"Applying fn: `{name}` to args: `{args}`...")
+
+    def on_return(self, fn, value):
+        logger.debug(f"Returned: `{value}`")
+
+    def on_define(self, env, name, value):
+        logger.debug(f"Defining name=`{name}` with value=`{value}` in the current env.")
@@ -1,7 +1,30 @@
+import functools
 import logging
+from collections import Counter
+from typing import Callable
+
+from ax_lang.parser.nodes import Symbol
 
 logger = logging.getLogger(__name__)
 
+# Symbols of the core forms produced by the transformations. They are equal to the
+# plain strings, so the result is a valid plain AST as well as a typed one.
+VAR, LAMBDA, IF, BEGIN, WHILE, SET = map(
+    Symbol, ("var", "lambda", "if", "begin", "while", "set")
+)
+PLUS, MINUS, TIMES = Symbol("+"), Symbol("-"), Symbol("*")
+
+
+def _counted(transform: Callable[["Transformer", list], list]) -> Callable:
+    """Counts invocations of a transformation in `Transformer.invocations`."""
+
+    @functools.wraps(transform)
+    def counted(self, expr: list) -> list:
+        self.invocations[transform.__name__] += 1
+        return transform(self, expr)
+
+    return counted
+
 
 class Transformer:
     """Performs Just-In-Time transformations of syntactic sugar into core language constructs.
@@ -10,6 +33,11 @@ class Transformer:
     expressions that the interpreter can directly evaluate.
     """
 
+    def __init__(self):
+        # number of invocations of every transformation
+        self.invocations = Counter()
+
+    @_counted
     def def_to_lambda(self, def_expr: list) -> list:
         """Transforms function definition to lambda.
 
@@ -26,8 +54,9 @@ class Transformer:
             -> ["var", "square", ["lambda", ["x"], ["*", "x", "x"]]]
         """
         _, name, params, body = def_expr
-        return ["var", name, ["lambda", params, body]]
+        return [VAR, name, [LAMBDA, params, body]]
 
+    @_counted
     def switch_to_if(self, switch_expr: list) -> list:
         """Transforms switch to nested if expressions.
 
@@ -43,9 +72,9 @@ class Transformer:
             ["switch", [["==", "x", 10], 100], [[">", "x", 10], 200], ["else", 300]]
             -> ["if", ["==", "x", 10], 100, ["if", [">", "x", 10], 200, 300]]
         """
-        logger.debug(f"Transforming switch expr=`{switch_expr}`...")
+        logger.debug("Transforming switch expr=`%s`...", switch_expr)
         _, *cases = switch_expr
-        if_expr = ["if", None, None, None]
+        if_expr = [IF, None, None, None]
         curr_if = if_expr
         for i in range(len(cases) - 1):
             curr_cond, curr_block = cases[i]
@@ -53,12 +82,13 @@ class Transformer:
             curr_if[2] = curr_block
 
             next_cond, next_block = cases[i + 1]
-            curr_if[3] = next_block if next_cond == "else" else ["if", None, None, None]
+            curr_if[3] = next_block if next_cond == "else" else [IF, None, None, None]
 
             curr_if = curr_if[3]
-        logger.debug(f"Result if expr=`{if_expr}`.")
+        logger.debug("Result if expr=`%s`.", if_expr)
         return if_expr
 
+    @_counted
     def for_to_while(self, for_expr: list) -> list:
         """Transforms for-loop to while-loop.
 
@@ -75,16 +105,17 @@ class Transformer:
             -> ["begin", ["var", "i", 0],
                 ["while", ["<", "i", 10], ["begin", ["print", "i"], ["set", "i", ["+", "i", 1]]]]]
         """
-        logger.debug(f"Transforming `for` expr=`{for_expr}`...")
+        logger.debug("Transforming `for` expr=`%s`...", for_expr)
         _, init, condition, modifier, body = for_expr
         while_expr = [
-            "begin",
+            BEGIN,
             init,
-            ["while", condition, ["begin", body, modifier]],
+            [WHILE, condition, [BEGIN, body, modifier]],
         ]
-        logger.debug(f"Result `while` expr=`{while_expr}`.")
+        logger.debug("Result `while` expr=`%s`.", while_expr)
         return while_expr
 
+    @_counted
     def inc_to_set(self, expr: list) -> list:
         """Transforms ++ to set expression.
 
@@ -98,9 +129,10 @@ class Transformer:
             ["++", "x"] -> ["set", "x", ["+", "x", 1]]
         """
         _, var = expr
-        set_expr = ["set", var, ["+", var, 1]]
+        set_expr = [SET, var, [PLUS, var, 1]]
         return set_expr
 
+    @_counted
     def dec_to_set(self, expr: list) -> list:
         """Transforms -- to set expression.
 
@@ -114,9 +146,10 @@ class Transformer:
             ["--", "y"] -> ["set", "y", ["-", "y", 1]]
         """
         _, var = expr
-        set_expr = ["set", var, ["-", var, 1]]
+        set_expr = [SET, var, [MINUS, var, 1]]
         return set_expr
 
+    @_counted
     def plus_assign_to_set(self, expr: list) -> list:
         """Transforms += to set expression.
 
@@ -130,9 +163,10 @@ class Transformer:
             ["+=", "count", 5] -> ["set", "count", ["+", "count", 5]]
         """
         _, var, value = expr
-        set_expr = ["set", var, ["+", var, value]]
+        set_expr = [SET, var, [PLUS, var, value]]
         return set_expr
 
+    @_counted
     def minus_assign_to_set(self, expr: list) -> list:
         """Transforms -= to set expression.
 
@@ -146,9 +180,10 @@ class Transformer:
             ["-=", "level", 10] -> ["set", "level", ["-", "level", 10]]
         """
         _, var, value = expr
-        set_expr = ["set", var, ["-", var, value]]
+        set_expr = [SET, var, [MINUS, var, value]]
         return set_expr
 
+    @_counted
     def multi_assign_to_set(self, expr: list) -> list:
         """Transforms *= to set expression.
 
@@ -162,5 +197,5 @@ class Transformer:
             ["*=", "level", 10] -> ["set", "level", ["*", "level", 10]]
         """
         _, var, value = expr
-        set_expr = ["set", var, ["*", var, value]]
+        set_expr = [SET, var, [TIMES, var, value]]
         return set_expr
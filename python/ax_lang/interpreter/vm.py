@@ -0,0 +1,297 @@
+import types
+from typing import TYPE_CHECKING, Any
+
+from ax_lang.interpreter.bytecode import (
+    ASSIGN_NAME,
+    BINARY_OP,
+    CALL,
+    DECLARE_FIELDS,
+    GET_PROP,
+    IMPORT,
+    JUMP,
+    JUMP_IF_FALSE,
+    LOAD_CONST,
+    LOAD_NAME,
+    LOAD_SUPER,
+    MAKE_CLASS,
+    MAKE_FUNCTION,
+    MAKE_MODULE,
+    NEW,
+    NOT_IMPLEMENTED,
+    POP_SCOPE,
+    POP_TOP,
+    PUSH_SCOPE,
+    RETURN_VALUE,
+    SET_PROP,
+    SPECIAL_FORM,
+    STORE_NAME,
+    SUPER,
+    TAIL_CALL,
+    BytecodeCompiler,
+    CodeObject,
+)
+from ax_lang.interpreter.classes import (
+    Class,
+    declare_fields,
+    enclosing_class,
+    new_instance,
+)
+from ax_lang.interpreter.environment import UNSET, Environment
+from ax_lang.interpreter.functions import Function
+from ax_lang.interpreter.natives import BINARY_OPERATORS, NATIVE_OPERATORS
+from ax_lang.interpreter.shapes import Instance
+
+if TYPE_CHECKING:
+    from ax_lang.interpreter.ax_lang import AxLang
+
+
+class VM:
+    """Stack-based virtual machine executing bytecode of the `vm` engine.
+
+    Every code object runs with its own value stack in an environment: a program in
+    the environment it is evaluated in, a function body in an activation environment,
+    a class or module body in the class or module environment. A tail call of a
+    user-defined function runs the function body in place of the calling code, so
+    tail-recursive functions run in constant Python stack.
+    """
+
+    def __init__(self, ax_lang: "AxLang"):
+        """Creates a VM for an ax-lang instance.
+
+        Args:
+            ax_lang: Interpreter providing the module loading
+        """
+        self.ax_lang = ax_lang
+        self.compiler = BytecodeCompiler(ax_lang)
+
+    def call(self, fn: Function, args: list):
+        """Calls a user-defined function with evaluated arguments."""
+        return self.run(self._function_code(fn), Environment(fn.bind(args), fn.env))
+
+    def _function_code(self, fn: Function) -> CodeObject:
+        code = fn.code
+        if type(code) is not CodeObject:
+            # a function created or last called by another engine
+            code = fn.code = self.compiler.compile_body(
+                fn.body, fn.name or "<lambda>", fn.params
+            )
+        return code
+
+    def run(self, code: CodeObject, env: Environment) -> Any:
+        """Executes a code object in an environment and returns its result."""
+        opcodes = code.opcodes
+        operands = code.operands
+        consts = code.consts
+        names = code.names
+        caches = code.caches
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        function_type = types.FunctionType
+        pc = 0
+        while True:
+            opcode = opcodes[pc]
+            arg = operands[pc]
+            pc += 1
+
+            if opcode == LOAD_NAME:
+                name = names[arg]
+                scope = env
+                while scope is not None:
+                    record = scope.record
+                    if name in record:
+                        push(record[name])
+                        break
+                    scope = scope.parent
+                else:
+                    raise ValueError(f"Variable `{name}` is not defined!")
+
+            elif opcode == LOAD_CONST:
+                push(consts[arg])
+
+            elif opcode == BINARY_OP:
+                name = names[arg]
+                scope = env
+                while scope is not None:
+                    record = scope.record
+                    if name in record:
+                        fn = record[name]
+                        break
+                    scope = scope.parent
+                else:
+                    raise ValueError(f"Variable `{name}` is not defined!")
+                right = pop()
+                if fn is NATIVE_OPERATORS[name]:
+                    stack[-1] = BINARY_OPERATORS[name](stack[-1], right)
+                # the operator is rebound
+                elif type(fn) is function_type:
+                    stack[-1] = fn(stack[-1], right)
+                elif type(fn) is Function:
+                    stack[-1] = self.call(fn, [stack[-1], right])
+                else:
+                    raise NotImplementedError(fn)
+
+            elif opcode == CALL:
+                if arg:
+                    args = stack[-arg:]
+                    del stack[-arg:]
+                else:
+                    args = []
+                fn = pop()
+                # 1. Native functions
+                if type(fn) is function_type:
+                    push(fn(*args))
+                # 2. User-defined functions
+                elif type(fn) is Function:
+                    push(self.call(fn, args))
+                else:
+                    raise NotImplementedError(fn)
+
+            elif opcode == TAIL_CALL:
+                if arg:
+                    args = stack[-arg:]
+                    del stack[-arg:]
+                else:
+                    args = []
+                fn = pop()
+                if type(fn) is function_type:
+                    push(fn(*args))
+                elif type(fn) is Function:
+                    # continue with the function body instead of returning its result
+                    code = self._function_code(fn)
+                    env = Environment(fn.bind(args), fn.env)
+                    opcodes = code.opcodes
+                    operands = code.operands
+                    consts = code.consts
+                    names = code.names
+                    caches = code.caches
+                    stack.clear()
+                    pc = 0
+                else:
+                    raise NotImplementedError(fn)
+
+            elif opcode == JUMP_IF_FALSE:
+                if not pop():
+                    pc = arg
+
+            elif opcode == JUMP:
+                pc = arg
+
+            elif opcode == POP_TOP:
+                pop()
+
+            elif opcode == RETURN_VALUE:
+                return pop()
+
+            elif opcode == ASSIGN_NAME:
+                name = names[arg]
+                scope = env
+                while scope is not None:
+                    record = scope.record
+                    if name in record:
+                        if type(scope) is Class:
+                            # invalidates the method tables
+                            scope.define(name, stack[-1])
+                        else:
+                            record[name] = stack[-1]
+                        break
+                    scope = scope.parent
+                else:
+                    raise ValueError(f"Variable `{name}` is not defined!")
+
+            elif opcode == STORE_NAME:
+                if type(env) is Class:
+                    value = env.define(names[arg], stack[-1])
+                else:
+                    value = env.record[names[arg]] = stack[-1]
+                if type(value) is Function and value.name is None:
+                    value.name = names[arg]
+
+            elif opcode == PUSH_SCOPE:
+                env = Environment({}, env)
+
+            elif opcode == POP_SCOPE:
+                env = env.parent
+
+            elif opcode == GET_PROP:
+                instance = stack[-1]
+                cache = caches[pc - 1]
+                if type(instance) is Instance and instance.shape is cache.shape:
+                    stack[-1] = instance.slots[cache.index]
+                elif type(instance) is cache.layout:
+                    value = getattr(instance, cache.slot)
+                    if value is UNSET:
+                        value = cache.load(instance)
+                    stack[-1] = value
+                else:
+                    stack[-1] = cache.load(instance)
+
+            elif opcode == SET_PROP:
+                value = pop()
+                instance = stack[-1]
+                cache = caches[pc - 1]
+                if type(instance) is Instance and instance.shape is cache.shape:
+                    instance.slots[cache.index] = value
+                    stack[-1] = value
+                elif type(instance) is cache.layout:
+                    setattr(instance, cache.slot, value)
+                    stack[-1] = value
+                else:
+                    stack[-1] = cache.store(instance, value)
+
+            elif opcode == MAKE_FUNCTION:
+                fn_code = consts[arg]
+                push(Function(fn_code.params, fn_code.body, env, fn_code))
+
+            elif opcode == NEW:
+                if arg:
+                    args = stack[-arg:]
+                    del stack[-arg:]
+                else:
+                    args = []
+                class_env = pop()
+                # An instance of class is an environment with a shape
+                instance_env = new_instance(class_env)
+                self.call(class_env.lookup("constructor"), [instance_env, *args])
+                push(instance_env)
+
+            elif opcode == SUPER:
+                push(pop().parent)
+
+            elif opcode == LOAD_SUPER:
+                name = names[arg]
+                # the class whose body is running isn't looked up by name
+                class_env = enclosing_class(env, name) or env.lookup(name)
+                push(class_env.parent)
+
+            elif opcode == MAKE_CLASS:
+                body_code = consts[arg]
+                parent_env = pop() or env
+                class_env = Class(body_code.name, parent_env)
+                # body is evaluated in the class environment
+                self.run(body_code, class_env)
+                # Class is accessible by name
+                push(env.define(body_code.name, class_env))
+
+            elif opcode == DECLARE_FIELDS:
+                declare_fields(env, consts[arg])
+
+            elif opcode == MAKE_MODULE:
+                body_code = consts[arg]
+                module_env = Environment({}, env)
+                self.run(body_code, module_env)
+                push(env.define(body_code.name, module_env))
+
+            elif opcode == IMPORT:
+                name = names[arg]
+                push(env.define(name, self.ax_lang.import_module(name)))
+
+            elif opcode == SPECIAL_FORM:
+                form_expr = consts[arg]
+                push(self.ax_lang.custom_forms[form_expr[0]](form_expr, env))
+
+            elif opcode == NOT_IMPLEMENTED:
+                raise NotImplementedError(consts[arg])
+
+            else:
+                raise NotImplementedError(f"Unknown opcode {opcode}")
@@ -0,0 +1,210 @@
+import hashlib
+import logging
+import marshal
+import os
+from importlib import metadata
+from numbers import Number
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+from ax_lang.exceptions import ParserError
+from ax_lang.parser.nodes import Symbol, to_typed
+from ax_lang.parser.parser import EVA_GRAMMAR_PATH
+from ax_lang.parser.reader import iter_file_forms, iter_forms, map_file
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR_NAME = "__axcache__"
+CACHE_SUFFIX = ".axc"
+# Bump when the shape of the AST produced by the parser or the entry layout changes
+AST_FORMAT_VERSION = 2
+
+# An entry is the magic, the key and the marshalled top-level forms ended by `_END`
+_MAGIC = b"AXC\x00"
+_KEY_SIZE = hashlib.sha256().digest_size
+_END = None
+
+
+def _package_version() -> str:
+    try:
+        return metadata.version("ax-lang")
+    except metadata.PackageNotFoundError:
+        return "0+unknown"
+
+
+def _cache_tag() -> bytes:
+    with open(EVA_GRAMMAR_PATH, "rb") as f:
+        grammar_digest = hashlib.sha256(f.read()).hexdigest()
+    tag = (
+        f"{AST_FORMAT_VERSION}:{marshal.version}:{_package_version()}:{grammar_digest}"
+    )
+    return tag.encode()
+
+
+CACHE_TAG = _cache_tag()
+
+
+class ASTCache:
+    """On-disk cache of parsed ax-lang sources (`__pycache__` for ax-lang).
+
+    The top-level forms of a source file are stored in a compact binary (`marshal`)
+    form in the `__axcache__` directory next to the file, or in `cache_dir` if it is
+    set. An entry is valid only for the exact source content and grammar/interpreter
+    version it was created with, so stale entries are never used.
+    """
+
+    def __init__(self, enabled: bool = True, cache_dir: str = None):
+        """Creates an AST cache.
+
+        Args:
+            enabled: If False, sources are always parsed and nothing is stored
+            cache_dir: Directory for all cache entries, defaults to the
+                `AX_LANG_CACHE_DIR` environment variable or `__axcache__` next to sources
+        """
+        self.enabled = enabled
+        self.cache_dir = cache_dir or os.environ.get("AX_LANG_CACHE_DIR")
+        self.hits = 0
+        self.misses = 0
+
+    def cache_path(self, source_path: str | Path) -> Path:
+        """Returns the path of the cache entry for a source file."""
+        source_path = Path(source_path).resolve()
+        if self.cache_dir:
+            path_digest = hashlib.sha256(str(source_path).encode()).hexdigest()[:16]
+            return (
+                Path(self.cache_dir) / f"{source_path.stem}.{path_digest}{CACHE_SUFFIX}"
+            )
+        return source_path.parent / CACHE_DIR_NAME / f"{source_path.stem}{CACHE_SUFFIX}"
+
+    def get_ast(
+        self, source_path: str | Path, typed: bool = False
+    ) -> Number | str | list:
+        """Returns the AST of a source file, parsing it only on a cache miss.
+
+        Args:
+            source_path: Path of the ax-lang source file
+            typed: If True, returns the typed AST (see `ax_lang.parser.nodes`)
+
+        Returns:
+            AST of the file content wrapped into a `begin` block
+        """
+        begin = Symbol("begin") if typed else "begin"
+        return [begin, *self.iter_forms(source_path, typed)]
+
+    def iter_forms(
+        self, source_path: str | Path, typed: bool = False
+    ) -> Iterator[Number | str | list]:
+        """Yields top-level forms of a source file, parsing it only on a cache miss.
+
+        Forms are streamed both from the source file and from the cache entry, so
+        memory doesn't depend on the size of the file. Entries always hold plain
+        forms (`marshal` only supports built-in types), typed forms are converted
+        from them.
+
+        Args:
+            source_path: Path of the ax-lang source file
+            typed: If True, yields typed ASTs (see `ax_lang.parser.nodes`)
+
+        Yields:
+            AST of every top-level form of the file
+        """
+        if not self.enabled:
+            yield from iter_file_forms(source_path, typed)
+            return
+        if not typed:
+            yield from self._iter_cached_forms(source_path)
+            return
+        for form in self._iter_cached_forms(source_path):
+            yield to_typed(form)
+
+    def _iter_cached_forms(self, source_path: str | Path) -> Iterator:
+        cache_path = self.cache_path(source_path)
+        with map_file(source_path) as source:
+            key = hashlib.sha256(CACHE_TAG)
+            key.update(source)
+            key = key.digest()
+
+            entry = self._open_entry(cache_path, key)
+            if entry is not None:
+                self.hits += 1
+                logger.debug(f"AST cache hit for `{source_path}`.")
+                with entry:
+                    yield from self._load_forms(entry, cache_path)
+                return
+
+            self.misses += 1
+            logger.debug(f"AST cache miss for `{source_path}`.")
+            yield from self._store_forms(cache_path, key, iter_forms(source))
+
+    def purge(self, source_path: str | Path = None) -> int:
+        """Removes cache entries.
+
+        Args:
+            source_path: Source file whose entry is removed. If None, all entries of
+                `cache_dir` are removed
+
+        Returns:
+            Number of removed entries
+        """
+        if source_path is not None:
+            paths = [self.cache_path(source_path)]
+        elif self.cache_dir:
+            paths = list(Path(self.cache_dir).glob(f"*{CACHE_SUFFIX}"))
+        else:
+            paths = []
+        removed = 0
+        for path in paths:
+            try:
+                path.unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def stats(self) -> dict[str, int]:
+        """Returns cache hit/miss counters."""
+        return {"hits": self.hits, "misses": self.misses}
+
+    def _open_entry(self, cache_path: Path, key: bytes) -> BinaryIO | None:
+        try:
+            entry = open(cache_path, "rb")
+        except OSError:
+            return None
+        if entry.read(len(_MAGIC) + _KEY_SIZE) != _MAGIC + key:
+            entry.close()
+            return None
+        return entry
+
+    def _load_forms(self, entry: BinaryIO, cache_path: Path) -> Iterator:
+        while True:
+            try:
+                form = marshal.load(entry)
+            except (EOFError, ValueError, TypeError) as e:
+                raise ParserError(f"Corrupted AST cache entry `{cache_path}`") from e
+            if form is _END:
+                return
+            yield form
+
+    def _store_forms(self, cache_path: Path, key: bytes, forms: Iterator) -> Iterator:
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            entry = open(tmp_path, "wb")
+        except OSError as e:
+            # like `__pycache__`, a read-only location just means no caching
+            logger.debug(f"Failed to store AST cache `{cache_path}`: {e}")
+            yield from forms
+            return
+
+        try:
+            with entry:
+                entry.write(_MAGIC + key)
+                for form in forms:
+                    marshal.dump(form, entry)
+                    yield form
+                marshal.dump(_END, entry)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            # a parse error or a consumer that stopped early: don't keep a partial entry
+            tmp_path.unlink(missing_ok=True)
+            raise
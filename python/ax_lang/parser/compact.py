@@ -0,0 +1,224 @@
+"""Compact array-backed encoding of the AST.
+
+A nested-list AST costs a list object per list node and a `str` object per symbol
+occurrence. `CompactAST` keeps the whole tree in a few flat `array` buffers instead:
+
+- `kinds` - kind tag of every node (`INT`, `FLOAT`, `STRING`, `SYMBOL`, `LIST`, `BIG_INT`)
+- `values` - operand of every node: the integer itself, an index into `floats`, an
+  index into `constants` (strings and integers that don't fit 64 bits), a symbol id or
+  an offset into `children`
+- `children` - for every list node its length followed by the indices of its children
+- `floats` - float values
+
+Symbols are interned into a table mapping every identifier to an int id, so a name is
+stored once however many times it occurs.
+"""
+import sys
+from array import array
+from numbers import Number
+from pathlib import Path
+from typing import Iterable
+
+from ax_lang.parser.nodes import String, Symbol
+from ax_lang.parser.reader import iter_file_forms
+
+# Kind tags of the nodes
+# fmt: off
+INT = 0       # value: the integer
+FLOAT = 1     # value: index into `floats`
+STRING = 2    # value: index into `constants`
+SYMBOL = 3    # value: symbol id
+LIST = 4      # value: offset of the length of the list in `children`
+BIG_INT = 5   # value: index into `constants`
+# fmt: on
+
+_INT64_MIN = -(2**63)
+_INT64_MAX = 2**63 - 1
+
+
+class CompactAST:
+    """AST of an expression or a program encoded into flat arrays.
+
+    Nodes are numbered in post-order (children before their list), so the root is the
+    last node. Use `from_ast`/`from_file` to encode and `to_ast` to decode.
+    """
+
+    def __init__(self):
+        self.kinds = array("B")
+        self.values = array("q")
+        self.children = array("I")
+        self.floats = array("d")
+        self.constants: list[str | int] = []
+        self.symbols: list[str] = []
+        self._symbol_ids: dict[str, int] = {}
+        self._constant_ids: dict[tuple[type, str | int], int] = {}
+
+    @classmethod
+    def from_ast(cls, ast: Number | str | list) -> "CompactAST":
+        """Encodes a plain or typed AST."""
+        compact = cls()
+        compact._add(ast)
+        return compact
+
+    @classmethod
+    def from_forms(cls, forms: Iterable[Number | str | list]) -> "CompactAST":
+        """Encodes top-level forms as a `begin` block.
+
+        Forms are encoded one at a time, so only the nested lists of the current form
+        are kept in memory while the AST is built.
+        """
+        compact = cls()
+        entries = [compact._add("begin")]
+        for form in forms:
+            entries.append(compact._add(form))
+        compact._add_list(entries)
+        return compact
+
+    @classmethod
+    def from_file(cls, path: str | Path) -> "CompactAST":
+        """Parses an ax-lang source file straight into the compact form."""
+        return cls.from_forms(iter_file_forms(path))
+
+    @property
+    def root(self) -> int:
+        """Index of the root node."""
+        return len(self.kinds) - 1
+
+    def __len__(self) -> int:
+        """Number of nodes."""
+        return len(self.kinds)
+
+    def symbol_id(self, name: str) -> int:
+        """Returns the id of a symbol, interning it into the symbol table."""
+        symbol_id = self._symbol_ids.get(name)
+        if symbol_id is None:
+            symbol_id = self._symbol_ids[name] = len(self.symbols)
+            self.symbols.append(sys.intern(str(name)))
+        return symbol_id
+
+    def kind(self, node: int) -> int:
+        """Returns the kind tag of a node."""
+        return self.kinds[node]
+
+    def list_children(self, node: int) -> array:
+        """Returns the indices of the children of a list node."""
+        start = self.values[node] + 1
+        end = start + self.children[start - 1]
+        return self.children[start:end]
+
+    def to_ast(self, node: int = None, typed: bool = True) -> Number | str | list:
+        """Decodes a node (the root by default) into a typed or plain AST.
+
+        Every occurrence of a symbol in the typed AST is the same interned `Symbol`.
+        """
+        if node is None:
+            node = self.root
+        if typed:
+            symbols = [Symbol(name) for name in self.symbols]
+            strings = {
+                i: String(value)
+                for i, value in enumerate(self.constants)
+                if isinstance(value, str)
+            }
+        else:
+            symbols = self.symbols
+            strings = {
+                i: f'"{value}"'
+                for i, value in enumerate(self.constants)
+                if isinstance(value, str)
+            }
+        return self._decode(node, symbols, strings)
+
+    def nbytes(self) -> int:
+        """Returns the memory used by the buffers and the tables, in bytes."""
+        size = sum(
+            sys.getsizeof(buffer)
+            for buffer in (self.kinds, self.values, self.children, self.floats)
+        )
+        size += sys.getsizeof(self.symbols) + sum(map(sys.getsizeof, self.symbols))
+        size += sys.getsizeof(self.constants) + sum(map(sys.getsizeof, self.constants))
+        return size
+
+    def _add(self, ast) -> int:
+        if isinstance(ast, list):
+            return self._add_list([self._add(node) for node in ast])
+        if isinstance(ast, String):
+            return self._add_node(STRING, self._constant(ast.value))
+        if isinstance(ast, str):
+            if isinstance(ast, Symbol) or len(ast) < 2 or ast[0] != '"':
+                return self._add_node(SYMBOL, self.symbol_id(ast))
+            return self._add_node(STRING, self._constant(ast[1:-1]))
+        if isinstance(ast, float):
+            self.floats.append(ast)
+            return self._add_node(FLOAT, len(self.floats) - 1)
+        if isinstance(ast, int):
+            if _INT64_MIN <= ast <= _INT64_MAX:
+                return self._add_node(INT, ast)
+            return self._add_node(BIG_INT, self._constant(ast))
+        raise TypeError(f"Unsupported AST node `{ast!r}`")
+
+    def _add_list(self, entries: list[int]) -> int:
+        offset = len(self.children)
+        self.children.append(len(entries))
+        self.children.extend(entries)
+        return self._add_node(LIST, offset)
+
+    def _add_node(self, kind: int, value: int) -> int:
+        self.kinds.append(kind)
+        self.values.append(value)
+        return len(self.kinds) - 1
+
+    def _constant(self, value: str | int) -> int:
+        key = (type(value), value)
+        index = self._constant_ids.get(key)
+        if index is None:
+            index = self._constant_ids[key] = len(self.constants)
+            self.constants.append(value)
+        return index
+
+    def _decode(self, node: int, symbols: list, strings: dict):
+        kind = self.kinds[node]
+        value = self.values[node]
+        if kind == SYMBOL:
+            return symbols[value]
+        if kind == INT:
+            return value
+        if kind == LIST:
+            return [
+                self._decode(child, symbols, strings)
+                for child in self.list_children(node)
+            ]
+        if kind == STRING:
+            return strings[value]
+        if kind == FLOAT:
+            return self.floats[value]
+        return self.constants[value]
+
+
+def list_ast_nbytes(ast: Number | str | list) -> int:
+    """Returns the memory used by the objects of a nested-list AST, in bytes.
+
+    Objects shared by several nodes (e.g. interned symbols and small integers) are
+    counted once.
+    """
+    seen = set()
+    size = 0
+    stack = [ast]
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        size += sys.getsizeof(node)
+        if isinstance(node, list):
+            stack.extend(node)
+        elif isinstance(node, String):
+            stack.append(node.value)
+    return size
+
+
+def count_nodes(ast: Number | str | list) -> int:
+    """Returns the number of nodes (atoms and lists) of a nested-list AST."""
+    if isinstance(ast, list):
+        return 1 + sum(map(count_nodes, ast))
+    return 1
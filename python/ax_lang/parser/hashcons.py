@@ -0,0 +1,108 @@
+"""Hash-consing: sharing of structurally identical AST subtrees.
+
+Generated programs repeat the same subexpressions (`(+ x 1)`, identical predicate
+trees) many times and every copy is a separate nested list after parsing.
+`HashConser.share` replaces every subtree by the first structurally identical subtree
+it has seen, so each distinct subtree exists once. Besides the memory, sharing lets
+per-node caches (e.g. compiled closures of the `closure` engine) be computed once per
+distinct subtree instead of once per occurrence.
+
+Shared nodes are referenced from several places of the tree, so a shared AST must not
+be mutated; the interpreter never mutates the AST it evaluates.
+"""
+import copy
+import sys
+from numbers import Number
+from typing import NamedTuple
+
+from ax_lang.parser.compact import list_ast_nbytes
+from ax_lang.parser.nodes import String
+
+
+class SharingStats(NamedTuple):
+    """Report of a hash-consing stage."""
+
+    # nodes (atoms and lists) of the ASTs passed to `share`
+    nodes: int
+    # distinct nodes left after sharing
+    unique_nodes: int
+    # memory of the ASTs before and after sharing, in bytes
+    bytes_before: int
+    bytes_after: int
+
+    @property
+    def sharing_ratio(self) -> float:
+        """Fraction of the nodes replaced by a shared node."""
+        return 1 - self.unique_nodes / self.nodes if self.nodes else 0.0
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.bytes_before - self.bytes_after
+
+    def __str__(self):
+        return (
+            f"Hash-consing: {self.unique_nodes} unique of {self.nodes} nodes "
+            f"(sharing ratio {self.sharing_ratio:.1%}), "
+            f"{self.bytes_before} -> {self.bytes_after} bytes "
+            f"({self.saved_bytes} saved)"
+        )
+
+
+class HashConser:
+    """Deduplicates structurally identical subtrees of ASTs.
+
+    The table of distinct nodes is kept between calls of `share`, so subtrees are
+    shared across all ASTs passed to the same conser (e.g. a program and the modules
+    it imports).
+    """
+
+    def __init__(self):
+        # key of a node -> the shared node: `(type, value)` for atoms, the type and the
+        # ids of the shared children for lists
+        self._table: dict[tuple, Number | str | list] = {}
+        self.nodes = 0
+        self.bytes_before = 0
+        self.bytes_after = 0
+
+    def share(self, ast: Number | str | list) -> Number | str | list:
+        """Returns the AST with every subtree replaced by its shared copy.
+
+        Args:
+            ast: Plain or typed AST
+
+        Returns:
+            Structurally equal AST built of shared nodes
+        """
+        self.bytes_before += list_ast_nbytes(ast)
+        return self._share(ast)
+
+    def stats(self) -> SharingStats:
+        """Returns the report of all ASTs shared so far."""
+        return SharingStats(
+            self.nodes, len(self._table), self.bytes_before, self.bytes_after
+        )
+
+    def _share(self, node):
+        self.nodes += 1
+        if isinstance(node, list):
+            children = [self._share(child) for child in node]
+            key = (type(node), *map(id, children))
+        else:
+            children = None
+            # -0.0 == 0.0, but they are different literals
+            key = (type(node), node.hex() if type(node) is float else node)
+        shared = self._table.get(key)
+        if shared is not None:
+            return shared
+
+        shared = node
+        if children is not None and any(
+            old is not new for old, new in zip(node, children)
+        ):
+            shared = copy.copy(node)  # keeps the type, e.g. `Lowered`
+            shared[:] = children
+        self.bytes_after += sys.getsizeof(shared)
+        if isinstance(shared, String):
+            self.bytes_after += sys.getsizeof(shared.value)
+        self._table[key] = shared
+        return shared
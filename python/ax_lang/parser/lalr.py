@@ -0,0 +1,175 @@
+"""LALR(1) parser for `ax-lang-grammar.bnf.g`.
+
+The parsing table is the one `syntax-cli -g ax-lang-grammar.bnf.g -m LALR1` builds for
+the grammar, so the parser accepts exactly the same language and produces the same
+values as the syntax-cli backend, but without leaving the Python process.
+
+Grammar productions (0 is the augmented start production):
+
+    0. $accept    -> Exp
+    1. Exp        -> Atom
+    2. Exp        -> List
+    3. Atom       -> NUMBER
+    4. Atom       -> STRING
+    5. Atom       -> SYMBOL
+    6. List       -> '(' ListEntries ')'
+    7. ListEntries -> ListEntries Exp
+    8. ListEntries -> /* empty */
+"""
+from numbers import Number
+from typing import Callable, Iterable
+
+from ax_lang.exceptions import ParserError
+from ax_lang.parser.lexer import EOF, Token, tokenize
+from ax_lang.parser.nodes import String, Symbol
+
+
+def _to_number(text: str) -> int | float:
+    # Number($1) in the grammar: JavaScript has a single number type, so `2.0`
+    # is serialized (and was always returned) as the integer `2`.
+    if "." not in text:
+        return int(text)
+    value = float(text)
+    return int(value) if value.is_integer() else value
+
+
+def _append(entries: list, exp) -> list:
+    entries.append(exp)
+    return entries
+
+
+# (lhs, number of rhs symbols, semantic action receiving the rhs values)
+PRODUCTIONS: list[tuple[str, int, Callable]] = [
+    ("$accept", 1, lambda exp: exp),
+    ("Exp", 1, lambda atom: atom),
+    ("Exp", 1, lambda lst: lst),
+    ("Atom", 1, _to_number),
+    ("Atom", 1, lambda string: string),
+    ("Atom", 1, lambda symbol: symbol),
+    ("List", 3, lambda _lp, entries, _rp: entries),
+    ("ListEntries", 2, _append),
+    ("ListEntries", 0, lambda: []),
+]
+
+# The same productions building the typed AST: atoms are classified when reduced
+TYPED_PRODUCTIONS: list[tuple[str, int, Callable]] = [
+    *PRODUCTIONS[:4],
+    ("Atom", 1, lambda string: String(string[1:-1])),
+    ("Atom", 1, Symbol),
+    *PRODUCTIONS[6:],
+]
+
+_ENTRY_LOOKAHEAD = ("NUMBER", "STRING", "SYMBOL", "(", ")")
+_EXP_LOOKAHEAD = (*_ENTRY_LOOKAHEAD, EOF)
+
+# syntax-cli notation: `sN` - shift and go to state N, `rN` - reduce by production N,
+# `acc` - accept, a bare number - goto for a nonterminal.
+TABLE: dict[int, dict[str, str | int]] = {
+    0: {
+        "Exp": 1,
+        "Atom": 2,
+        "List": 3,
+        "NUMBER": "s4",
+        "STRING": "s5",
+        "SYMBOL": "s6",
+        "(": "s7",
+    },
+    1: {EOF: "acc"},
+    2: {t: "r1" for t in _EXP_LOOKAHEAD},
+    3: {t: "r2" for t in _EXP_LOOKAHEAD},
+    4: {t: "r3" for t in _EXP_LOOKAHEAD},
+    5: {t: "r4" for t in _EXP_LOOKAHEAD},
+    6: {t: "r5" for t in _EXP_LOOKAHEAD},
+    7: {"ListEntries": 8, **{t: "r8" for t in _ENTRY_LOOKAHEAD}},
+    8: {
+        "Exp": 10,
+        "Atom": 2,
+        "List": 3,
+        "NUMBER": "s4",
+        "STRING": "s5",
+        "SYMBOL": "s6",
+        "(": "s7",
+        ")": "s9",
+    },
+    9: {t: "r6" for t in _EXP_LOOKAHEAD},
+    10: {t: "r7" for t in _ENTRY_LOOKAHEAD},
+}
+
+_ACCEPT = 0
+
+
+def _compile_table(table: dict) -> tuple[list[dict[str, int]], list[dict[str, int]]]:
+    """Splits the table into action and goto parts with integer-encoded actions.
+
+    A shift to state N is encoded as N, a reduce by production N as -N and accept as 0.
+    """
+    actions, gotos = [], []
+    for state in range(len(table)):
+        action, goto = {}, {}
+        for symbol, entry in table[state].items():
+            if isinstance(entry, int):
+                goto[symbol] = entry
+            elif entry == "acc":
+                action[symbol] = _ACCEPT
+            elif entry[0] == "s":
+                action[symbol] = int(entry[1:])
+            else:
+                action[symbol] = -int(entry[1:])
+        actions.append(action)
+        gotos.append(goto)
+    return actions, gotos
+
+
+_ACTIONS, _GOTOS = _compile_table(TABLE)
+
+
+def _unexpected(token: Token) -> ParserError:
+    if token.type == EOF:
+        return ParserError("Unexpected end of input")
+    return ParserError(f"Unexpected token `{token.value}` at offset {token.offset}")
+
+
+def parse_tokens(tokens: Iterable[Token], typed: bool = False) -> Number | str | list:
+    """Runs the LALR(1) automaton over the tokens of a single expression.
+
+    Args:
+        tokens: Tokens produced by `tokenize`, terminated by an `EOF` token
+        typed: If True, atoms are `String`/`Symbol` nodes instead of plain strings
+
+    Returns:
+        AST of the expression (number, string or list)
+
+    Raises:
+        ParserError: If the tokens are not a valid ax-lang expression
+    """
+    actions, gotos = _ACTIONS, _GOTOS
+    productions = TYPED_PRODUCTIONS if typed else PRODUCTIONS
+    states = [0]
+    values = []
+    tokens = iter(tokens)
+    token = next(tokens)
+    while True:
+        action = actions[states[-1]].get(token.type)
+        if action is None:
+            raise _unexpected(token)
+        if action > 0:
+            states.append(action)
+            values.append(token.value)
+            token = next(tokens)
+        elif action < 0:
+            lhs, size, semantic_action = productions[-action]
+            if size:
+                args = values[-size:]
+                del values[-size:]
+                del states[-size:]
+            else:
+                args = ()
+            values.append(semantic_action(*args))
+            states.append(gotos[states[-1]][lhs])
+        else:
+            return values[-1]
+
+
+def parse(source: str, typed: bool = False) -> Number | str | list:
+    """Parses a single ax-lang expression into its (plain or typed) AST."""
+    return parse_tokens(tokenize(source), typed)
@@ -0,0 +1,97 @@
+import re
+from typing import Iterator, NamedTuple
+
+from ax_lang.exceptions import ParserError
+
+# Token rules of the `%lex` section of `ax-lang-grammar.bnf.g`, in the same order.
+# Like syntax-cli, the first rule that matches at the current position wins.
+# `re.ASCII` keeps `\w`, `\d` and `\s` equal to their JavaScript meaning.
+TOKEN_RULES = [
+    ("STRING", r"\"[^\"]*\""),
+    ("NUMBER", r"[-+]?\d+(\.\d+)?"),
+    ("SYMBOL", r"[\w\-+*=<>/]+"),
+    ("(", r"\("),
+    (")", r"\)"),
+]
+
+EOF = "$"
+
+_SKIP = r"\s+"
+
+
+def _rules_pattern(rules: list[tuple[str, str]]) -> str:
+    groups = [f"(?P<SKIP>{_SKIP})"]
+    for i, (_, pattern) in enumerate(rules):
+        groups.append(f"(?P<T{i}>{pattern})")
+    return "|".join(groups)
+
+
+_TOKEN_REGEX = re.compile(_rules_pattern(TOKEN_RULES), re.ASCII)
+# the same rules over raw bytes, for tokenizing memory-mapped files
+_BYTES_TOKEN_REGEX = re.compile(_rules_pattern(TOKEN_RULES).encode(), re.ASCII)
+_GROUP_TO_TYPE = {f"T{i}": name for i, (name, _) in enumerate(TOKEN_RULES)}
+
+
+class Token(NamedTuple):
+    type: str
+    value: str
+    offset: int
+
+
+def tokenize(source: str) -> Iterator[Token]:
+    """Splits ax-lang source code into tokens.
+
+    Args:
+        source: ax-lang source code
+
+    Yields:
+        Tokens of the source followed by a single `EOF` token
+
+    Raises:
+        ParserError: If the source contains a character no token rule accepts
+    """
+    match = _TOKEN_REGEX.match
+    group_to_type = _GROUP_TO_TYPE
+    pos = 0
+    end = len(source)
+    while pos < end:
+        m = match(source, pos)
+        if m is None:
+            raise ParserError(f"Unexpected token `{source[pos]}` at offset {pos}")
+        group = m.lastgroup
+        if group != "SKIP":
+            yield Token(group_to_type[group], m.group(), pos)
+        pos = m.end()
+    yield Token(EOF, EOF, end)
+
+
+def tokenize_buffer(buffer: bytes | memoryview) -> Iterator[Token]:
+    """Splits UTF-8 encoded ax-lang source code into tokens without decoding it whole.
+
+    Works on any bytes-like object, e.g. an `mmap` of a source file, so only the
+    current token is materialized as a string.
+
+    Args:
+        buffer: UTF-8 encoded ax-lang source code
+
+    Yields:
+        Tokens of the source followed by a single `EOF` token, offsets are in bytes
+
+    Raises:
+        ParserError: If the source contains a character no token rule accepts
+    """
+    match = _BYTES_TOKEN_REGEX.match
+    group_to_type = _GROUP_TO_TYPE
+    pos = 0
+    end = len(buffer)
+    while pos < end:
+        m = match(buffer, pos)
+        if m is None:
+            next_pos = pos + 1
+            char = buffer[pos:next_pos].decode(errors="replace")
+            raise ParserError(f"Unexpected token `{char}` at offset {pos}")
+        group = m.lastgroup
+        if group != "SKIP":
+            yield Token(group_to_type[group], m.group().decode(), pos)
+        pos = m.end()
+    yield Token(EOF, EOF, end)
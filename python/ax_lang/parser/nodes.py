@@ -0,0 +1,90 @@
+"""Typed atoms of the AST.
+
+In the plain AST (the compatibility format of `get_ast`) every atom that is not a number
+is a `str`: a string literal keeps its quotes (`'"hello"'`) and has to be told apart from
+a symbol by inspecting its characters. The typed AST classifies atoms when it is parsed:
+
+- `String` - a string literal holding its value without the quotes
+- `Symbol` - an identifier, a `str` subclass interned so that every occurrence of a name
+  is the same object
+- `int` and `float` - numbers, as in the plain AST
+"""
+from numbers import Number
+
+
+class Symbol(str):
+    """Interned identifier: `Symbol("x") is Symbol("x")`.
+
+    Symbols are equal to (and hash and print as) the strings of their names, so they
+    can be compared with strings and used as environment record keys.
+    """
+
+    __slots__ = ()
+
+    _table: dict[str, "Symbol"] = {}
+
+    def __new__(cls, name: str):
+        symbol = cls._table.get(name)
+        if symbol is None:
+            symbol = cls._table[name] = super().__new__(cls, name)
+        return symbol
+
+    def __reduce__(self):
+        return Symbol, (str(self),)
+
+
+class String:
+    """String literal of the typed AST, immutable."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: str):
+        object.__setattr__(self, "value", value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("String literals are immutable")
+
+    def __eq__(self, other):
+        return type(other) is String and other.value == self.value
+
+    def __hash__(self):
+        return hash((String, self.value))
+
+    def __repr__(self):
+        return f"String({self.value!r})"
+
+    def __reduce__(self):
+        return String, (self.value,)
+
+
+def to_typed(ast: Number | str | list) -> Number | String | Symbol | list:
+    """Converts a plain AST into the typed one."""
+    if isinstance(ast, list):
+        return [to_typed(node) for node in ast]
+    if isinstance(ast, str) and not isinstance(ast, Symbol):
+        if len(ast) > 1 and ast[0] == '"' and ast[-1] == '"':
+            return String(ast[1:-1])
+        return Symbol(ast)
+    return ast
+
+
+def to_plain(ast: Number | String | Symbol | list) -> Number | str | list:
+    """Converts a typed AST into the plain one."""
+    if isinstance(ast, list):
+        return [to_plain(node) for node in ast]
+    if isinstance(ast, String):
+        return f'"{ast.value}"'
+    if isinstance(ast, Symbol):
+        return str(ast)
+    return ast
+
+
+def to_source(ast: Number | str | list) -> str:
+    """Formats a plain or typed AST as an s-expression, e.g. `(+ x 1)`."""
+    if isinstance(ast, list):
+        return f"({' '.join(map(to_source, ast))})"
+    if isinstance(ast, String):
+        return f'"{ast.value}"'
+    if isinstance(ast, bool):
+        return "true" if ast else "false"
+    return str(ast)
@@ -1,5 +1,6 @@
 import json
 import logging
+import os
 import re
 import subprocess
 from numbers import Number
@@ -7,12 +8,19 @@ from pathlib import Path
 from typing import Optional
 
 from ax_lang.exceptions import ParserError
+from ax_lang.parser.lalr import parse
+from ax_lang.parser.nodes import to_typed
 
 logger = logging.getLogger(__name__)
 
 
 EVA_GRAMMAR_PATH = str(Path(__file__).parent / "ax-lang-grammar.bnf.g")
 
+NATIVE_BACKEND = "native"
+SYNTAX_CLI_BACKEND = "syntax-cli"
+# The syntax-cli subprocess is an opt-in fallback: AX_LANG_PARSER=syntax-cli
+DEFAULT_BACKEND = os.environ.get("AX_LANG_PARSER", NATIVE_BACKEND)
+
 
 def _get_parsed_value(syntax_cli_output: str) -> str:
     # Find the array that starts after "Parsed value:"
@@ -40,21 +48,21 @@ def _try_parse_number(value: str) -> Optional[int | float]:
         return None
 
 
-def get_ast(expr: str) -> Number | str | list:
+def _get_ast_syntax_cli(expr: str) -> Number | str | list:
     # syntax-cli -g ax_lang/parser/ax-lang-grammar.bnf.g -m LALR1 -p 5
-    logger.debug("Parsing expression...")
-    logger.debug(f"Expression: `{expr}`.")
-
     # a hack to support negative numbers as syntax-cli treats them as a flag
     number = _try_parse_number(expr)
     if number is not None:
         return number
 
-    result = subprocess.run(
-        ["syntax-cli", "-g", EVA_GRAMMAR_PATH, "-m", "LALR1", "-p", expr],
-        capture_output=True,
-        text=True,  # decode bytes -> str automatically
-    )
+    try:
+        result = subprocess.run(
+            ["syntax-cli", "-g", EVA_GRAMMAR_PATH, "-m", "LALR1", "-p", expr],
+            capture_output=True,
+            text=True,  # decode bytes -> str automatically
+        )
+    except FileNotFoundError as e:
+        raise ParserError("syntax-cli is not installed") from e
     if result.returncode != 0:
         raise ParserError(f"Failed to parse `{expr}`")
 
@@ -73,3 +81,43 @@ def get_ast(expr: str) -> Number | str | list:
         raise ParserError(f"Parser failed: {e}") from e
 
     return data
+
+
+def _get_ast_native(expr: str, typed: bool = False) -> Number | str | list:
+    data = parse(expr, typed)
+    if typed:
+        return data
+    # syntax-cli prints a top-level string atom as JSON, which drops its quotes
+    if isinstance(data, str) and data[0] == '"':
+        return data[1:-1]
+    return data
+
+
+def get_ast(expr: str, backend: str = None, typed: bool = False) -> Number | str | list:
+    """Parses an ax-lang expression into its AST.
+
+    By default the AST is plain (compatibility mode): string literals and symbols
+    are both `str`, string literals keeping their quotes. The typed AST classifies
+    atoms into `String` and interned `Symbol` nodes (see `ax_lang.parser.nodes`), so
+    the interpreter doesn't have to inspect their characters when evaluating them.
+
+    Args:
+        expr: ax-lang source code of a single expression
+        backend: `native` (in-process LALR(1) parser) or `syntax-cli` (subprocess),
+            defaults to the `AX_LANG_PARSER` environment variable or `native`
+        typed: If True, returns the typed AST
+
+    Returns:
+        Number, string or list representing the AST
+
+    Raises:
+        ParserError: If the expression can't be parsed
+    """
+    logger.debug("Parsing expression...")
+    backend = backend or DEFAULT_BACKEND
+    if backend == NATIVE_BACKEND:
+        return _get_ast_native(expr, typed)
+    if backend == SYNTAX_CLI_BACKEND:
+        ast = _get_ast_syntax_cli(expr)
+        return to_typed(ast) if typed else ast
+    raise ParserError(f"Unsupported parser backend `{backend}`!")
@@ -0,0 +1,67 @@
+import mmap
+from contextlib import contextmanager
+from numbers import Number
+from pathlib import Path
+from typing import Iterator
+
+from ax_lang.parser.lalr import parse_tokens
+from ax_lang.parser.lexer import EOF, Token, tokenize_buffer
+
+
+@contextmanager
+def map_file(path: str | Path) -> Iterator[bytes | mmap.mmap]:
+    """Memory-maps a file for reading (an empty file can't be mapped and is `b""`)."""
+    with open(path, "rb") as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            yield b""
+            return
+        with mapped:
+            yield mapped
+
+
+def iter_forms(
+    buffer: bytes | mmap.mmap, typed: bool = False
+) -> Iterator[Number | str | list]:
+    """Parses top-level forms of UTF-8 encoded source code one at a time.
+
+    Only the tokens of the current form are kept in memory, so the memory used
+    depends on the size of the largest form, not the size of the source.
+
+    Args:
+        buffer: UTF-8 encoded ax-lang source code
+        typed: If True, forms are typed ASTs (see `ax_lang.parser.nodes`)
+
+    Yields:
+        AST of every top-level form, the same as the entries of `(begin <source>)`
+
+    Raises:
+        ParserError: If a form can't be parsed
+    """
+    form = []
+    depth = 0
+    for token in tokenize_buffer(buffer):
+        if token.type == EOF:
+            if form:
+                # an unclosed form: let the parser report it
+                parse_tokens([*form, token], typed)
+            return
+        form.append(token)
+        if token.type == "(":
+            depth += 1
+        elif token.type == ")":
+            depth -= 1
+        if depth <= 0:
+            end = token.offset + len(token.value.encode())
+            yield parse_tokens([*form, Token(EOF, EOF, end)], typed)
+            form = []
+            depth = 0
+
+
+def iter_file_forms(
+    path: str | Path, typed: bool = False
+) -> Iterator[Number | str | list]:
+    """Parses top-level forms of a memory-mapped ax-lang source file one at a time."""
+    with map_file(path) as buffer:
+        yield from iter_forms(buffer, typed)
@@ -3,6 +3,7 @@ from pathlib import Path
 from unittest.mock import patch
 
 from ax_lang.cli.exec import cli, eval_expression, repl
+from ax_lang.exceptions import InterpreterError
 from click.testing import CliRunner
 from tests.cli.common import assert_calls_no_errors
 
@@ -71,8 +72,22 @@ class TestExprCommand:
         )
         assert cli_output(["expr", "(+ (* 2 3) (- 10 5))"]) == "11"
 
+    def test_cli_expr_engine(self):
+        assert cli_output(["expr", "(+ 2 3)", "--engine", "closure"]) == "5"
+        assert "Invalid value" in cli_error_output(["expr", "1", "--engine", "jit"])
+
+    def test_cli_expr_module_path(self, tmp_path, monkeypatch):
+        (tmp_path / "geometry.ax").write_text("(def area (r) (* r r))")
+        code = "(import geometry) ((prop geometry area) 4)"
+        assert cli_output(["expr", code, "--module-path", str(tmp_path)]) == "16"
+        monkeypatch.setenv("AXPATH", str(tmp_path))
+        assert cli_output(["expr", code]) == "16"
+
     def test_cli_expr_debug(self):
         assert cli_output(["expr", "(+ 1 1)", "--debug"]) == "2"
+        assert "--debug requires the `tree` engine" in cli_error_output(
+            ["expr", "(+ 1 1)", "--debug", "--engine", "vm"]
+        )
 
 
 class TestFileCommand:
@@ -100,12 +115,116 @@ class TestFileCommand:
             == "30"
         )
 
+    def test_cli_file_engine(self, tmp_path):
+        path = tmp_path / "prog.ax"
+        path.write_text("(def sq (x) (* x x)) (sq 5)")
+        assert cli_output(["file", str(path), "--engine", "closure"]) == "25"
+        assert cli_output(["file", str(path), "--engine", "tree"]) == "25"
+
+    def test_cli_file_hash_cons(self, tmp_path):
+        path = tmp_path / "prog.ax"
+        path.write_text("(var x 1) (+ (+ x 1) (+ x 1))")
+        result = runner.invoke(cli, ["file", str(path), "--hash-cons"])
+        assert result.exit_code == 0
+        assert result.stdout.strip() == "4"
+        assert "sharing ratio" in result.stderr
+
+    def test_cli_file_print_optimized(self, tmp_path):
+        path = tmp_path / "prog.ax"
+        path.write_text("(var day (* (* 60 60) 24)) (if (> day 0) day 0)")
+        result = runner.invoke(cli, ["file", str(path), "--print-optimized"])
+        assert result.exit_code == 0
+        assert result.stdout.strip() == "86400"
+        assert "Before: (var day (* (* 60 60) 24))" in result.stderr
+        assert "After:  (var day 86400)" in result.stderr
+        assert cli_output(["file", str(path), "--optimize"]) == "86400"
+
+    def test_cli_file_inline_threshold(self, tmp_path):
+        path = tmp_path / "prog.ax"
+        path.write_text("(begin (def square (x) (* x x)) (+ (square 2) (square 3)))")
+        args = ["file", str(path), "--engine", "closure", "--inline-threshold", "10"]
+        result = runner.invoke(cli, args)
+        assert result.exit_code == 0
+        assert result.stdout.strip() == "13"
+        assert "Inlined 2 call sites: square 2" in result.stderr
+
+        result = runner.invoke(cli, ["file", str(path), "--inline-threshold", "10"])
+        assert result.exit_code != 0
+        assert "requires the `closure` engine" in result.output
+
+    def test_cli_file_memory_budget(self, tmp_path):
+        path = tmp_path / "prog.ax"
+        path.write_text("(def sum (n) (if (== n 0) 0 (+ n (sum (- n 1))))) (sum 3000)")
+        assert cli_output(["file", str(path), "--engine", "cek"]) == "4501500"
+
+        result = runner.invoke(
+            cli, ["file", str(path), "--engine", "cek", "--memory-budget", "10000"]
+        )
+        assert isinstance(result.exception, InterpreterError)
+        assert "Stack overflow" in str(result.exception)
+
+    def test_cli_file_cache_flags(self, tmp_path):
+        path = tmp_path / "prog.ax"
+        path.write_text("(+ 10 20)")
+        cache_path = tmp_path / "__axcache__" / "prog.axc"
+
+        assert cli_output(["file", str(path), "--no-cache"]) == "30"
+        assert not cache_path.exists()
+        assert cli_output(["file", str(path)]) == "30"
+        assert cache_path.exists()
+        assert cli_output(["file", str(path), "--purge-cache", "--no-cache"]) == "30"
+        assert not cache_path.exists()
+
+    def test_cli_file_streams_forms(self, tmp_path):
+        path = tmp_path / "prog.ax"
+        path.write_text('(print "first")\n(+ 1')
+
+        result = runner.invoke(cli, ["file", str(path)])
+        assert result.output == "first\n"
+        assert "Unexpected end of input" in str(result.exception)
+
+    def test_cli_file_module_path(self, tmp_path):
+        (tmp_path / "geometry.ax").write_text("(def area (r) (* r r))")
+        path = tmp_path / "prog.ax"
+        path.write_text("(import geometry) (import geometry) ((prop geometry area) 3)")
+        args = ["file", str(path), "--module-path", str(tmp_path), "--import-stats"]
+        result = runner.invoke(cli, args)
+        assert result.exit_code == 0
+        assert result.stdout.strip() == "9"
+        assert "Imported geometry: 2 imports, load " in result.stderr
+
+        result = runner.invoke(cli, ["file", str(path)])
+        assert "Module `geometry` is not found" in str(result.exception)
+
+    def test_cli_file_eager_imports(self, tmp_path):
+        (tmp_path / "noisy.ax").write_text('(print "loading") (var x 1)')
+        path = tmp_path / "prog.ax"
+        path.write_text("(import noisy) 2")
+        args = ["file", str(path), "--module-path", str(tmp_path), "--import-stats"]
+
+        result = runner.invoke(cli, args)
+        assert result.stdout == "2\n"
+        assert "noisy: 1 imports, not loaded" in result.stderr
+        result = runner.invoke(cli, [*args, "--eager-imports"])
+        assert result.stdout == "loading\n2\n"
+
     def test_cli_file_nonexistent_file(self):
         rez = cli_error_output(["file", "/nonexistent/file.ax"])
         assert "Error" in rez
         assert "does not exist" in rez
 
 
+class TestDisasmCommand:
+    def test_cli_disasm(self, tmp_path):
+        path = tmp_path / "prog.ax"
+        path.write_text("(var x 1) (+ x 2)")
+
+        output = cli_output(["disasm", str(path)])
+        assert output.startswith("Disassembly of <code <module>>:")
+        assert "STORE_NAME       0 (x)" in output
+        assert "BINARY_OP        1 (+)" in output
+
+
 class TestRepl:
     """Tests for the REPL functionality."""
 
@@ -163,6 +282,27 @@ class TestRepl:
         assert 10 in calls  # First x evaluation
         assert 15 in calls  # x + 5 evaluation
 
+    @patch("ax_lang.cli.exec.input")
+    @patch("ax_lang.cli.exec.click.echo")
+    def test_repl_functions(self, mock_echo, mock_input):
+        """Test REPL doesn't print functions and reports arity errors."""
+        mock_input.side_effect = [
+            "(lambda (x) x)",
+            "((lambda (x) (* x 2)) 4)",
+            "((lambda (x) x) 1 2)",
+            "exit",
+        ]
+
+        repl()
+
+        calls = [call[0][0] for call in mock_echo.call_args_list if call[0]]
+        assert 8 in calls
+        assert not any("<function" in str(call) for call in calls)
+        assert (
+            "InterpreterError: Function `<lambda>` takes 1 argument (x), 2 given!"
+            in calls
+        )
+
     @patch("ax_lang.cli.exec.input")
     @patch("ax_lang.cli.exec.click.echo")
     def test_repl_empty_input(self, mock_echo, mock_input):
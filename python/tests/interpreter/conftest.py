@@ -1,11 +1,11 @@
 import pytest
-from ax_lang.interpreter.ax_lang import AxLang
+from ax_lang.interpreter.ax_lang import ENGINES, AxLang
 from ax_lang.interpreter.transformer import Transformer
 
 
-@pytest.fixture
-def ax_lang():
-    return AxLang()
+@pytest.fixture(params=ENGINES)
+def ax_lang(request):
+    return AxLang(engine=request.param)
 
 
 @pytest.fixture()
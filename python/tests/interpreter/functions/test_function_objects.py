@@ -0,0 +1,61 @@
+import itertools
+import re
+
+import pytest
+from ax_lang.exceptions import InterpreterError
+from ax_lang.interpreter.ax_lang import ENGINES, AxLang
+from ax_lang.interpreter.environment import Environment, GlobalEnvironment
+from ax_lang.interpreter.functions import Function
+from ax_lang.parser.parser import get_ast
+
+
+def test_function_object(ax_lang):
+    fn = ax_lang.eval(get_ast("(begin (def square (x) (* x x)) square)", typed=True))
+
+    assert type(fn) is Function
+    assert (fn.name, fn.params, fn.arity) == ("square", ("x",), 1)
+    assert isinstance(fn.env, Environment)
+    assert not hasattr(fn, "__dict__")
+    assert repr(fn) == "<function square>"
+
+
+def test_anonymous_function(ax_lang):
+    code = "(begin (def make () (lambda (x) x)) (var f (make)) (var g f) (make))"
+
+    assert ax_lang.eval(get_ast(code, typed=True)).name is None
+    code = "(begin (def make () (lambda (x) x)) (var f (make)) (var g f) g)"
+    assert ax_lang.eval(get_ast(code, typed=True)).name == "f"
+
+
+@pytest.mark.parametrize(
+    "code, message",
+    [
+        ("(begin (def f (x) x) (f))", "`f` takes 1 argument (x), 0 given"),
+        ("(begin (def f (a b) a) (f 1 2 3))", "`f` takes 2 arguments (a b), 3 given"),
+        ("((lambda () 1) 2)", "`<lambda>` takes 0 arguments (), 1 given"),
+        # in tail position
+        ("(begin (def f (x) (f)) (f 1))", "`f` takes 1 argument (x), 0 given"),
+        (
+            "(begin (class P null (def constructor (this x) x)) (new P))",
+            "`constructor` takes 2 arguments (this x), 1 given",
+        ),
+    ],
+)
+def test_arity_error(ax_lang, code, message):
+    with pytest.raises(InterpreterError, match=re.escape(message)):
+        ax_lang.eval(get_ast(code, typed=True))
+
+
+@pytest.mark.parametrize("creating, calling", list(itertools.permutations(ENGINES, 2)))
+def test_function_of_another_engine(creating, calling):
+    env = Environment({}, GlobalEnvironment)
+    code = "(var add ((lambda (k) (lambda (x) (+ x k))) 10))"
+    AxLang(engine=creating).eval(get_ast(code, typed=True), env)
+    ax_lang = AxLang(engine=calling)
+    call = get_ast("(add 1)", typed=True)
+
+    assert ax_lang.eval(call, env) == 11
+    # with the code compiled by the calling engine
+    assert ax_lang.eval(call, env) == 11
+    with pytest.raises(InterpreterError):
+        ax_lang.eval(get_ast("(add 1 2)", typed=True), env)
@@ -0,0 +1,72 @@
+import sys
+
+import pytest
+from ax_lang.interpreter.ax_lang import AxLang
+from tests.interpreter.test_utils import exec_test
+
+COUNT_DOWN = """
+    (begin
+        (def count_down (n acc)
+            (if (== n 0)
+                acc
+                (count_down (- n 1) (+ acc 1))))
+
+        (count_down {n} 0)
+    )
+    """
+
+
+def test_tail_recursion_beyond_recursion_limit(ax_lang):
+    n = sys.getrecursionlimit() * 5
+    exec_test(ax_lang, COUNT_DOWN.format(n=n), n)
+
+
+@pytest.mark.parametrize("engine", ["closure", "vm"])
+def test_tail_recursion_million_times(engine):
+    exec_test(AxLang(engine=engine), COUNT_DOWN.format(n=1_000_000), 1_000_000)
+
+
+def test_tail_calls_through_begin_and_switch(ax_lang):
+    exec_test(
+        ax_lang,
+        """
+    (begin
+        (def is_even (n)
+            (switch ((== n 0) true)
+                    (else (begin
+                        (var m (- n 1))
+                        (is_odd m)))))
+
+        (def is_odd (n)
+            (if (== n 0)
+                false
+                (is_even (- n 1))))
+
+        (is_even 5001)
+    )
+    """,
+        False,
+    )
+
+
+def test_tail_call_in_class_method(ax_lang):
+    exec_test(
+        ax_lang,
+        """
+    (begin
+        (class Counter null
+            (begin
+                (def constructor (this) (set (prop this total) 0))
+                (def add (this n)
+                    (if (== n 0)
+                        (prop this total)
+                        (begin
+                            (set (prop this total) (+ (prop this total) 1))
+                            ((prop this add) this (- n 1)))))))
+
+        (var counter (new Counter))
+        ((prop counter add) counter 3000)
+    )
+    """,
+        3000,
+    )
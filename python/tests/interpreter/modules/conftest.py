@@ -1,7 +1,7 @@
 import pytest
-from ax_lang.interpreter.ax_lang import AxLang
+from ax_lang.interpreter.ax_lang import ENGINES, AxLang
 
 
-@pytest.fixture
-def ax_lang():
-    return AxLang()
+@pytest.fixture(params=ENGINES)
+def ax_lang(request):
+    return AxLang(engine=request.param)
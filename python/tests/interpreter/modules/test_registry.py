@@ -0,0 +1,152 @@
+import os
+
+import pytest
+from ax_lang.exceptions import InterpreterError
+from ax_lang.interpreter.ax_lang import AxLang
+from ax_lang.interpreter.registry import (
+    AXPATH,
+    BUILTIN_MODULES_DIR,
+    ImportStats,
+    LazyModule,
+    ModuleRegistry,
+)
+from ax_lang.parser.parser import get_ast
+
+
+@pytest.fixture
+def lib(tmp_path):
+    (tmp_path / "counter.ax").write_text(
+        """
+        (var loads 0)
+        (set loads (+ loads 1))
+        (def inc (x) (+ x 1))
+        """
+    )
+    (tmp_path / "uses_counter.ax").write_text("(import counter) (var n 10)")
+    (tmp_path / "cycle.ax").write_text("(import cycle)")
+    (tmp_path / "uses_itself.ax").write_text(
+        "(import uses_itself) (prop uses_itself x)"
+    )
+    return tmp_path
+
+
+def test_load_once(lib, ax_lang):
+    ax_lang.modules.search_path.insert(0, lib)
+    code = """
+    (begin
+        (import counter)
+        (import uses_counter)
+        (import counter)
+        (+ (prop counter loads) ((prop counter inc) (prop uses_counter n))))
+    """
+    assert ax_lang.eval(get_ast(code)) == 12
+
+    module = ax_lang.modules.modules[(lib / "counter.ax").resolve()]
+    assert module.imports == 3
+    assert ax_lang.import_module("counter") is module.env
+
+
+def test_module_function_called_from_function(ax_lang):
+    code = """
+    (begin
+        (def abs_of (x) ((prop math abs) x))
+        (import math)
+        (abs_of (- 5)))
+    """
+    assert ax_lang.eval(get_ast(code)) == 5
+
+
+def test_module_in_its_own_environment(lib, ax_lang):
+    # the body doesn't see the variables of the importing scope
+    (lib / "leaky.ax").write_text("(var seen local)")
+    ax_lang.modules.search_path.insert(0, lib)
+
+    with pytest.raises(ValueError, match="Variable `local` is not defined!"):
+        ax_lang.eval(get_ast("(begin (var local 1) (import leaky) (prop leaky seen))"))
+    # a failed import isn't loaded
+    assert not ax_lang.modules.stats()[0].loaded
+
+
+def test_search_path(lib, monkeypatch):
+    monkeypatch.setenv(AXPATH, f"{lib / 'missing'}{os.pathsep}{lib}")
+    registry = ModuleRegistry(["/nonexistent"])
+
+    assert registry.search_path[-1] == BUILTIN_MODULES_DIR
+    assert registry.find("counter") == (lib / "counter.ax").resolve()
+    assert registry.find("math") == (BUILTIN_MODULES_DIR / "math.ax").resolve()
+    # the directories of the registry come first
+    (lib / "math.ax").write_text("(var MAX_VALUE 1)")
+    assert ModuleRegistry([lib]).find("math") == (lib / "math.ax").resolve()
+
+
+def test_module_path_argument(lib):
+    ax_lang = AxLang(module_path=[str(lib)])
+    assert ax_lang.eval(get_ast("(begin (import counter) (prop counter loads))")) == 1
+
+
+@pytest.mark.parametrize(
+    "code, message",
+    [
+        ("(import nothing)", "Module `nothing` is not found in the search path!"),
+        ("(import cycle)", "Circular import of module `cycle`!"),
+    ],
+)
+def test_import_errors(lib, ax_lang, code, message):
+    ax_lang.eager_imports = True
+    ax_lang.modules.search_path.insert(0, lib)
+    with pytest.raises(InterpreterError, match=message):
+        ax_lang.eval(get_ast(code))
+
+
+def test_import_stats(lib, ax_lang):
+    ax_lang.eager_imports = True
+    ax_lang.modules.search_path.insert(0, lib)
+    ax_lang.eval(get_ast("(begin (import uses_counter) (import counter))"))
+
+    uses_counter, counter = ax_lang.modules.stats()
+    assert type(counter) is ImportStats
+    assert (uses_counter.name, uses_counter.imports) == ("uses_counter", 1)
+    assert (counter.name, counter.imports) == ("counter", 2)
+    assert counter.path == (lib / "counter.ax").resolve()
+    assert counter.load_time > 0 and counter.eval_time > 0
+    # evaluating uses_counter imports counter
+    assert uses_counter.eval_time > counter.load_time + counter.eval_time
+    assert str(counter).startswith("counter: 2 imports, load ")
+
+
+def test_lazy_import(lib, ax_lang):
+    ax_lang.modules.search_path.insert(0, lib)
+    counter = ax_lang.eval(get_ast("(begin (import counter) counter)"))
+
+    assert type(counter) is LazyModule
+    assert repr(counter) == "<lazy module counter (not loaded)>"
+    (stats,) = ax_lang.modules.stats()
+    assert not stats.loaded
+    assert str(stats).startswith("counter: 1 imports, not loaded")
+    # another import binds the same proxy
+    assert ax_lang.import_module("counter") is counter
+
+    code = """
+    (begin
+        (import counter)
+        (set (prop counter loads) (+ (prop counter loads) 1))
+        (prop counter loads))
+    """
+    assert ax_lang.eval(get_ast(code)) == 2
+    assert repr(counter) == "<lazy module counter (loaded)>"
+    assert counter.env is ax_lang.import_module("counter")
+    assert ax_lang.modules.stats()[0].loaded
+
+
+def test_lazy_import_errors(lib, ax_lang):
+    ax_lang.modules.search_path.insert(0, lib)
+    # a missing module is reported at the import
+    with pytest.raises(InterpreterError, match="Module `nothing` is not found"):
+        ax_lang.eval(get_ast("(import nothing)"))
+    # a module importing itself binds the proxy while it's loaded
+    cycle = ax_lang.eval(get_ast("(begin (import cycle) (prop cycle cycle))"))
+    assert type(cycle) is LazyModule and cycle.env is not None
+    # a module accessing itself while it's loaded
+    ax_lang.eval(get_ast("(import uses_itself)"))
+    with pytest.raises(InterpreterError, match="Circular import of module"):
+        ax_lang.eval(get_ast("(prop uses_itself x)"))
@@ -0,0 +1,164 @@
+import pytest
+from ax_lang.exceptions import InterpreterError
+from ax_lang.interpreter.ax_lang import VM_ENGINE, AxLang
+from ax_lang.interpreter.bytecode import DECLARE_FIELDS, disassemble
+from ax_lang.interpreter.shapes import FieldInstance, Instance
+from ax_lang.parser.parser import get_ast
+
+POINTS = """
+(begin
+    (class Point null
+        (begin
+            (fields x y)
+            (def constructor (this x y)
+                (begin
+                    (set (prop this x) x)
+                    (set (prop this y) y)))
+            (def sum (this) (+ (prop this x) (prop this y)))))
+    (class Point3D Point
+        (begin
+            (fields z)
+            (def constructor (this x y z)
+                (begin
+                    ((prop (super Point3D) constructor) this x y)
+                    (set (prop this z) z)))))
+    (class Named Point (var kind "named"))
+    {})
+"""
+
+
+def run(ax_lang, code):
+    return ax_lang.eval(get_ast(POINTS.format(code)))
+
+
+def test_compact_instance(ax_lang):
+    point = run(ax_lang, "(new Point 1 2)")
+
+    assert isinstance(point, FieldInstance)
+    assert type(point).__name__ == "Point"
+    assert not hasattr(point, "__dict__")
+    assert point.extra is None
+    assert dict(point.record) == {"x": 1, "y": 2}
+
+
+def test_fields_of_parent(ax_lang):
+    point = run(ax_lang, "(new Point3D 1 2 3)")
+
+    assert list(type(point).fields) == ["x", "y", "z"]
+    assert dict(point.record) == {"x": 1, "y": 2, "z": 3}
+    assert run(ax_lang, "(begin (var p (new Point3D 1 2 3)) ((prop p sum) p))") == 3
+
+
+def test_subclass_without_fields(ax_lang):
+    named = run(ax_lang, "(new Named 1 2)")
+
+    # the layout of the parent is shared
+    assert type(named).__name__ == "Point"
+    assert list(type(named).fields) == ["x", "y"]
+    assert run(ax_lang, "(begin (var p (new Named 1 2)) (prop p kind))") == "named"
+
+
+def test_undeclared_property(ax_lang):
+    code = """
+    (begin
+        (var p (new Point 1 2))
+        (set (prop p label) 10)
+        (+ (prop p label) (prop p x)))
+    """
+    assert run(ax_lang, code) == 11
+
+    point = run(ax_lang, "(begin (var p (new Point 1 2)) (set (prop p label) 0) p)")
+    assert point.extra == {"label": 0}
+    assert dict(point.record) == {"x": 1, "y": 2, "label": 0}
+
+
+def test_unset_field(ax_lang):
+    code = """
+    (begin
+        (class Box null
+            (begin
+                (fields value)
+                (def constructor (this) null)))
+        (var b (new Box))
+        {})
+    """
+    box = ax_lang.eval(get_ast(code.format("b")))
+    assert dict(box.record) == {}
+    # an unset field is looked up in the class, as a property the instance doesn't have
+    with pytest.raises(ValueError, match="Variable `value` is not defined!"):
+        ax_lang.eval(get_ast(code.format("(prop b value)")))
+
+
+def test_unset_field_named_as_method(ax_lang):
+    code = """
+    (begin
+        (class C null
+            (begin
+                (fields x)
+                (def constructor (this) 0)
+                (def x (this) 7)))
+        (var c (new C))
+        (var before 0)
+        (for (var i 0) (< i 2) (++ i)
+            (+= before ((prop c x) c)))
+        (set (prop c x) 5)
+        (+ (* 10 before) (prop c x)))
+    """
+    # the method until the field is set, also from a cached site
+    assert ax_lang.eval(get_ast(code)) == 145
+
+
+def test_class_without_fields(ax_lang):
+    code = "(begin (class Plain null (def constructor (this) null)) (new Plain))"
+    assert type(ax_lang.eval(get_ast(code))) is Instance
+
+
+def test_fields_in_a_loop(ax_lang):
+    # the sites are cached on the first iteration and hit on the next ones
+    code = """
+    (begin
+        (var p (new Point 0 1))
+        (for (var i 0) (< i 10) (++ i)
+            (set (prop p x) (+ (prop p x) (prop p y))))
+        (prop p x))
+    """
+    assert run(ax_lang, code) == 10
+
+
+def test_field_name_error(ax_lang):
+    with pytest.raises(
+        InterpreterError, match='Field name must be a symbol, got `"x"`!'
+    ):
+        ax_lang.eval(get_ast('(class A null (fields "x"))'))
+
+
+@pytest.mark.parametrize(
+    "code, expected",
+    [
+        ("(begin (def fields (a) (* a 2)) (fields 4))", 8),
+        # only a statement of a class body declares fields
+        (
+            """
+            (begin
+                (def fields (a) (* a 2))
+                (class A null
+                    (begin
+                        (fields x)
+                        (def constructor (this) (set (prop this x) (fields 3)))))
+                (prop (new A) x))
+            """,
+            6,
+        ),
+    ],
+)
+def test_fields_function(ax_lang, code, expected):
+    assert ax_lang.eval(get_ast(code)) == expected
+
+
+def test_vm_declare_fields():
+    ax_lang = AxLang(engine=VM_ENGINE)
+    code = ax_lang.vm.compiler.compile(get_ast("(class A null (fields x y))"))
+    body = code.consts[0]
+
+    assert body.opcodes[0] == DECLARE_FIELDS
+    assert "DECLARE_FIELDS   0 (('x', 'y'))" in disassemble(body)
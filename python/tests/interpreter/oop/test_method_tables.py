@@ -0,0 +1,130 @@
+from ax_lang.interpreter.ax_lang import VM_ENGINE, AxLang
+from ax_lang.interpreter.bytecode import LOAD_SUPER, disassemble
+from ax_lang.interpreter.classes import Class
+from ax_lang.parser.parser import get_ast
+
+SHAPES = """
+(begin
+    (class Shape null
+        (begin
+            (var count 0)
+            (def constructor (this) (set count (+ count 1)))
+            (def name (this) "shape")
+            (def describe (this) ((prop this name) this))))
+    (class Square Shape
+        (begin
+            (def constructor (this side)
+                (begin
+                    ((prop (super Square) constructor) this)
+                    (set (prop this side) side)))
+            (def area (this) (* (prop this side) (prop this side)))))
+    {})
+"""
+
+
+def run(ax_lang, code):
+    return ax_lang.eval(get_ast(SHAPES.format(code)))
+
+
+def test_class_object(ax_lang):
+    square = run(ax_lang, "Square")
+
+    assert type(square) is Class
+    assert repr(square) == "<class Square>"
+    assert square.base.name == "Shape" and square.base.base is None
+    assert set(square.subclasses) == set()
+    assert set(square.base.subclasses) == {square}
+
+
+def test_method_table(ax_lang):
+    square = run(ax_lang, "(begin (var s (new Square 3)) ((prop s area) s) Square)")
+
+    assert set(square.vtable) >= {"count", "constructor", "name", "describe", "area"}
+    assert square.vtable["constructor"] is square.record["constructor"]
+    assert square.vtable["name"] is square.base.record["name"]
+    # `new` looks up the constructor, `prop` the method
+    assert square.hits == 2
+
+
+def test_lookup_independent_of_depth(ax_lang):
+    # a chain of 50 classes, the method is declared in the root one
+    classes = "".join(f"(class C{i} C{i - 1} (var level{i} {i}))" for i in range(1, 50))
+    code = f"""
+    (begin
+        (class C0 null (def level (this) 0))
+        {classes}
+        (var leaf C49)
+        leaf)
+    """
+    leaf = ax_lang.eval(get_ast(code))
+
+    assert leaf.lookup("level").name == "level"
+    assert leaf.lookup("level25") == 25
+    assert (leaf.builds, leaf.hits) == (1, 2)
+
+
+def test_invalidation_by_parent(ax_lang):
+    code = """
+    (begin
+        (var s (new Square 2))
+        (var before ((prop s describe) s))
+        (set (prop Shape name) (lambda (this) "square"))
+        (+ before " " ((prop s describe) s)))
+    """
+    assert run(ax_lang, code) == "shape square"
+
+    square = run(ax_lang, "(begin (var s (new Square 2)) ((prop s describe) s) Square)")
+    shape = square.base
+    invalidations = (shape.invalidations, square.invalidations)
+    shape.define("name", "changed")
+    assert (shape.vtable, square.vtable) == (None, None)
+    assert (shape.invalidations, square.invalidations) == (
+        invalidations[0] + 1,
+        invalidations[1] + 1,
+    )
+    assert square.lookup("name") == "changed"
+
+
+def test_invalidation_by_class_variable(ax_lang):
+    # the constructor assigns `count` of Shape
+    code = """
+    (begin
+        (new Square 1)
+        (new Square 2)
+        (var s (new Square 3))
+        (+ (prop s count) (* 10 (prop Shape count))))
+    """
+    assert run(ax_lang, code) == 33
+    square = run(ax_lang, "(begin (new Square 1) (new Square 2) Square)")
+    assert square.invalidations >= 1
+
+
+def test_subclass_overrides_after_invalidation(ax_lang):
+    code = """
+    (begin
+        (var s (new Square 2))
+        ((prop s describe) s)
+        (set (prop Square name) (lambda (this) "override"))
+        ((prop s describe) s))
+    """
+    assert run(ax_lang, code) == "override"
+
+
+def test_super_of_enclosing_class(ax_lang):
+    # `super` in the body of Square isn't affected by rebinding the name
+    code = """
+    (begin
+        (var Original Square)
+        (set Square null)
+        (var s (new Original 4))
+        (+ ((prop s area) s) (prop s count)))
+    """
+    assert run(ax_lang, code) == 17
+
+
+def test_vm_load_super():
+    ax_lang = AxLang(engine=VM_ENGINE)
+    code = ax_lang.vm.compiler.compile(get_ast("(super Square)"))
+
+    assert code.opcodes[0] == LOAD_SUPER
+    assert "LOAD_SUPER       0 (Square)" in disassemble(code)
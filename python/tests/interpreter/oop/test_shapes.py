@@ -0,0 +1,188 @@
+from ax_lang.interpreter import shapes
+from ax_lang.interpreter.ax_lang import VM_ENGINE, AxLang
+from ax_lang.interpreter.bytecode import GET_PROP, SET_PROP
+from ax_lang.interpreter.shapes import (
+    EMPTY_SHAPE,
+    MAX_PROPERTIES,
+    DictInstance,
+    Instance,
+    PropertyCache,
+)
+from ax_lang.parser.parser import get_ast
+from tests.interpreter.test_utils import exec_test
+
+POINTS = """
+(begin
+    (class Point null
+        (begin
+            (def constructor (this x y)
+                (begin
+                    (set (prop this x) x)
+                    (set (prop this y) y)))
+            (def calc (this) (+ (prop this x) (prop this y)))))
+    (class Point3D Point
+        (begin
+            (def constructor (this x y z)
+                (begin
+                    ((prop (super Point3D) constructor) this x y)
+                    (set (prop this z) z)))
+            (def calc (this) (+ ((prop (super Point3D) calc) this) (prop this z)))))
+    {})
+"""
+
+
+def run(ax_lang, code):
+    return ax_lang.eval(get_ast(POINTS.format(code)))
+
+
+def test_instance_layout(ax_lang):
+    p = run(ax_lang, "(new Point 1 2)")
+
+    assert type(p) is Instance
+    assert not hasattr(p, "__dict__")
+    assert list(p.shape.index.items()) == [("x", 0), ("y", 1)]
+    assert p.slots == [1, 2]
+    assert dict(p.record) == {"x": 1, "y": 2}
+
+
+def test_instances_share_shapes(ax_lang):
+    p = run(ax_lang, "(new Point 1 2)")
+    q = run(ax_lang, "(new Point 3 4)")
+    r = run(ax_lang, "(new Point3D 1 2 3)")
+
+    assert p.shape is q.shape
+    # Point3D instances take the transitions of Point instances and one more
+    assert r.shape is p.shape.add("z")
+    assert EMPTY_SHAPE.add("x").add("y") is p.shape
+
+
+PAIR = """
+(begin
+    (class Pair null
+        (def constructor (this a b)
+            (if a
+                (begin (set (prop this a) a) (set (prop this b) b))
+                (begin (set (prop this b) b) (set (prop this a) a)))))
+    (def sum (pair) (+ (prop pair a) (prop pair b)))
+    {})
+"""
+
+
+def test_property_order_gives_another_shape(ax_lang):
+    ab = ax_lang.eval(get_ast(PAIR.format("(new Pair 1 2)")))
+    ba = ax_lang.eval(get_ast(PAIR.format("(new Pair 0 3)")))
+
+    assert ab.shape is not ba.shape
+    assert (ab.shape.index["a"], ba.shape.index["a"]) == (0, 1)
+    # the sites of `sum` read instances of both shapes
+    code = "(+ (sum (new Pair 1 2)) (* 10 (sum (new Pair 0 3))) (* 100 (sum (new Pair 1 2))))"
+    exec_test(ax_lang, PAIR.format(code), 333)
+
+
+def test_polymorphic_sites(ax_lang):
+    # `calc` of Point reads instances of both shapes
+    code = """
+    (begin
+        (var sum 0)
+        (for (var i 0) (< i 4) (++ i)
+            (begin
+                (+= sum ((prop (new Point i 1) calc) (new Point i 1)))
+                (+= sum ((prop (super Point3D) calc) (new Point3D i 1 100)))))
+        sum)
+    """
+    assert run(ax_lang, code) == 20
+
+
+def test_update_property(ax_lang):
+    code = """
+    (begin
+        (var p (new Point 1 2))
+        (for (var i 0) (< i 3) (++ i)
+            (set (prop p x) (+ (prop p x) 10)))
+        (set (prop p label) 7)
+        (+ ((prop p calc) p) (prop p label)))
+    """
+    assert run(ax_lang, code) == 40
+
+
+def test_class_and_module_properties(ax_lang):
+    code = """
+    (begin
+        (module Math (var pi 3))
+        (set (prop Point origin) 0)
+        (+ (prop Math pi) (prop Point origin) (prop (new Point 1 2) origin)))
+    """
+    assert run(ax_lang, code) == 3
+
+
+def test_property_cache():
+    cache = PropertyCache("x")
+    p = Instance(None)
+
+    assert cache.store(p, 1) == 1
+    assert (cache.before, cache.after) == (EMPTY_SHAPE, p.shape)
+    q = Instance(None)
+    cache.store(q, 2)
+    assert q.shape is p.shape and q.slots == [2]
+
+    assert cache.load(p) == 1
+    assert (cache.shape, cache.index) == (p.shape, 0)
+    cache.store(q, 3)
+    assert q.slots == [3]
+
+
+def test_many_properties(ax_lang):
+    # one property more than a shape can have
+    names = [f"p{i}" for i in range(MAX_PROPERTIES + 1)]
+    sets = " ".join(f"(set (prop this {name}) {i})" for i, name in enumerate(names))
+    code = f"""
+    (begin
+        (class Bag null
+            (begin
+                (def constructor (this) (begin {sets}))
+                (def first (this) (prop this p0))))
+        (def bump (bag)
+            (begin
+                (set (prop bag p0) (+ (prop bag p0) 1))
+                (+ ((prop bag first) bag) (prop bag {names[-1]}))))
+        (var bag (new Bag))
+        (var sum 0)
+        (for (var i 0) (< i 2) (++ i)
+            (+= sum (+ (bump bag) (bump (new Bag)))))
+        {{}})
+    """
+    # the sites of `bump` are cached on the first iteration
+    assert (
+        ax_lang.eval(get_ast(code.format("sum"))) == 1 + 2 + 1 + 1 + 4 * MAX_PROPERTIES
+    )
+
+    bag = ax_lang.eval(get_ast(code.format("bag")))
+    assert type(bag) is DictInstance and bag.shape is None
+    assert bag.record == {name: i for i, name in enumerate(names)} | {"p0": 2}
+
+
+def test_shapes_limit(monkeypatch):
+    monkeypatch.setattr(shapes, "MAX_SHAPES", shapes.Shape.created)
+    cache = PropertyCache("unseen property")
+    p = Instance(None)
+    p.define("x", 1)
+
+    # the existing transitions are still taken
+    assert type(p) is Instance and p.shape is EMPTY_SHAPE.add("x")
+    assert cache.store(p, 2) == 2
+    assert type(p) is DictInstance and p.record == {"x": 1, "unseen property": 2}
+    assert cache.before is None
+    assert (cache.load(p), p.lookup("x")) == (2, 1)
+    assert p.resolve("x") is p
+
+
+def test_vm_caches():
+    ax_lang = AxLang(engine=VM_ENGINE)
+    code = ax_lang.vm.compiler.compile(get_ast("(set (prop p x) (prop q y))"))
+
+    caches = [
+        (cache.name, opcode)
+        for cache, opcode in zip(code.caches, code.opcodes)
+        if cache is not None
+    ]
+    assert caches == [("y", GET_PROP), ("x", SET_PROP)]
@@ -1,4 +1,6 @@
 import pytest
+from ax_lang.exceptions import InterpreterError
+from ax_lang.interpreter.ax_lang import AxLang
 
 
 class TestAxLang:
@@ -27,3 +29,8 @@ class TestAxLang:
     )
     def test_is_variable_name(self, ax_lang, expr, is_name):
         assert ax_lang._is_variable_name(expr) is is_name
+
+
+def test_unsupported_engine():
+    with pytest.raises(InterpreterError, match="Unsupported engine `jit`"):
+        AxLang(engine="jit")
@@ -1,3 +1,6 @@
+from ax_lang.interpreter.ax_lang import AxLang
+from ax_lang.interpreter.tracing import Tracer
+from ax_lang.parser.parser import get_ast
 from tests.interpreter.test_utils import exec_test
 
 
@@ -64,3 +67,40 @@ def test_with_parser(ax_lang):
     """,
         120,
     )
+
+
+def test_eval_forms(ax_lang):
+    forms = [["var", "x", 10], ["var", "y", 20], ["+", "x", "y"]]
+    assert ax_lang.eval_forms(iter(forms)) == ax_lang.eval(["begin", *forms]) == 30
+    assert ax_lang.eval_forms([]) is None
+
+
+def test_blocks_declaring_nothing(ax_lang):
+    code = """
+    (begin
+        (var x 0)
+        (var sum 0)
+        (for (var i 0) (< i 5) (++ i)
+            (begin
+                (set sum (+ sum i))
+                (if (> i 2) (begin (set x i)) (begin))))
+        (begin (var x 100))
+        (+ sum x))
+    """
+    exec_test(ax_lang, code, 14)
+
+
+def test_block_declaring_nothing_shares_environment():
+    ax_lang = AxLang()
+    envs = []
+
+    class EnvTracer(Tracer):
+        def on_enter(self, expr, env):
+            if expr == "x":
+                envs.append(env)
+
+    ax_lang.set_tracer(EnvTracer())
+    ax_lang.eval(get_ast("(begin (var x 1) x (begin x (begin (var y x))))"))
+    # the second block declares nothing, the third declares `y`
+    assert envs[0] is envs[1]
+    assert envs[2].parent is envs[0]
@@ -0,0 +1,109 @@
+from array import array
+
+import pytest
+from ax_lang.interpreter.ax_lang import AxLang
+from ax_lang.interpreter.bytecode import (
+    BINARY_OP,
+    CALL,
+    LOAD_CONST,
+    LOAD_NAME,
+    RETURN_VALUE,
+    TAIL_CALL,
+    BytecodeCompiler,
+    CodeObject,
+    disassemble,
+)
+from ax_lang.parser.parser import get_ast
+
+
+@pytest.fixture
+def compiler():
+    return BytecodeCompiler(AxLang(engine="vm"))
+
+
+def test_compact_buffers(compiler):
+    code = compiler.compile(["add", "x", 1])
+
+    assert code.opcodes == bytes(
+        [LOAD_NAME, LOAD_NAME, LOAD_CONST, TAIL_CALL, RETURN_VALUE]
+    )
+    assert code.operands == array("i", [0, 1, 0, 2, 0])
+    assert code.consts == (1,)
+    assert code.names == ("add", "x")
+
+
+def test_constant_pool_deduplication(compiler):
+    code = compiler.compile(["+", 1, 1.0, 1, '"a"', '"a"'])
+    assert code.consts == (1, 1.0, "a")
+
+
+def test_disassemble(compiler):
+    code = compiler.compile(get_ast("(begin (def inc (x) (+ x 1)) (if (inc 1) 2 3))"))
+
+    assert disassemble(code) == "\n".join(
+        [
+            "Disassembly of <code <expr>>:",
+            "   0 PUSH_SCOPE",
+            "   1 MAKE_FUNCTION    0 (<code inc>)",
+            "   2 STORE_NAME       0 (inc)",
+            "   3 POP_TOP",
+            "   4 LOAD_NAME        0 (inc)",
+            "   5 LOAD_CONST       1 (1)",
+            "   6 CALL             1",
+            "   7 JUMP_IF_FALSE    to 10",
+            "   8 LOAD_CONST       2 (2)",
+            "   9 JUMP             to 11",
+            "  10 LOAD_CONST       3 (3)",
+            "  11 POP_SCOPE",
+            "  12 RETURN_VALUE",
+            "",
+            "Disassembly of <code inc>:",
+            "  params: x",
+            "   0 LOAD_NAME        0 (x)",
+            "   1 LOAD_CONST       0 (1)",
+            "   2 BINARY_OP        1 (+)",
+            "   3 RETURN_VALUE",
+        ]
+    )
+
+
+def test_tail_calls(compiler):
+    code = compiler.compile(
+        get_ast("(if (f 1) (begin (f 2) (f 3)) (while (f 4) (f 5)))"), "<module>"
+    )
+    calls = [opcode for opcode in code.opcodes if opcode in (CALL, TAIL_CALL)]
+
+    assert calls == [CALL, CALL, TAIL_CALL, CALL, CALL]
+
+
+def test_nested_code_objects(compiler):
+    code = compiler.compile(get_ast("(class Point null (def calc (this) 1))"))
+    (class_code,) = [c for c in code.consts if isinstance(c, CodeObject)]
+
+    assert class_code.name == "Point"
+    assert [c.name for c in class_code.consts if isinstance(c, CodeObject)] == ["calc"]
+
+
+def test_binary_operators(compiler):
+    code = compiler.compile(get_ast("(< (+ x 1) (f x 2))"))
+
+    assert code.opcodes == bytes(
+        [
+            LOAD_NAME,
+            LOAD_CONST,
+            BINARY_OP,
+            LOAD_NAME,
+            LOAD_NAME,
+            LOAD_CONST,
+            CALL,
+            BINARY_OP,
+            RETURN_VALUE,
+        ]
+    )
+    assert code.names == ("x", "+", "f", "<")
+
+
+def test_while_result():
+    ax_lang = AxLang(engine="vm")
+    assert ax_lang.eval(get_ast("(begin (var i 0) (while (< i 3) (++ i)))")) == 3
+    assert ax_lang.eval(get_ast("(while false 1)")) is None
@@ -0,0 +1,92 @@
+import sys
+
+import pytest
+from ax_lang.exceptions import InterpreterError
+from ax_lang.interpreter.ax_lang import AxLang
+from ax_lang.interpreter.cek import FRAME_SIZE
+from ax_lang.parser.parser import get_ast
+
+SUM = """
+    (begin
+        (def sum (n)
+            (if (== n 0)
+                0
+                (+ n (sum (- n 1)))))
+        (sum {n}))
+    """
+
+
+def test_deep_recursion():
+    n = sys.getrecursionlimit() * 20
+    ax_lang = AxLang(engine="cek")
+    assert ax_lang.eval(get_ast(SUM.format(n=n))) == n * (n + 1) // 2
+
+
+def test_deep_recursion_exceeds_python_stack_in_tree_engine():
+    n = sys.getrecursionlimit() * 20
+    with pytest.raises(RecursionError):
+        AxLang().eval(get_ast(SUM.format(n=n)))
+
+
+def test_stack_overflow():
+    ax_lang = AxLang(engine="cek", memory_budget=100 * FRAME_SIZE)
+    program = """
+        (begin
+            (def sum (n)
+                (if (== n 0)
+                    0
+                    (+ n (sum (- n 1)))))
+            (def main () (+ 1 (sum 1000)))
+            (main))
+        """
+
+    with pytest.raises(InterpreterError) as error:
+        ax_lang.eval(get_ast(program))
+
+    message = str(error.value)
+    assert message.startswith(
+        f"Stack overflow: recursion exceeds the memory budget of {100 * FRAME_SIZE}"
+    )
+    assert message.endswith(
+        "\n".join(
+            [
+                "Call chain (innermost last):",
+                "  main",
+                "  sum",
+                "  sum",
+                "  sum",
+                "  sum",
+                "  ... 41 more calls ...",
+                "  sum",
+                "  sum",
+                "  sum",
+                "  sum",
+                "  sum",
+            ]
+        )
+    )
+
+
+def test_tail_calls_in_constant_space():
+    ax_lang = AxLang(engine="cek", memory_budget=100 * FRAME_SIZE)
+    program = """
+        (begin
+            (def count (n acc)
+                (if (== n 0) acc (count (- n 1) (+ acc 1))))
+            (count 10000 0))
+        """
+    assert ax_lang.eval(get_ast(program)) == 10000
+
+
+def test_stack_overflow_in_constructor():
+    ax_lang = AxLang(engine="cek", memory_budget=50 * FRAME_SIZE)
+    program = """
+        (begin
+            (class Node null
+                (def constructor (this depth)
+                    (set (prop this child) (new Node (+ depth 1)))))
+            (new Node 0))
+        """
+
+    with pytest.raises(InterpreterError, match="  constructor\n  constructor"):
+        ax_lang.eval(get_ast(program))
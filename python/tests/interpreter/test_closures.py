@@ -0,0 +1,130 @@
+import pytest
+from ax_lang.interpreter.ax_lang import CLOSURE_ENGINE, AxLang
+from ax_lang.interpreter.environment import Frame
+from ax_lang.interpreter.resolver import CLOSURE
+from ax_lang.parser.parser import get_ast
+
+
+def run(code, **kwargs):
+    ax_lang = AxLang(engine=CLOSURE_ENGINE, **kwargs)
+    return ax_lang.eval(get_ast(code, typed=True))
+
+
+def is_flat(fn):
+    env = fn.env
+    return isinstance(env, Frame) and env.scope.kind == CLOSURE
+
+
+def test_flat_closure_keeps_referenced_variables():
+    fn = run(
+        """
+        (begin
+            (def make (n)
+                (begin
+                    (var big 1)
+                    (var other 2)
+                    (lambda (x) (+ x n))))
+            (make 5))
+        """
+    )
+    assert is_flat(fn)
+    assert list(fn.env.scope.names) == ["n"]
+    assert fn.env.slots == [5]
+    assert not isinstance(fn.env.parent, Frame)
+
+
+@pytest.mark.parametrize(
+    "code, expected",
+    [
+        # self-recursive local function
+        (
+            """
+            (begin
+                (def outer (n)
+                    (begin
+                        (def fact (k) (if (== k 0) 1 (* k (fact (- k 1)))))
+                        (fact n)))
+                (outer 5))
+            """,
+            120,
+        ),
+        # nested closures
+        (
+            """
+            (begin
+                (def adder (a) (lambda (b) (lambda (c) (+ a (+ b c)))))
+                (((adder 1) 10) 100))
+            """,
+            111,
+        ),
+        # a variable declared after the closure
+        (
+            """
+            (begin
+                (def make ()
+                    (begin
+                        (def get () later)
+                        (var later 42)
+                        (get)))
+                (make))
+            """,
+            42,
+        ),
+        # an assigned variable is shared with the enclosing frame
+        (
+            """
+            (begin
+                (def counter ()
+                    (begin
+                        (var count 0)
+                        (lambda () (begin (set count (+ count 1)) count))))
+                (var next (counter))
+                (next)
+                (next)
+                (next))
+            """,
+            3,
+        ),
+        # a variable of the enclosing scope until a local one is declared
+        (
+            """
+            (begin
+                (var y 7)
+                (def h (c) (begin (if c (var y 2) 0) y))
+                (+ (h false) (h true)))
+            """,
+            9,
+        ),
+        ("(begin (var y 7) (def h () (begin (while false (var y 2)) y)) (h))", 7),
+        (
+            """
+            (begin
+                (var y 7)
+                (def h (c) (lambda () (begin (if c (var y 2) 0) y)))
+                (+ ((h false)) ((h true))))
+            """,
+            9,
+        ),
+    ],
+)
+def test_closures(code, expected):
+    assert run(code) == expected
+    assert AxLang().eval(get_ast(code)) == expected
+
+
+def test_assigned_variable_is_not_flat():
+    fn = run(
+        """
+        (begin
+            (def counter ()
+                (begin (var count 0) (lambda () (set count (+ count 1)))))
+            (counter))
+        """
+    )
+    assert not is_flat(fn)
+
+
+def test_hash_cons_disables_flat_closures():
+    code = "(begin (def make (n) (lambda (x) (+ x n))) (make 5))"
+    assert is_flat(run(code))
+    assert not is_flat(run(code, hash_cons=True))
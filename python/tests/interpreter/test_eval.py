@@ -1,3 +1,6 @@
+from ax_lang.interpreter.ax_lang import AxLang
+from ax_lang.parser.compact import CompactAST
+from ax_lang.parser.parser import get_ast
 from tests.interpreter.test_utils import exec_test
 
 
@@ -13,3 +16,38 @@ def test_ax_lang_eval(ax_lang):
     exec_test(ax_lang, "-5.7", -5.7)
     exec_test(ax_lang, "(+ 1 -5.7)", -4.7)
     exec_test(ax_lang, "(+ -5.7 1)", -4.7)
+
+
+def test_typed_ast(ax_lang):
+    code = """
+    (begin
+        (var greeting "hello")
+        (def shout (s n) (if (> n 0) s "quiet"))
+        (var i 0)
+        (++ i)
+        (+= i 2)
+        (switch ((== i 3) (shout greeting i))
+                (else "unreachable")))
+    """
+    assert ax_lang.eval(get_ast(code, typed=True)) == "hello"
+    assert ax_lang.eval(get_ast('"hello"', typed=True)) == "hello"
+
+
+def test_compact_ast(ax_lang):
+    compact = CompactAST.from_ast(get_ast('(begin (var s "ok") (if (> 2 1) s 0))'))
+    assert ax_lang.eval(compact) == "ok"
+
+
+def test_hash_consed_program(ax_lang):
+    ax_lang = AxLang(engine=ax_lang.engine, hash_cons=True)
+    code = """
+    (begin
+        (def f (x) (if (> x 1) (+ x 1) (- x 1)))
+        (def g (x) (if (> x 1) (+ x 1) (- x 1)))
+        (+ (f 5) (g 0)))
+    """
+    assert ax_lang.eval(get_ast(code, typed=True)) == 5
+    assert ax_lang.hash_conser.stats().sharing_ratio > 0.5
+    if ax_lang.compiler is not None:
+        # the bodies of `f` and `g` are compiled once
+        assert ax_lang.compiler.shared_code_hits == 1
@@ -0,0 +1,130 @@
+import pytest
+from ax_lang.exceptions import InterpreterError
+from ax_lang.interpreter.ax_lang import CLOSURE_ENGINE, AxLang
+from ax_lang.parser.parser import get_ast
+
+
+def run(code, inline_threshold=20, **kwargs):
+    ax_lang = AxLang(engine=CLOSURE_ENGINE, inline_threshold=inline_threshold, **kwargs)
+    rez = ax_lang.eval(get_ast(code, typed=True))
+    assert AxLang(engine=CLOSURE_ENGINE).eval(get_ast(code, typed=True)) == rez
+    return rez, dict(ax_lang.compiler.inlined)
+
+
+def test_inline_helpers():
+    code = """
+    (begin
+        (def abs (value) (if (< value 0) (- value) value))
+        (def square (x) (* x x))
+        (var sum 0)
+        (for (var i 0) (< i 10) (++ i)
+            (set sum (+ sum (abs (- (square i) (square 5))))))
+        sum)
+    """
+    assert run(code) == (225, {"square": 2, "abs": 1})
+
+
+def test_threshold():
+    code = """
+    (begin
+        (def abs (value) (if (< value 0) (- value) value))
+        (def square (x) (* x x))
+        (+ (abs -2) (square 3)))
+    """
+    assert run(code, inline_threshold=5) == (11, {"square": 1})
+    assert run(code, inline_threshold=0) == (11, {})
+
+
+@pytest.mark.parametrize(
+    "code, expected",
+    [
+        # recursive
+        ("(begin (def fact (n) (if (== n 0) 1 (* n (fact (- n 1))))) (fact 5))", 120),
+        # reassigned
+        ("(begin (def f (x) x) (set f (lambda (x) 2)) (f 1))", 2),
+        # declared twice
+        ("(begin (def f (x) x) (var y (f 1)) (def f (x) 2) (+ y (f 1)))", 3),
+        # declared conditionally
+        ("(begin (var f 0) (if true (set f (lambda (x) x)) 0) (f 1))", 1),
+    ],
+)
+def test_not_inlined(code, expected):
+    rez, inlined = run(code)
+    assert rez == expected
+    assert inlined.get("f", 0) == 0 and "fact" not in inlined
+
+
+def test_mutual_recursion():
+    # a body is not inlined into itself
+    code = """
+    (begin
+        (def even (n) (if (== n 0) true (odd (- n 1))))
+        (def odd (n) (if (== n 0) false (even (- n 1))))
+        (even 10))
+    """
+    assert run(code) == (True, {"even": 1, "odd": 1})
+
+
+def test_arguments_are_evaluated_once():
+    code = """
+    (begin
+        (var n 0)
+        (def twice (x) (+ x x))
+        (var rez (twice (begin (set n (+ n 1)) n)))
+        (+ rez (* n 100)))
+    """
+    assert run(code) == (102, {"twice": 1})
+
+
+def test_shadowed_free_variable():
+    # `k` of the body is the outer one, the call site sees another `k`
+    code = """
+    (begin
+        (var k 10)
+        (def add_k (x) (+ x k))
+        (begin
+            (var k 1)
+            (+ (add_k 5) (add_k k))))
+    """
+    assert run(code) == (26, {"add_k": 2})
+
+
+def test_nested_call_sites():
+    code = """
+    (begin
+        (def square (x) (* x x))
+        (def f (n) (square (square n)))
+        (f 3))
+    """
+    assert run(code) == (81, {"square": 2, "f": 1})
+
+
+def test_inlined_tail_call():
+    code = """
+    (begin
+        (def next (n) (count (- n 1)))
+        (def count (n) (if (== n 0) 0 (next n)))
+        (count 5000))
+    """
+    assert run(code) == (0, {"next": 1, "count": 1})
+
+
+def test_body_with_declarations():
+    code = """
+    (begin
+        (def f (x) (begin (var y (* x 2)) (+ x y)))
+        (+ (f 1) (f 2)))
+    """
+    assert run(code) == (9, {"f": 2})
+
+
+def test_with_hash_cons():
+    code = "(begin (def square (x) (* x x)) (+ (square 2) (square 2)))"
+    assert run(code, hash_cons=True) == (8, {"square": 2})
+
+
+def test_wrong_number_of_arguments_not_inlined():
+    ax_lang = AxLang(engine=CLOSURE_ENGINE, inline_threshold=20)
+    with pytest.raises(InterpreterError, match="takes 1 argument"):
+        ax_lang.eval(get_ast("(begin (def f (x) 1) (f))", typed=True))
+    assert not ax_lang.compiler.inlined
@@ -0,0 +1,104 @@
+from ax_lang.interpreter.environment import Environment
+from ax_lang.interpreter.lowering import Block, Lowered, Lowering
+from ax_lang.parser.parser import get_ast
+
+
+def test_lower_sugar(transformer):
+    lowering = Lowering(transformer)
+    ast = get_ast("(begin (def inc (x) (+= x 1)) (for (var i 0) (< i 3) (++ i) i))")
+
+    lowered = lowering.lower(ast)
+
+    assert lowered == [
+        "begin",
+        ["var", "inc", ["lambda", ["x"], ["set", "x", ["+", "x", 1]]]],
+        [
+            "begin",
+            ["var", "i", 0],
+            ["while", ["<", "i", 3], ["begin", "i", ["set", "i", ["+", "i", 1]]]],
+        ],
+    ]
+    assert isinstance(lowered[1], Lowered)
+    assert lowered[1].origin == ast[1]
+    assert lowered[1][2][2].origin == ["+=", "x", 1]
+    assert lowered[2].origin == ast[2]
+
+
+def test_lower_without_sugar_keeps_nodes(transformer):
+    lowering = Lowering(transformer)
+    ast = get_ast("(begin (var x 1) (lambda (for) (+ for x)))")
+
+    assert lowering.lower(ast) is ast
+    assert lowering.lower(lowering.lower(ast[1:])) == ast[1:]
+
+
+def test_lower_is_idempotent(transformer):
+    lowering = Lowering(transformer)
+    lowered = lowering.lower(get_ast("(switch ((> x 1) 1) (else 2))"))
+
+    assert lowering.lower(lowered) is lowered
+    assert transformer.invocations == {"switch_to_if": 1}
+
+
+def test_no_transformations_in_steady_state(ax_lang):
+    ast = get_ast(
+        """
+        (begin
+            (def get_grade (score)
+                (switch ((>= score 90) "A")
+                        ((>= score 80) "B")
+                        (else "F")))
+            (var grades 0)
+            (for (var i 0) (< i 50) (++ i)
+                (if (== (get_grade (* i 2)) "A") (+= grades 1) null))
+            grades)
+        """
+    )
+
+    assert ax_lang.eval(ast) == 5
+    # every sugar node is transformed once, by the lowering pass
+    assert ax_lang.transformer.invocations == {
+        "def_to_lambda": 1,
+        "switch_to_if": 1,
+        "for_to_while": 1,
+        "inc_to_set": 1,
+        "plus_assign_to_set": 1,
+    }
+
+    lowered = ax_lang.lower(ast)
+    ax_lang.transformer.invocations.clear()
+    assert ax_lang.eval(lowered, Environment({}, ax_lang.global_env)) == 5
+    assert not ax_lang.transformer.invocations
+
+
+def test_eval_forms_lowers_forms(ax_lang):
+    forms = [["def", "square", ["x"], ["*", "x", "x"]], ["square", 3]]
+
+    assert ax_lang.eval_forms(forms) == 9
+    assert ax_lang.transformer.invocations == {"def_to_lambda": 1}
+
+
+def test_blocks_declaring_nothing(transformer):
+    lowering = Lowering(transformer, custom_forms={"unless"})
+    ast = get_ast(
+        """
+        (begin
+            (var x 0)
+            (begin (set x 1) (begin (lambda (y) (begin (var z y) z))))
+            (begin (unless x 1 2))
+            (for (set x 0) (< x 3) (++ x) (print x)))
+        """
+    )
+
+    lowered = lowering.lower(ast)
+
+    assert type(lowered) is list
+    assert type(lowered[2]) is Block
+    assert type(lowered[2][2]) is Block
+    # the function body declares `z`
+    assert type(lowered[2][2][1][2]) is list
+    # a custom form may declare variables
+    assert type(lowered[3]) is list
+    # the loop body
+    assert type(lowered[4][2][2]) is Block
+    assert lowering.lower(lowered) is lowered
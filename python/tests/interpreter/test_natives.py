@@ -0,0 +1,85 @@
+import pytest
+from ax_lang.interpreter.environment import Environment, GlobalEnvironment
+from ax_lang.interpreter.natives import NATIVE_FUNCTIONS, accepts
+from ax_lang.parser.parser import get_ast
+
+
+@pytest.mark.parametrize("typed", [False, True])
+@pytest.mark.parametrize(
+    "code, expected",
+    [
+        ("(+ (* 2 3) (- 10 4))", 12),
+        ("(begin (var x 1) (var y 2) (< x y))", True),
+        ("(begin (var x 5) (++ x) (-- x) (*= x 3) (-= x 1) (+= x 10) x)", 24),
+        # `x` of the inner block is not defined yet
+        ("(begin (var x 1) (begin (++ x) (var x 5)) x)", 2),
+        ('(+ "a" "b")', "ab"),
+        ("(- 5)", -5),
+        # variadic
+        ("(+ 1 2 3 4)", 10),
+        ("(+ 5)", 5),
+        ("(- 10 1 2)", 7),
+        ("(* 2 3 4)", 24),
+        ("(/ 60 2 3)", 10),
+        ('(+ "a" "b" "c")', "abc"),
+        ("(begin (var x 2) (+ x x (* x x x)))", 12),
+        # chained comparisons
+        ("(< 1 2 3)", True),
+        ("(< 1 3 2)", False),
+        ("(<= 1 1 2)", True),
+        ("(> 3 2 1)", True),
+        ("(>= 3 3 4)", False),
+        ("(== 2 2 2)", True),
+    ],
+)
+def test_operators(ax_lang, code, expected, typed):
+    assert ax_lang.eval(get_ast(code, typed=typed)) == expected
+
+
+@pytest.mark.parametrize("code", ["(/ 1)", "(< 1)", "(+)"])
+def test_arity(ax_lang, code):
+    with pytest.raises(TypeError):
+        ax_lang.eval(get_ast(code, typed=True))
+
+
+def test_native_functions():
+    for name, native in NATIVE_FUNCTIONS.items():
+        assert GlobalEnvironment.lookup(name) is native.fn
+        assert accepts(native, native.min_args)
+        assert not accepts(native, native.min_args - 1)
+    assert not NATIVE_FUNCTIONS["print"].pure
+    assert NATIVE_FUNCTIONS["-"].fn(10, 1, 2) == 7
+
+
+@pytest.mark.parametrize("typed", [False, True])
+@pytest.mark.parametrize(
+    "code, expected",
+    [
+        ("(begin (def + (a b) (- a b)) (+ 10 3))", 7),
+        ("(begin (var x 10) (def + (a b) (- a b)) (++ x) x)", 9),
+        ("(begin (var x 10) (def * (a b) (+ a b)) (*= x 3) x)", 13),
+        # in tail position of a function
+        ("(begin (def + (a b) (- a b)) (def f (n) (+ n 1)) (f 5))", 4),
+        (
+            """
+            (begin
+                (var x 1)
+                (def f () (+ x 1))
+                (var + (lambda (a b) (* a 10)))
+                (f))
+            """,
+            10,
+        ),
+    ],
+)
+def test_rebound_operators(ax_lang, code, expected, typed):
+    assert ax_lang.eval(get_ast(code, typed=typed)) == expected
+
+
+@pytest.mark.parametrize("typed", [False, True])
+def test_rebound_native_operators(ax_lang, typed):
+    env = Environment({"+": lambda a, b: a - b}, GlobalEnvironment)
+    code = "(begin (var x 5) (++ x) (+ x 1))"
+
+    assert ax_lang.eval(ax_lang.lower(get_ast(code, typed=typed)), env) == 3
+    assert GlobalEnvironment.lookup("+")(2, 1) == 3
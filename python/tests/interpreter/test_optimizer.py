@@ -0,0 +1,186 @@
+import pytest
+from ax_lang.interpreter.ax_lang import AxLang
+from ax_lang.interpreter.environment import Environment, GlobalEnvironment
+from ax_lang.interpreter.lowering import Lowering
+from ax_lang.interpreter.optimizer import Optimizer
+from ax_lang.interpreter.transformer import Transformer
+from ax_lang.parser.cache import ASTCache
+from ax_lang.parser.nodes import to_source
+from ax_lang.parser.parser import get_ast
+
+
+@pytest.fixture
+def optimizer():
+    return Optimizer()
+
+
+@pytest.fixture
+def optimize(optimizer):
+    lowering = Lowering(Transformer())
+
+    def optimize(code, env=Environment({}, GlobalEnvironment)):
+        ast = lowering.lower(get_ast(code, typed=True))
+        return to_source(optimizer.optimize(ast, env))
+
+    return optimize
+
+
+@pytest.mark.parametrize(
+    "code, expected",
+    [
+        ("(* (* 60 60) 24)", "86400"),
+        ("(- 5)", "-5"),
+        ("(+ x (- 10 (* 2 3)))", "(+ x 4)"),
+        ("(/ 1 2)", "0.5"),
+        ("(< 1 2)", "true"),
+        ("(* 60 60 24)", "86400"),
+        ("(+ 7)", "7"),
+        ("(< 1 2 2)", "false"),
+        ("(if (< 1 2) a b)", "a"),
+        ("(if (== 1 2) a b)", "b"),
+        ("(if true a b)", "a"),
+        ('(if "" a b)', "b"),
+        ("(if x (+ 1 1) b)", "(if x 2 b)"),
+        ("(while false (print 1))", "(begin)"),
+        ("(while (> x 0) (set x (- 2 1)))", "(while (> x 0) (set x 1))"),
+        ("(switch ((== 1 2) a) ((== 1 1) b) (else c))", "b"),
+        ("(def f (x) (* x (+ 1 2)))", "(var f (lambda (x) (* x 3)))"),
+        ("(prop (if true a b) x)", "(prop a x)"),
+    ],
+)
+def test_fold(optimize, code, expected):
+    assert optimize(code) == expected
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "(/ 1 0)",
+        "(/ 1)",
+        "(< 1)",
+        '(+ "a" "b")',
+        "(print 1 2)",
+        "(begin (var + (lambda (a b) (* a b))) (+ 2 3))",
+        "(begin (def * (a b) 7) (* 2 3))",
+        "(lambda (+) (+ 2 3))",
+        "(begin (set + 1) (begin (+ 2 3)))",
+        "(begin (var true false) (if true a b))",
+        "(class A null (begin (def + (this b) 1) (def f (this) (+ 2 3))))",
+        "(class B A (def f (this) (+ 2 3)))",
+        "(module M (begin (var - 1) (- 2 1)))",
+        "(begin (class C null (def f (this) (+ 2 3))) (set (prop C +) 1))",
+        "(begin (import +) (+ 1 1))",
+    ],
+)
+def test_keep(optimize, code):
+    expected = to_source(Lowering(Transformer()).lower(get_ast(code, typed=True)))
+    assert optimize(code) == expected
+
+
+def test_shadowing_scopes(optimize):
+    code = "(begin (def f (x) (begin (var * (lambda (a b) 7)) (* 2 3))) (* 2 3))"
+    expected = "(begin (var f (lambda (x) (begin (var * (lambda (a b) 7)) (* 2 3)))) 6)"
+    assert optimize(code) == expected
+
+
+def test_shadowed_in_env(optimize):
+    env = Environment({"+": lambda a, b: a * b}, GlobalEnvironment)
+    assert optimize("(+ 2 3)", env) == "(+ 2 3)"
+    assert optimize("(* 2 3)", env) == "6"
+    assert optimize("(+ 2 3)", None) == "(+ 2 3)"
+
+
+def test_unchanged_ast_is_kept(optimizer):
+    ast = get_ast("(begin (var x 1) (if (> x 0) (print x) (print 0)))", typed=True)
+    assert optimizer.optimize(ast, GlobalEnvironment) is ast
+
+
+def test_stats_and_hook(optimizer):
+    calls = []
+    optimizer.on_optimize = lambda before, after: calls.append((before, after))
+    ast = get_ast("(if (> (+ 1 1) 1) (- 3 1) 0)", typed=True)
+    assert optimizer.optimize(ast, GlobalEnvironment) == 2
+    assert (optimizer.folded, optimizer.pruned) == (3, 1)
+    assert calls == [(ast, 2)]
+
+
+@pytest.mark.parametrize(
+    "code, expected",
+    [
+        ("(begin (var day (* (* 60 60) 24)) (if (> day 0) day 0))", 86400),
+        ("(begin (var x 0) (while false (set x 1)) x)", 0),
+        ("(begin (def f () (* 2 3)) (f))", 6),
+        ("(begin (var + (lambda (a b) (* a b))) (+ 2 3))", 6),
+        ("(begin (def f (- x) (- x 1)) (f (lambda (a b) (* a 10)) 5))", 50),
+        ("(begin (var x (+ 1 2)) (set + (lambda (a b) 0)) (+ x 1))", 0),
+    ],
+)
+def test_eval_optimized(ax_lang, code, expected):
+    for lang in (AxLang(engine=ax_lang.engine, optimize=True), ax_lang):
+        # `set` of a native assigns the copy, not the global one
+        env = Environment({"+": GlobalEnvironment.lookup("+")}, GlobalEnvironment)
+        assert lang.eval_forms([get_ast(code, typed=True)], env) == expected
+
+
+@pytest.mark.parametrize(
+    "code, expected",
+    [
+        (
+            """
+            (begin
+                (class Calc null
+                    (begin
+                        (def constructor (this) null)
+                        (def run (this) (+ 10 4))))
+                (set (prop Calc +) (lambda (a b) (- a b)))
+                ((prop (new Calc) run) (new Calc)))
+            """,
+            6,
+        ),
+        (
+            """
+            (begin
+                (module M (def f () (* 3 3)))
+                (set (prop M *) (lambda (a b) 0))
+                ((prop M f)))
+            """,
+            0,
+        ),
+    ],
+)
+def test_eval_property_rebound(ax_lang, code, expected):
+    # a property of a class or module rebinds the native for its functions
+    optimized = AxLang(engine=ax_lang.engine, optimize=True)
+    assert optimized.eval(get_ast(code, typed=True)) == expected
+    assert ax_lang.eval(get_ast(code, typed=True)) == expected
+
+
+@pytest.mark.parametrize(
+    "code, expected",
+    [
+        ("(def f () (* 60 60 24)) (var * +) (f)", 144),
+        ("(def f () (+ 1 2)) (set + -) (f)", -1),
+        ("(var day (* 60 60 24)) (var * +) (* day 1)", 86401),
+    ],
+)
+def test_eval_forms_rebound_later(ax_lang, tmp_path, code, expected):
+    # a later form rebinds the native called by a function of an earlier form
+    path = tmp_path / "prog.ax"
+    path.write_text(code)
+    forms = ASTCache(enabled=False).iter_forms(path, typed=True)
+    env = Environment({"+": GlobalEnvironment.lookup("+")}, GlobalEnvironment)
+    optimized = AxLang(engine=ax_lang.engine, optimize=True)
+    assert optimized.eval_forms(forms, env) == expected
+
+
+def test_function_bodies_of_incomplete_form(optimizer):
+    ast = Lowering(Transformer()).lower(get_ast("(def f () (* 2 3))", typed=True))
+    env = Environment({}, GlobalEnvironment)
+    assert to_source(optimizer.optimize(ast, env, complete=False)) == to_source(ast)
+    assert optimizer.optimize(ast, env) != ast
+
+
+def test_eval_division_by_zero(ax_lang):
+    optimized = AxLang(engine=ax_lang.engine, optimize=True)
+    with pytest.raises(ZeroDivisionError):
+        optimized.eval(get_ast("(begin (if true (/ 1 0) 0))", typed=True))
@@ -0,0 +1,139 @@
+import pytest
+from ax_lang.interpreter.ax_lang import AxLang
+from ax_lang.interpreter.compiler import ClosureCompiler
+from ax_lang.interpreter.environment import UNSET, Environment, Frame
+from ax_lang.interpreter.resolver import (
+    BLOCK,
+    DYNAMIC,
+    FUNCTION,
+    Resolution,
+    Resolver,
+    Scope,
+)
+from ax_lang.parser.parser import get_ast
+
+
+@pytest.fixture
+def compiler():
+    return ClosureCompiler(AxLang(engine="closure"))
+
+
+def test_scope_resolve():
+    dynamic = Scope(DYNAMIC)
+    function = Scope(FUNCTION, ["x", "y"], dynamic)
+    block = Scope(BLOCK, ["z", "x"], function)
+
+    assert block.resolve("x") == (0, 1)
+    assert block.resolve("y") == (1, 1)
+    assert block.resolve("print") == (2, None)
+    assert dynamic.resolve("x") == (0, None)
+
+
+def test_declared_names():
+    resolver = Resolver()
+    ast = get_ast(
+        """
+        (begin
+            (var x 1)
+            (def square (n) (* n n))
+            (if (> x 0) (var y 2) (var z 3))
+            (print (var w 4))
+            (for (var i 0) (< i 3) (++ i) (var v i))
+            (begin (var hidden 5))
+            (lambda (a) (var inner a))
+            (class Point null (begin (var method 6)))
+            (module Math (begin (var pi 3)))
+            (import Utils))
+        """
+    )
+
+    assert resolver.declared_names(ast[1:]) == [
+        "x",
+        "square",
+        "y",
+        "z",
+        "w",
+        "Point",
+        "Math",
+        "Utils",
+    ]
+
+
+def test_function_scope_parameters_first():
+    scope = Resolver().function_scope(
+        ["a", "b"], ["begin", ["var", "c", 1], ["var", "a", 2]], Scope(DYNAMIC)
+    )
+    assert scope.names == ["a", "b", "c"]
+
+
+def test_resolve_addresses(compiler):
+    ast = get_ast(
+        """
+        (begin
+            (var x 10)
+            (def add (y) (+ x y))
+            (set x 20)
+            (add 1))
+        """
+    )
+
+    assert compiler.resolve(ast) == [
+        Resolution("x", "declare", 0, 0),
+        Resolution("+", "lookup", 2, None),
+        Resolution("x", "lookup", 1, 0),
+        Resolution("y", "lookup", 0, 0),
+        Resolution("add", "declare", 0, 1),
+        Resolution("x", "assign", 0, 0),
+        Resolution("add", "lookup", 0, 1),
+    ]
+
+
+def test_class_body_is_dynamic(compiler):
+    ast = get_ast("(begin (class A null (begin (var k 1) (def f (self) k))))")
+
+    assert compiler.resolve(ast) == [
+        Resolution("null", "lookup", 1, None),
+        Resolution("k", "declare", 0, None),
+        Resolution("k", "lookup", 1, None),
+        Resolution("f", "declare", 0, None),
+        Resolution("A", "declare", 0, 0),
+    ]
+
+
+def test_frame_record():
+    scope = Scope(BLOCK, ["x", "y"])
+    frame = Frame(scope, [1, UNSET], Environment({"z": 3}))
+
+    assert dict(frame.record) == {"x": 1}
+    assert "y" not in frame.record
+    assert frame.lookup("z") == 3
+
+    frame.define("y", 2)
+    frame.define("extra", 4)
+    frame.assign("x", 10)
+
+    assert frame.slots == [10, 2]
+    assert frame.extra == {"extra": 4}
+    assert dict(frame.record) == {"x": 10, "y": 2, "extra": 4}
+
+
+@pytest.mark.parametrize("engine", ["tree", "closure"])
+def test_reference_before_declaration(engine):
+    ax_lang = AxLang(engine=engine)
+    # `x` of the inner block is read and assigned before its declaration
+    assert (
+        ax_lang.eval(
+            get_ast(
+                """
+                (begin
+                    (var x 1)
+                    (begin
+                        (set x (+ x 1))
+                        (var y x)
+                        (var x 100)
+                        (+ x y)))
+                """
+            )
+        )
+        == 102
+    )
@@ -0,0 +1,59 @@
+import pytest
+from ax_lang.exceptions import InterpreterError
+from ax_lang.interpreter.environment import Environment
+from ax_lang.parser.parser import get_ast
+
+
+@pytest.fixture
+def env(ax_lang):
+    return Environment({}, ax_lang.global_env)
+
+
+def register_unless(ax_lang):
+    def unless(expr, env):
+        _, condition, consequent, alternate = expr
+        branch = alternate if ax_lang.eval(condition, env) else consequent
+        return ax_lang.eval(branch, env)
+
+    ax_lang.register_special_form("unless", unless)
+
+
+def test_register_special_form(ax_lang, env):
+    register_unless(ax_lang)
+    code = """
+    (begin
+        (var x 10)
+        (def check (n) (unless (> n 5) "small" "big"))
+        (+ (unless (> x 5) (set x 0) x) (check 1)))
+    """
+    with pytest.raises(TypeError):
+        # "small" is not a number, both branches are not evaluated by `unless`
+        ax_lang.eval(get_ast(code, typed=True), env)
+
+    code = """
+    (begin
+        (var x 10)
+        (def check (n) (unless (> n 5) "small" "big"))
+        (var y (unless (> x 5) (set x 0) x))
+        (unless (== y 10) "fail" (check 1)))
+    """
+    assert ax_lang.eval(get_ast(code, typed=True), env) == "small"
+
+
+def test_special_form_takes_precedence_over_calls(ax_lang, env):
+    ax_lang.register_special_form("nargs", lambda expr, env: len(expr) - 1)
+    # the arguments are not evaluated
+    code = "(begin (def nargs (x) 0) (nargs undefined (+ 1 2)))"
+    assert ax_lang.eval(get_ast(code, typed=True), env) == 2
+
+
+def test_special_forms_are_per_instance(ax_lang, env):
+    register_unless(ax_lang)
+    assert "unless" in ax_lang.custom_forms
+    assert type(ax_lang)(engine=ax_lang.engine).custom_forms == {}
+
+
+@pytest.mark.parametrize("name", ["if", "def", "import"])
+def test_built_in_form_cannot_be_replaced(ax_lang, name):
+    with pytest.raises(InterpreterError, match=f"Special form `{name}` is built in!"):
+        ax_lang.register_special_form(name, lambda expr, env: None)
@@ -0,0 +1,103 @@
+import logging
+
+import pytest
+from ax_lang.exceptions import InterpreterError
+from ax_lang.interpreter.ax_lang import AxLang
+from ax_lang.interpreter.environment import Environment
+from ax_lang.interpreter.tracing import LoggingTracer, Tracer
+from ax_lang.parser.parser import get_ast
+
+
+class RecordingTracer(Tracer):
+    def __init__(self):
+        self.events = []
+
+    def on_enter(self, expr, env):
+        self.events.append(("enter", expr))
+
+    def on_exit(self, expr, value):
+        self.events.append(("exit", expr, value))
+
+    def on_call(self, fn, args):
+        self.events.append(("call", args))
+
+    def on_return(self, fn, value):
+        self.events.append(("return", value))
+
+    def on_define(self, env, name, value):
+        self.events.append(("define", name, value))
+
+
+def test_events():
+    ax_lang = AxLang()
+    tracer = RecordingTracer()
+    ax_lang.set_tracer(tracer)
+
+    ax_lang.eval(["var", "x", ["+", 1, 2]], Environment({}, ax_lang.global_env))
+
+    assert tracer.events == [
+        ("enter", ["var", "x", ["+", 1, 2]]),
+        ("enter", ["+", 1, 2]),
+        ("enter", "+"),
+        ("exit", "+", ax_lang.global_env.lookup("+")),
+        ("enter", 1),
+        ("exit", 1, 1),
+        ("enter", 2),
+        ("exit", 2, 2),
+        ("call", [1, 2]),
+        ("return", 3),
+        ("exit", ["+", 1, 2], 3),
+        ("define", "x", 3),
+        ("exit", ["var", "x", ["+", 1, 2]], 3),
+    ]
+
+
+def test_events_of_tail_calls_are_balanced():
+    ax_lang = AxLang()
+    tracer = RecordingTracer()
+    ax_lang.set_tracer(tracer)
+    program = """
+        (begin
+            (def count (n) (if (== n 0) "done" (count (- n 1))))
+            (count 3))
+        """
+
+    assert ax_lang.eval(get_ast(program)) == "done"
+
+    kinds = [event[0] for event in tracer.events]
+    assert kinds.count("enter") == kinds.count("exit")
+    assert kinds.count("call") == kinds.count("return")
+    assert [event for event in tracer.events if event[0] == "return"][-4:] == [
+        ("return", "done")
+    ] * 4
+
+
+def test_no_events_without_tracer():
+    ax_lang = AxLang()
+    tracer = RecordingTracer()
+    ax_lang.set_tracer(tracer)
+    ax_lang.set_tracer(None)
+
+    assert ax_lang.eval(["+", 1, 2]) == 3
+    assert tracer.events == []
+
+
+def test_tracer_requires_tree_engine():
+    with pytest.raises(InterpreterError, match="`tree` engine only"):
+        AxLang(engine="closure").set_tracer(Tracer())
+
+
+def test_logging_tracer(caplog):
+    ax_lang = AxLang()
+    ax_lang.set_tracer(LoggingTracer())
+
+    with caplog.at_level(logging.DEBUG, logger="ax_lang.interpreter.tracing"):
+        ax_lang.eval(["var", "y", 5], Environment({}, ax_lang.global_env))
+
+    assert caplog.messages == [
+        "Expr: ['var', 'y', 5]",
+        "Expr: 5",
+        "Value: `5` of expr: 5",
+        "Defining name=`y` with value=`5` in the current env.",
+        "Value: `5` of expr: ['var', 'y', 5]",
+    ]
@@ -0,0 +1,111 @@
+import pytest
+from ax_lang.exceptions import ParserError
+from ax_lang.parser.cache import CACHE_DIR_NAME, ASTCache
+from ax_lang.parser.nodes import String, Symbol
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "prog.ax"
+    path.write_text("(var x 10)\n(+ x 1)\n")
+    return path
+
+
+def test_cache_miss_then_hit(source):
+    cache = ASTCache()
+    expected = ["begin", ["var", "x", 10], ["+", "x", 1]]
+
+    assert cache.get_ast(source) == expected
+    assert cache.stats() == {"hits": 0, "misses": 1}
+    assert cache.cache_path(source) == source.parent / CACHE_DIR_NAME / "prog.axc"
+    assert cache.cache_path(source).exists()
+
+    assert cache.get_ast(source) == expected
+    assert ASTCache().get_ast(source) == expected
+    assert cache.stats() == {"hits": 1, "misses": 1}
+
+
+def test_cache_invalidated_on_change(source):
+    cache = ASTCache()
+    cache.get_ast(source)
+    source.write_text('(print "changed")')
+
+    assert cache.get_ast(source) == ["begin", ["print", '"changed"']]
+    assert cache.stats() == {"hits": 0, "misses": 2}
+
+
+def test_corrupted_entry_is_a_miss(source):
+    cache = ASTCache()
+    cache.get_ast(source)
+    cache.cache_path(source).write_bytes(b"garbage")
+
+    assert cache.get_ast(source) == ["begin", ["var", "x", 10], ["+", "x", 1]]
+    assert cache.stats() == {"hits": 0, "misses": 2}
+
+
+def test_cache_dir(source, tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache = ASTCache(cache_dir=str(cache_dir))
+    cache.get_ast(source)
+
+    assert cache.cache_path(source).parent == cache_dir
+    assert not (source.parent / CACHE_DIR_NAME).exists()
+    assert cache.purge() == 1
+    assert not list(cache_dir.iterdir())
+
+
+def test_disabled_cache(source):
+    cache = ASTCache(enabled=False)
+
+    assert cache.get_ast(source) == ["begin", ["var", "x", 10], ["+", "x", 1]]
+    assert cache.stats() == {"hits": 0, "misses": 0}
+    assert not cache.cache_path(source).exists()
+
+
+def test_purge(source):
+    cache = ASTCache()
+    cache.get_ast(source)
+
+    assert cache.purge(source) == 1
+    assert cache.purge(source) == 0
+    cache.get_ast(source)
+    assert cache.stats() == {"hits": 0, "misses": 2}
+
+
+def test_iter_forms(source):
+    cache = ASTCache()
+    assert list(cache.iter_forms(source)) == [["var", "x", 10], ["+", "x", 1]]
+    assert list(cache.iter_forms(source)) == [["var", "x", 10], ["+", "x", 1]]
+    assert cache.stats() == {"hits": 1, "misses": 1}
+
+
+def test_partial_entry_is_not_stored(source):
+    cache = ASTCache()
+    forms = cache.iter_forms(source)
+    next(forms)
+    forms.close()
+
+    assert not cache.cache_path(source).exists()
+    assert not list(cache.cache_path(source).parent.glob("*.tmp"))
+
+
+def test_parse_error_is_not_stored(source):
+    source.write_text("(var x 10) (+ x")
+    cache = ASTCache()
+
+    with pytest.raises(ParserError):
+        list(cache.iter_forms(source))
+    assert not cache.cache_path(source).exists()
+
+
+def test_typed_forms(source):
+    source.write_text('(var x "ten")\n(+ x 1)\n')
+    cache = ASTCache()
+    expected = ["begin", ["var", "x", String("ten")], ["+", "x", 1]]
+
+    for _ in range(2):
+        ast = cache.get_ast(source, typed=True)
+        assert ast == expected
+        assert ast[2][1] is Symbol("x")
+    assert cache.stats() == {"hits": 1, "misses": 1}
+    assert cache.get_ast(source) == ["begin", ["var", "x", '"ten"'], ["+", "x", 1]]
@@ -0,0 +1,65 @@
+from ax_lang.benchmark.ast_size import generate_rules
+from ax_lang.parser.cache import ASTCache
+from ax_lang.parser.compact import (
+    BIG_INT,
+    FLOAT,
+    INT,
+    LIST,
+    STRING,
+    SYMBOL,
+    CompactAST,
+    count_nodes,
+    list_ast_nbytes,
+)
+from ax_lang.parser.nodes import Symbol
+from ax_lang.parser.parser import get_ast
+
+SOURCE = '(begin (var s "hi") (print s (+ 1 2.5 -3 123456789012345678901234567890)) ())'
+
+
+def test_round_trip():
+    plain = get_ast(SOURCE)
+    typed = get_ast(SOURCE, typed=True)
+    for ast in (plain, typed):
+        compact = CompactAST.from_ast(ast)
+        assert len(compact) == count_nodes(plain)
+        assert compact.to_ast(typed=False) == plain
+        assert compact.to_ast() == typed
+
+
+def test_decoded_symbols_are_interned():
+    ast = CompactAST.from_ast(get_ast("(+ x x)")).to_ast()
+    assert ast[1] is ast[2] is Symbol("x")
+
+
+def test_layout():
+    compact = CompactAST.from_ast(get_ast('(f x "s" 1 1.5 x 99999999999999999999)'))
+    assert list(compact.kinds) == [
+        SYMBOL,
+        SYMBOL,
+        STRING,
+        INT,
+        FLOAT,
+        SYMBOL,
+        BIG_INT,
+        LIST,
+    ]
+    assert compact.symbols == ["f", "x"]
+    assert list(compact.values[:6]) == [0, 1, 0, 1, 0, 1]
+    assert compact.constants == ["s", 99999999999999999999]
+    assert list(compact.list_children(compact.root)) == [0, 1, 2, 3, 4, 5, 6]
+    assert compact.kind(compact.root) == LIST
+
+
+def test_from_file(tmp_path):
+    path = tmp_path / "prog.ax"
+    path.write_text('(var x 10)\n(print "x" x)\n')
+    compact = CompactAST.from_file(path)
+    assert compact.to_ast() == ASTCache(enabled=False).get_ast(path, typed=True)
+
+
+def test_compact_is_smaller(tmp_path):
+    path = tmp_path / "rules.ax"
+    path.write_text(generate_rules(100))
+    plain = ASTCache(enabled=False).get_ast(path)
+    assert CompactAST.from_file(path).nbytes() * 2 < list_ast_nbytes(plain)
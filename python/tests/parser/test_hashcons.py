@@ -0,0 +1,55 @@
+from ax_lang.interpreter.lowering import Lowered
+from ax_lang.parser.hashcons import HashConser
+from ax_lang.parser.nodes import String
+from ax_lang.parser.parser import get_ast
+
+
+def test_identical_subtrees_are_shared():
+    ast = get_ast('(begin (+ x 1) (f (+ x 1) "s" "s") (+ x 2))', typed=True)
+    shared = HashConser().share(ast)
+    assert shared == ast
+    assert shared[1] is shared[2][1]
+    assert shared[2][2] is shared[2][3]
+    assert shared[1] is not shared[3]
+
+
+def test_atoms_are_kept_apart():
+    shared = HashConser().share([1, 1.0, True, 0.0, -0.0, "x", '"x"', String("x")])
+    assert [type(atom) for atom in shared] == [
+        int,
+        float,
+        bool,
+        float,
+        float,
+        str,
+        str,
+        String,
+    ]
+    assert str(shared[4]) == "-0.0"
+
+
+def test_unchanged_subtrees_are_reused():
+    ast = [["a"], ["a"]]
+    shared = HashConser().share(ast)
+    assert shared[0] is ast[0]
+    assert shared[1] is ast[0]
+    assert shared is not ast
+
+
+def test_node_type_is_kept():
+    shared = HashConser().share([Lowered(["a", ["b"]], ["++", "a"]), ["b"]])
+    assert type(shared[0]) is Lowered
+    assert shared[0].origin == ["++", "a"]
+    assert shared[0][1] is shared[1]
+
+
+def test_stats():
+    conser = HashConser()
+    conser.share(get_ast("(begin (+ x 1) (+ x 1))"))
+    conser.share(get_ast("(+ x 1)"))
+    stats = conser.stats()
+    # begin, +, x, 1, (+ x 1), the begin block
+    assert (stats.nodes, stats.unique_nodes) == (14, 6)
+    assert stats.sharing_ratio == 1 - 6 / 14
+    assert stats.saved_bytes == stats.bytes_before - stats.bytes_after > 0
+    assert "6 unique of 14 nodes" in str(stats)
@@ -0,0 +1,53 @@
+import re
+
+import pytest
+from ax_lang.exceptions import ParserError
+from ax_lang.parser.lexer import EOF, TOKEN_RULES, tokenize
+from ax_lang.parser.parser import EVA_GRAMMAR_PATH
+
+
+def _types_and_values(source):
+    return [(token.type, token.value) for token in tokenize(source)]
+
+
+def test_token_rules_match_grammar():
+    with open(EVA_GRAMMAR_PATH) as f:
+        grammar = f.read()
+    lex_section = grammar.split("%lex")[1].split("/lex")[0]
+    grammar_rules = re.findall(r"^(\S+)\s+return '(\w+)'$", lex_section, re.MULTILINE)
+    assert [(name, pattern.lstrip("^")) for pattern, name in grammar_rules] == [
+        rule for rule in TOKEN_RULES if rule[0] not in ("(", ")")
+    ]
+
+
+def test_tokenize():
+    assert _types_and_values('(print "Hello World" -5.7 x)') == [
+        ("(", "("),
+        ("SYMBOL", "print"),
+        ("STRING", '"Hello World"'),
+        ("NUMBER", "-5.7"),
+        ("SYMBOL", "x"),
+        (")", ")"),
+        (EOF, EOF),
+    ]
+
+
+def test_tokenize_symbols():
+    assert _types_and_values("+ - += == <= foo_1") == [
+        ("SYMBOL", "+"),
+        ("SYMBOL", "-"),
+        ("SYMBOL", "+="),
+        ("SYMBOL", "=="),
+        ("SYMBOL", "<="),
+        ("SYMBOL", "foo_1"),
+        (EOF, EOF),
+    ]
+
+
+def test_tokenize_offsets():
+    assert [token.offset for token in tokenize(" (a  1)")] == [1, 2, 5, 6, 7]
+
+
+def test_tokenize_unexpected_character():
+    with pytest.raises(ParserError, match="Unexpected token `.` at offset 3"):
+        list(tokenize("(a . b)"))
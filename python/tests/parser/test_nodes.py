@@ -0,0 +1,47 @@
+import pytest
+from ax_lang.parser.nodes import String, Symbol, to_plain, to_typed
+
+PLAIN = ["begin", ["var", "s", '"hi"'], ["print", "s", 1, -2.5], ['"'], []]
+
+
+def test_symbol_is_interned():
+    assert Symbol("x") is Symbol("x")
+    assert Symbol("x") is Symbol("".join(["x"]))
+    assert Symbol("x") == "x"
+    assert hash(Symbol("x")) == hash("x")
+    assert {"x": 1}[Symbol("x")] == 1
+    assert repr(Symbol("x")) == "'x'"
+
+
+def test_string():
+    string = String("hi")
+    assert string.value == "hi"
+    assert string == String("hi")
+    assert hash(string) == hash(String("hi"))
+    assert string != "hi"
+    assert string != '"hi"'
+    assert repr(string) == "String('hi')"
+
+
+def test_string_is_immutable():
+    with pytest.raises(AttributeError):
+        String("hi").value = "bye"
+
+
+def test_to_typed():
+    typed = to_typed(PLAIN)
+    assert typed == [
+        "begin",
+        ["var", "s", String("hi")],
+        ["print", "s", 1, -2.5],
+        ['"'],
+        [],
+    ]
+    assert typed[1][1] is Symbol("s")
+    assert typed[2][1] is typed[1][1]
+    assert type(typed[3][0]) is Symbol
+
+
+def test_to_plain():
+    assert to_plain(to_typed(PLAIN)) == PLAIN
+    assert all(type(atom) is str for atom in to_plain(to_typed(PLAIN))[1])
@@ -1,3 +1,8 @@
+import shutil
+
+import pytest
+from ax_lang.exceptions import ParserError
+from ax_lang.parser.nodes import String, Symbol
 from ax_lang.parser.parser import _get_parsed_value, get_ast
 
 
@@ -209,3 +214,54 @@ def test_ast_atoms():
 def test_ast_negative_numbers():
     assert get_ast("-1") == -1
     assert get_ast("-5.6") == -5.6
+
+
+def test_ast_strings():
+    assert get_ast('(print "Hello World")') == ["print", '"Hello World"']
+    assert get_ast('(var s "")') == ["var", "s", '""']
+
+
+def test_ast_numbers():
+    assert get_ast("(+ 1 2.0 -3 +4 1.5)") == ["+", 1, 2, -3, 4, 1.5]
+
+
+def test_typed_ast():
+    ast = get_ast('(print "Hello World" x 1.5 (x))', typed=True)
+    assert ast == ["print", String("Hello World"), "x", 1.5, ["x"]]
+    assert [type(node) for node in ast] == [Symbol, String, Symbol, float, list]
+    assert ast[2] is ast[4][0]
+    assert get_ast('"test"', typed=True) == String("test")
+    assert get_ast("-1", typed=True) == -1
+
+
+def test_ast_empty_list():
+    assert get_ast("()") == []
+    assert get_ast("(begin ())") == ["begin", []]
+
+
+@pytest.mark.parametrize(
+    "expr, message",
+    [
+        ("", "Unexpected end of input"),
+        ("(+ 1 2", "Unexpected end of input"),
+        ("(+ 1 2))", "Unexpected token `\\)` at offset 7"),
+        ("x y", "Unexpected token `y` at offset 2"),
+        ("(a . b)", "Unexpected token `.` at offset 3"),
+    ],
+)
+def test_ast_errors(expr, message):
+    with pytest.raises(ParserError, match=message):
+        get_ast(expr)
+
+
+def test_unsupported_backend():
+    with pytest.raises(ParserError, match="Unsupported parser backend `antlr`"):
+        get_ast("(+ 1 2)", backend="antlr")
+
+
+@pytest.mark.skipif(shutil.which("syntax-cli") is None, reason="needs syntax-cli")
+@pytest.mark.parametrize(
+    "expr", ["42", "-5.6", '"test"', "x", '(print "hi" (+ 1 -2))', "((lambda (x) x) 2)"]
+)
+def test_backends_are_equivalent(expr):
+    assert get_ast(expr, backend="native") == get_ast(expr, backend="syntax-cli")
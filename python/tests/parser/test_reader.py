@@ -0,0 +1,53 @@
+import pytest
+from ax_lang.exceptions import ParserError
+from ax_lang.parser.parser import get_ast
+from ax_lang.parser.reader import iter_file_forms, iter_forms
+
+SOURCE = """
+(def square (x)
+    (* x x))
+
+42 "str" foo
+(print "hello" (square 2))
+()
+"""
+
+
+def test_iter_forms_matches_begin():
+    forms = list(iter_forms(SOURCE.encode()))
+    assert ["begin", *forms] == get_ast(f"(begin {SOURCE})")
+    assert forms[1:4] == [42, '"str"', "foo"]
+
+
+def test_iter_forms_empty():
+    assert list(iter_forms(b"")) == []
+    assert list(iter_forms(b"  \n ")) == []
+
+
+def test_iter_forms_is_lazy():
+    forms = iter_forms(b"(+ 1 2) (+ 3")
+    assert next(forms) == ["+", 1, 2]
+    with pytest.raises(ParserError, match="Unexpected end of input"):
+        next(forms)
+
+
+def test_iter_forms_unbalanced():
+    with pytest.raises(ParserError, match="Unexpected token `\\)` at offset 7"):
+        list(iter_forms(b"(+ 1 2))"))
+
+
+def test_iter_forms_utf8():
+    assert list(iter_forms('(print "привет") x'.encode())) == [
+        ["print", '"привет"'],
+        "x",
+    ]
+
+
+def test_iter_file_forms(tmp_path):
+    path = tmp_path / "prog.ax"
+    path.write_text(SOURCE)
+    assert list(iter_file_forms(path)) == list(iter_forms(SOURCE.encode()))
+
+    empty = tmp_path / "empty.ax"
+    empty.write_text("")
+    assert list(iter_file_forms(empty)) == []